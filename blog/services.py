@@ -0,0 +1,16 @@
+# blog/services.py — cache'inti blogo nustatymai (žr. shop.singletons)
+from shop.singletons import singletons
+from .models import BlogSettings
+
+BLOG_SETTINGS = "blog_settings"
+
+
+def _load_blog_settings():
+    settings = BlogSettings.objects.first()
+    brands = list(settings.brands.filter(is_active=True).order_by("order")) if settings else []
+    return settings, brands
+
+
+def get_blog_settings():
+    """Grąžina (BlogSettings | None, [aktyvūs BrandItem])."""
+    return singletons.get(BLOG_SETTINGS, _load_blog_settings)
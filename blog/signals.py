@@ -0,0 +1,28 @@
+# blog/signals.py — singleton cache invalidacija po admin pakeitimų
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from shop import pagecache
+from shop.singletons import singletons
+from .models import BlogSettings, BrandItem, Post
+from .services import BLOG_SETTINGS
+
+
+@receiver(post_save, sender=BlogSettings, dispatch_uid="singleton_blog_settings_saved")
+@receiver(post_delete, sender=BlogSettings, dispatch_uid="singleton_blog_settings_deleted")
+@receiver(post_save, sender=BrandItem, dispatch_uid="singleton_brand_item_saved")
+@receiver(post_delete, sender=BrandItem, dispatch_uid="singleton_brand_item_deleted")
+def invalidate_blog_settings(sender, **kwargs):
+    def invalidate():
+        singletons.invalidate(BLOG_SETTINGS)
+        pagecache.bump("blog")
+    # po commit'o – kitaip lygiagretus request'as spėtų į cache vėl įdėti seną eilutę
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Post, dispatch_uid="pagecache_post_saved")
+@receiver(post_delete, sender=Post, dispatch_uid="pagecache_post_deleted")
+def invalidate_blog_pages(sender, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: pagecache.bump("blog"))
@@ -1,14 +1,19 @@
+from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
-from .models import BlogSettings, Post
 
+from shop.pagecache import page_cache
+from .models import Post
+from .services import get_blog_settings
+
+@method_decorator(page_cache("blog"), name="get")
 class BlogListView(TemplateView):
     template_name = "blog/list.html"
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
 
-        settings = BlogSettings.objects.first()
-        brands = settings.brands.filter(is_active=True).order_by("order") if settings else []
+        # BlogSettings + aktyvūs brandai iš singleton cache (invaliduojama signalais)
+        settings, brands = get_blog_settings()
         posts = Post.objects.filter(is_published=True).order_by("-published_at")
 
         grid = [
@@ -1,9 +1,38 @@
 # cart/context_processors.py
-from .services import Cart
+from decimal import Decimal
 
-def cart_info(request):
+from django.utils.functional import SimpleLazyObject
+
+from .services import Cart, CART_SESSION_KEY, CART_SNAPSHOT_KEY, catalog_version
+
+
+def _snapshot(request) -> dict:
+    """
+    Header'io krepšelio suvestinė:
+      1) jei šiame request'e krepšelis jau naudotas – imam iš jo (memoizuota);
+      2) tuščias krepšelis – nuliai, nieko nekuriant ir sesijos nerašant;
+      3) kitaip – iš sesijos suvestinės (be DB), jei jos katalogo žyma dar galioja;
+         pasikeitus kainoms – perskaičiuojama ir įrašoma iš naujo.
+    """
     try:
-        cart = Cart(request)
-        return {"cart_count": cart.count, "cart_total": cart.total}
+        cart = getattr(request, "_cart", None)
+        if cart is None:
+            raw = request.session.get(CART_SESSION_KEY) or {}
+            if not raw.get("items"):
+                return {"count": 0, "total": Decimal("0.00")}
+            snap = request.session.get(CART_SNAPSHOT_KEY)
+            if snap and snap.get("version") == catalog_version():
+                return {"count": int(snap["count"]), "total": Decimal(snap["total"])}
+            cart = Cart.for_request(request)
+        return cart.snapshot()
     except Exception:
-        return {"cart_count": 0, "cart_total": 0}
+        return {"count": 0, "total": Decimal("0.00")}
+
+
+def cart_info(request):
+    # Tingios reikšmės: sesija/DB liečiama tik jei šablonas iš tikrųjų naudoja cart_count/cart_total
+    snap = SimpleLazyObject(lambda: _snapshot(request))
+    return {
+        "cart_count": SimpleLazyObject(lambda: snap["count"]),
+        "cart_total": SimpleLazyObject(lambda: snap["total"]),
+    }
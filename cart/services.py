@@ -6,6 +6,13 @@ from catalog.models import Variant
 
 CART_SESSION_KEY = "cart"          # session struktūra: {"items": {"<id>": qty}, "coupon": "CODE"|None}
 COUPON_SESSION_KEY = "cart_coupon" # (palikta suderinamumui, jei kur nors dar naudojama)
+CART_SNAPSHOT_KEY = "cart_snapshot" # {"count": n, "total": "12.34", "version": žyma} – header'io ženkleliui be DB
+
+
+def catalog_version():
+    """Katalogo „listing“ žyma: keičiasi su kiekvienu kainos/varianto pakeitimu (po commit'o)."""
+    from catalog import versions   # catalog.versions importuoja šį modulį
+    return versions.stamps("listing")["listing"]
 
 @dataclass
 class CartLine:
@@ -28,7 +35,8 @@ class Cart:
         self.request = request
         self.session = request.session
 
-        raw = self.session.get(CART_SESSION_KEY)
+        stored = self.session.get(CART_SESSION_KEY)
+        raw = stored
         if not raw or not isinstance(raw, dict):
             raw = {"items": {}, "coupon": None}
 
@@ -44,14 +52,60 @@ class Cart:
 
         self._items: Dict[str, int] = items
         self._coupon: Optional[str] = (raw.get("coupon") or None)
-        self._save()  # persistinam suvienodintą struktūrą
+        self._lines: Optional[List[CartLine]] = None
+        self._version = None   # katalogo žyma, su kuria užkrautos eilutės
+        self._summary: Optional[dict] = None
+
+        # persistinam suvienodintą struktūrą TIK jei ji skiriasi nuo įkeltos –
+        # kitaip kiekvienas skaitymas perrašytų sesiją (DB write + Set-Cookie)
+        normalized = self._as_session_data()
+        if stored != normalized and (stored is not None or items or self._coupon):
+            self._save()
+
+    @classmethod
+    def for_request(cls, request) -> "Cart":
+        """
+        Vienas krepšelis per request'ą: view'ai ir context processor'ius dalinasi
+        tuo pačiu objektu, todėl eilutės/suvestinė skaičiuojamos tik kartą.
+        """
+        cart = getattr(request, "_cart", None)
+        if cart is None:
+            cart = cls(request)
+            request._cart = cart
+        return cart
 
     # --- low-level ---
 
+    def _as_session_data(self) -> dict:
+        return {"items": self._items, "coupon": self._coupon}
+
     def _save(self):
-        self.session[CART_SESSION_KEY] = {"items": self._items, "coupon": self._coupon}
+        self.session[CART_SESSION_KEY] = self._as_session_data()
         self.session.modified = True
 
+    def _refresh_snapshot(self):
+        """
+        Atnaujina sesijoje laikomą count/total suvestinę (naudoja cart_info context processor'ius).
+        Kartu įrašoma katalogo žyma – pasikeitus kainoms suvestinė perskaičiuojama.
+        Tuščiam krepšeliui be ankstesnės suvestinės nieko nerašom – kad neliestume sesijos.
+        """
+        total = str(self.subtotal)   # užkrauna eilutes ir self._version
+        snap = {"count": self.count, "total": total, "version": self._version}
+        current = self.session.get(CART_SNAPSHOT_KEY)
+        if current == snap or (current is None and not snap["count"]):
+            return
+        self.session[CART_SNAPSHOT_KEY] = snap
+
+    def snapshot(self) -> dict:
+        self.items()  # užtikrina, kad suvestinė sesijoje atnaujinta
+        return {"count": self.count, "total": self.subtotal}
+
+    def _invalidate(self, lines: bool = True):
+        # memoizuotos reikšmės galioja tik iki kito mutatoriaus
+        if lines:
+            self._lines = None
+        self._summary = None
+
     # --- mutatoriai ---
 
     def add(self, variant_id: int, qty: int = 1):
@@ -59,6 +113,8 @@ class Cart:
         qty = max(1, int(qty))
         self._items[key] = self._items.get(key, 0) + qty
         self._save()
+        self._invalidate()
+        self._refresh_snapshot()
 
     def set(self, variant_id: int, qty: int):
         key = str(int(variant_id))
@@ -68,10 +124,14 @@ class Cart:
         else:
             self._items[key] = qty
         self._save()
+        self._invalidate()
+        self._refresh_snapshot()
 
     def remove(self, variant_id: int):
         self._items.pop(str(int(variant_id)), None)
         self._save()
+        self._invalidate()
+        self._refresh_snapshot()
 
     def get(self, variant_id: int) -> int:
         return int(self._items.get(str(int(variant_id)), 0))
@@ -83,6 +143,7 @@ class Cart:
         if self._coupon:
             self._coupon = self._coupon.strip().upper() or None
         self._save()
+        self._invalidate(lines=False)
 
     @property
     def coupon_code(self) -> Optional[str]:
@@ -91,15 +152,23 @@ class Cart:
     # --- skaitymas ---
 
     def items(self) -> List[CartLine]:
+        if self._lines is not None:
+            return self._lines
+        # žyma – prieš užklausą: vėlesnis kainos pakeitimas ją pakels ir suvestinė nepasens
+        self._version = catalog_version()
         ids = [int(k) for k in self._items.keys()]
         if not ids:
-            return []
+            self._lines = []
+            self._refresh_snapshot()
+            return self._lines
         variants = Variant.objects.select_related("product").in_bulk(ids)
         lines: List[CartLine] = []
         for k, qty in self._items.items():
             v = variants.get(int(k))
             if v:
                 lines.append(CartLine(variant=v, qty=int(qty)))
+        self._lines = lines
+        self._refresh_snapshot()
         return lines
 
     @property
@@ -126,7 +195,12 @@ class Cart:
           - total: Decimal
           - coupon_code: Optional[str]
           - coupon_error: Optional[str]
+
+        Rezultatas memoizuojamas iki kito mutatoriaus (add/set/remove/set_coupon).
         """
+        if self._summary is not None:
+            return self._summary
+
         from discounts.models import Coupon
         from discounts.services import validate_coupon, apply_coupon_amount
 
@@ -155,7 +229,7 @@ class Cart:
                 code = None
 
         total = max(Decimal("0.00"), (subtotal - discount).quantize(Decimal("0.01")))
-        return {
+        self._summary = {
             "items": items,
             "subtotal": subtotal,
             "discount": discount,
@@ -163,3 +237,4 @@ class Cart:
             "coupon_code": code,
             "coupon_error": coupon_error,
         }
+        return self._summary
@@ -1,3 +1,84 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from catalog.models import Category, Product
+
+
+class CartMemoizationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cat = Category.objects.create(name="Hoodies")
+        cls.product = Product.objects.create(name="Hoodie", category=cat, price=20, stock=5)
+        cls.variant = cls.product.variants.get()
+
+    def test_cart_page_reads_variants_once(self):
+        self.client.post(reverse("cart:cart_add"), {"variant_id": self.variant.pk, "qty": 2})
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("cart:cart_view"))
+        self.assertEqual(resp.context["total"], 40)
+        self.assertEqual(resp.context["cart_count"], 2)
+        variant_reads = [q for q in ctx.captured_queries if 'FROM "catalog_variant"' in q["sql"]]
+        self.assertEqual(len(variant_reads), 1)
+
+
+class CartContextProcessorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cat = Category.objects.create(name="Hoodies")
+        cls.variant = Product.objects.create(name="Hoodie", category=cat, price=20, stock=5).variants.get()
+
+    def test_header_badge_comes_from_session_snapshot(self):
+        self.client.post(reverse("cart:cart_add"), {"variant_id": self.variant.pk, "qty": 3})
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("blog_list"))
+        self.assertContains(resp, "Cart: 3 vnt — 60,00 €")
+        self.assertFalse([q for q in ctx.captured_queries if 'FROM "catalog_variant"' in q["sql"]])
+
+    def test_price_change_refreshes_header_total(self):
+        self.client.post(reverse("cart:cart_add"), {"variant_id": self.variant.pk, "qty": 3})
+        self.variant.price = 15
+        with self.captureOnCommitCallbacks(execute=True):
+            self.variant.save()
+        self.assertContains(self.client.get(reverse("blog_list")), "Cart: 3 vnt — 45,00 €")
+        # perskaičiuota suvestinė įrašyta – kitas puslapis vėl be DB
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("blog_list"))
+        self.assertContains(resp, "Cart: 3 vnt — 45,00 €")
+        self.assertFalse([q for q in ctx.captured_queries if 'FROM "catalog_variant"' in q["sql"]])
+
+    def test_empty_cart_touches_nothing(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("blog_list"))
+        self.assertContains(resp, "Cart: 0 vnt — 0,00 €")
+        self.assertFalse([q for q in ctx.captured_queries if "django_session" in q["sql"]])
+
+
+class CartSessionWriteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cat = Category.objects.create(name="Hoodies")
+        cls.variant = Product.objects.create(name="Hoodie", category=cat, price=20, stock=5).variants.get()
+
+    def _assert_no_session_write(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        writes = [
+            q for q in ctx.captured_queries
+            if "django_session" in q["sql"] and q["sql"].startswith(("INSERT", "UPDATE"))
+        ]
+        self.assertEqual(writes, [])
+        self.assertNotIn("sessionid", resp.cookies)
+
+    def test_read_only_views_do_not_write_session(self):
+        self.client.post(reverse("cart:cart_add"), {"variant_id": self.variant.pk, "qty": 1})
+        for url in (reverse("cart:cart_view"), reverse("product_list"), reverse("blog_list")):
+            with self.subTest(url=url):
+                self._assert_no_session_write(url)
+
+    def test_anonymous_visitor_gets_no_session(self):
+        for url in (reverse("cart:cart_view"), reverse("product_list")):
+            with self.subTest(url=url):
+                self._assert_no_session_write(url)
@@ -5,11 +5,12 @@ from django.urls import reverse
 from django.views.decorators.http import require_POST
 
 from catalog.models import Variant
+from catalog.stock import available_stock
 from .services import Cart
 
 
 def cart_view(request):
-    cart = Cart(request)
+    cart = Cart.for_request(request)
     s = cart.summary()  # {items, subtotal, discount, total, coupon_code, coupon_error}
 
     ctx = {
@@ -31,7 +32,7 @@ def cart_view(request):
 
 @require_POST
 def cart_add(request):
-    cart = Cart(request)
+    cart = Cart.for_request(request)
     variant_id = int(request.POST.get("variant_id", 0))
     qty = max(1, int(request.POST.get("qty", 1)))
 
@@ -43,11 +44,13 @@ def cart_add(request):
         messages.error(request, "Variantas nerastas arba neaktyvus.")
         return redirect("cart:cart_view")
 
-    if v.stock <= 0:
+    # likutis be kitų pirkėjų checkout'e rezervuotų vienetų (catalog.stock)
+    available = available_stock([v.pk]).get(v.pk, 0)
+    if available <= 0:
         messages.error(request, "Šis variantas šiuo metu neturi atsargų.")
         return redirect(reverse("product_detail", kwargs={"slug": v.product.slug}))
 
-    if qty > v.stock:
+    if qty > available:
         messages.error(request, "Kiekis viršija likutį.")
         return redirect(reverse("product_detail", kwargs={"slug": v.product.slug}))
 
@@ -58,7 +61,7 @@ def cart_add(request):
 
 @require_POST
 def cart_update(request):
-    cart = Cart(request)
+    cart = Cart.for_request(request)
     variant_id = int(request.POST.get("variant_id", 0))
     qty = int(request.POST.get("qty", 0))
 
@@ -71,7 +74,7 @@ def cart_update(request):
     if qty < 0:
         qty = 0
 
-    if qty > v.stock:
+    if qty > available_stock([v.pk]).get(v.pk, 0):
         messages.error(request, "Kiekis viršija likutį.")
         return redirect("cart:cart_view")
 
@@ -82,7 +85,7 @@ def cart_update(request):
 
 @require_POST
 def cart_remove(request):
-    cart = Cart(request)
+    cart = Cart.for_request(request)
     variant_id = int(request.POST.get("variant_id", 0))
     cart.remove(variant_id)
     messages.info(request, "Prekė pašalinta.")
@@ -91,7 +94,7 @@ def cart_remove(request):
 
 @require_POST
 def cart_apply_coupon(request):
-    cart = Cart(request)
+    cart = Cart.for_request(request)
     code = (request.POST.get("coupon") or "").strip()
     cart.set_coupon(code or None)
 
@@ -107,7 +110,7 @@ def cart_apply_coupon(request):
 
 @require_POST
 def cart_remove_coupon(request):
-    cart = Cart(request)
+    cart = Cart.for_request(request)
     cart.set_coupon(None)
     messages.info(request, "Nuolaidos kodas nuimtas.")
     return redirect("cart:cart_view")
@@ -2,16 +2,18 @@
 from django import forms
 from django.contrib import admin
 from django.core.exceptions import ValidationError
-from django.db.models import Count, Q, Sum
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from django.utils.http import urlencode
-from django.db.models import Sum, Max
+from django.db.models import Sum
 from django.utils.html import format_html
 from decimal import Decimal
 from adminsortable2.admin import SortableAdminMixin
 from django_ckeditor_5.widgets import CKEditor5Widget
 
-from .models import Category, Product, ProductImage, Variant, Size
+from . import images, pricing, renditions
+from .models import Category, Product, ProductImage, ScheduledPriceChange, Variant, Size
 
 # ---------- Multi-upload widget + field ----------
 class MultiFileInput(forms.ClearableFileInput):
@@ -59,12 +61,29 @@ except Exception:
     _HAS_SORTABLE = False
 
 
+def first_image_subquery(product_ref="pk"):
+    """
+    Pirmos paruoštos galerijos nuotraukos vardas kaip anotacija – changelist'ui be užklausos
+    kiekvienai eilutei (order_by().first() ignoruotų prefetch ir eitų į DB po kartą).
+    """
+    return Subquery(
+        ProductImage.objects.filter(product=OuterRef(product_ref), status=ProductImage.STATUS_READY)
+        .exclude(image="")
+        .order_by("sort", "id")
+        .values("image")[:1]
+    )
+
+
+def _thumb_html(name, height):
+    return format_html('<img src="{}" style="height:{}px;border-radius:6px;" />', renditions.url(name, "thumb"), height)
+
+
 # ================= Inlines =================
 class ProductImageInline(_BaseImageInline):
     model = ProductImage
     extra = 1
-    readonly_fields = ("preview",)
-    fields = ("preview", "image", "alt", "sort")
+    readonly_fields = ("preview", "status")
+    fields = ("preview", "image", "alt", "sort", "status")
     if _HAS_SORTABLE:
         sortable_field_name = "sort"
     verbose_name = "Drabužio kortelės nuotrauka"
@@ -96,7 +115,8 @@ class ProductAdminForm(forms.ModelForm):
         label="Įkelti kelias detalės nuotraukas",
         required=False,
         widget=MultiFileInput(attrs={"multiple": True}),
-        help_text="Pasirink kelis failus – po išsaugojimo jie atsiras žemiau „Drabužio kortelės nuotraukos“ sąraše.",
+        help_text="Pasirink kelis failus – po išsaugojimo jie atsiras žemiau „Drabužio kortelės nuotraukos“ sąraše "
+                  "ir bus apdoroti fone (būsena „Paruošta“ – rodoma parduotuvėje).",
     )
 
     # viršutiniai varianto laukai (Dydis → ModelChoiceField)
@@ -214,11 +234,8 @@ class ProductAdminForm(forms.ModelForm):
             self.save_m2m = apply_m2m  # type: ignore
 
         # masinis galerijos įkėlimas
-        files = self.cleaned_data.get("bulk_images", []) or []
-        if files:
-            start = instance.images.aggregate(m=Max("sort"))["m"] or 0
-            for i, f in enumerate(files, start=1):
-                ProductImage.objects.create(product=instance, image=f, sort=start + i)
+        # failai tik įrašomi; dekodavimas/dydžiai – `manage.py process_images` worker'yje
+        images.add_uploads(instance, self.cleaned_data.get("bulk_images", []) or [])
 
         # atnaujinam/sukuriam variantą
         v = instance.variants.first() or Variant(product=instance)
@@ -237,7 +254,7 @@ class ProductAdminForm(forms.ModelForm):
 @admin.register(Product)
 class ProductAdmin(_BaseProductAdmin):
     form = ProductAdminForm
-    list_display = ("thumb", "sku", "brand", "category", "price_col", "stock_col", "is_active", "created_at")
+    list_display = ("thumb", "sku", "brand", "category", "price_col", "stock_col", "images_col", "is_active", "created_at")
     list_filter = ("category",)
     search_fields = ("sku", "name", "brand", "description")
     prepopulated_fields = {"slug": ("name",)}
@@ -298,10 +315,29 @@ class ProductAdmin(_BaseProductAdmin):
     # --- svarbiausia: dinaminis sandėlis iš Variantų ---
     def get_queryset(self, request):
         qs = super().get_queryset(request)
+        # nuotraukų skaičiai – subquery, kad JOIN nepadaugintų atsargų sumos
+        image_counts = ProductImage.objects.filter(product=OuterRef("pk")).order_by().values("product")
         return qs.annotate(
-            _total_stock=Sum("variants__stock", filter=Q(variants__is_active=True))
+            _total_stock=Sum("variants__stock", filter=Q(variants__is_active=True)),
+            _images_total=Coalesce(Subquery(image_counts.annotate(n=Count("pk")).values("n")), 0),
+            _images_ready=Coalesce(Subquery(
+                image_counts.filter(status=ProductImage.STATUS_READY).annotate(n=Count("pk")).values("n")
+            ), 0),
+            _first_image=first_image_subquery(),
         )
 
+    @admin.display(description="Nuotraukos")
+    def images_col(self, obj):
+        # apdorojimo progresas: paruošta / viso
+        total, ready = getattr(obj, "_images_total", 0), getattr(obj, "_images_ready", 0)
+        return f"{ready}/{total}" if total != ready else total
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        n = len(form.cleaned_data.get("bulk_images") or [])
+        if n:
+            self.message_user(request, f"Priimta nuotraukų: {n}. Jos apdorojamos fone – progresas matomas stulpelyje „Nuotraukos“.")
+
     @admin.display(ordering="_total_stock", description="STOCK")
     def stock_col(self, obj):
         # rodom sumą iš aktyvių Variantų (jei None – 0)
@@ -309,43 +345,27 @@ class ProductAdmin(_BaseProductAdmin):
 
     @admin.display(description="Price")
     def price_col(self, obj):
-        if hasattr(obj, "price"):
-            return obj.price
-        v = obj.variants.order_by("price").first()
-        return v.price if v else None
+        # Product.price sinchronizuojama su variantu (Product.save) – be užklausų
+        return obj.price
 
     @admin.display(description="Preview")
     def thumb(self, obj):
-        if getattr(obj, "main_image", None):
-            try:
-                return format_html('<img src="{}" style="height:60px;border-radius:6px;" />', obj.main_image.url)
-            except Exception:
-                pass
-        img = obj.images.order_by("sort", "id").first()
-        if img and img.image:
-            return format_html('<img src="{}" style="height:60px;border-radius:6px;" />', img.image.url)
-        return "—"
+        # mažas „thumb“ dydis (catalog.renditions), ne originalas; galerija – iš _first_image anotacijos
+        name = (obj.main_image.name if obj.main_image else "") or getattr(obj, "_first_image", None)
+        return _thumb_html(name, 60) if name else "—"
 
     @admin.display(description="Panašių peržiūra")
     def related_preview(self, obj):
         if not obj or not getattr(obj, "pk", None):
             return "—"
-        items = obj.related_products.all()[:4]
+        # viena užklausa: susiję produktai kartu su pirma galerijos nuotrauka
+        items = obj.related_products.annotate(_first_image=first_image_subquery())[:4]
         if not items:
             return "—"
         blocks = []
         for p in items:
-            url = ""
-            if getattr(p, "main_image", None):
-                try:
-                    url = p.main_image.url
-                except Exception:
-                    url = ""
-            if not url:
-                im = p.images.order_by("sort", "id").first()
-                if im and im.image:
-                    url = im.image.url
-            thumb = format_html('<img src="{}" style="height:48px;border-radius:6px;" />', url) if url else "—"
+            name = (p.main_image.name if p.main_image else "") or p._first_image
+            thumb = _thumb_html(name, 48) if name else "—"
             blocks.append(format_html(
                 '<div style="display:inline-block;margin-right:8px;text-align:center;">{}'
                 '<div style="font-size:11px;color:#666;">{}</div></div>',
@@ -399,7 +419,8 @@ class VariantAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        return qs.select_related("product").prefetch_related("product__images")
+        # produkto nuotrauka – anotacija, ne prefetch visų galerijų
+        return qs.select_related("product").annotate(_first_image=first_image_subquery("product"))
 
 
     @admin.display(description="Brand", ordering="product__brand")
@@ -409,15 +430,9 @@ class VariantAdmin(admin.ModelAdmin):
 
     @admin.display(description="Preview")
     def thumb(self, obj):
-        if getattr(obj.product, "main_image", None):
-            try:
-                return format_html('<img src="{}" style="height:48px;border-radius:6px;" />', obj.product.main_image.url)
-            except Exception:
-                pass
-        img = obj.product.images.order_by("sort", "id").first()
-        if img and img.image:
-            return format_html('<img src="{}" style="height:48px;border-radius:6px;" />', img.image.url)
-        return "—"
+        main = obj.product.main_image
+        name = (main.name if main else "") or getattr(obj, "_first_image", None)
+        return _thumb_html(name, 48) if name else "—"
 
     @admin.display(description="Discount %")
     def discount_pct(self, obj):
@@ -427,31 +442,42 @@ class VariantAdmin(admin.ModelAdmin):
         return "—"
 
     # ----- Actions -----
-    def _apply_percent(self, queryset, percent: int):
-        factor = (Decimal("100") - Decimal(percent)) / Decimal("100")
-        for v in queryset:
-            if not v.compare_at_price or v.compare_at_price < v.price:
-                v.compare_at_price = v.price
-            v.price = (v.price * factor).quantize(Decimal("0.01"))
-            v.save(update_fields=["price", "compare_at_price"])
-
+    # vienas UPDATE visam pasirinkimui (catalog.pricing), ne save() kiekvienam variantui
     @admin.action(description="Taikyti −10%%")  # svarbu: dvigubas %
     def discount_10(self, request, queryset):
-        self._apply_percent(queryset, 10)
-        self.message_user(request, "Pritaikyta −10% pasirinktiems variantams.")
+        n = pricing.markdown(queryset, percent=10)
+        self.message_user(request, f"Pritaikyta −10% variantams: {n}.")
 
     @admin.action(description="Taikyti −20%%")
     def discount_20(self, request, queryset):
-        self._apply_percent(queryset, 20)
-        self.message_user(request, "Pritaikyta −20% pasirinktiems variantams.")
+        n = pricing.markdown(queryset, percent=20)
+        self.message_user(request, f"Pritaikyta −20% variantams: {n}.")
 
     @admin.action(description="Nuimti nuolaidą (atstatyti kainą)")
     def clear_discount(self, request, queryset):
-        for v in queryset:
-            if v.compare_at_price and v.compare_at_price > 0:
-                v.price = v.compare_at_price
-                v.save(update_fields=["price"])
-        self.message_user(request, "Nuolaidos nuimtos (kainos atstatytos).")
+        n = pricing.restore(queryset)
+        self.message_user(request, f"Nuolaidos nuimtos (kainos atstatytos): {n}.")
+
+
+@admin.register(ScheduledPriceChange)
+class ScheduledPriceChangeAdmin(admin.ModelAdmin):
+    list_display = ("name", "type", "value", "applies_to_all", "starts_at", "ends_at", "status", "skipped")
+    list_filter = ("status", "type")
+    search_fields = ("name",)
+    filter_horizontal = ("products", "categories")
+    readonly_fields = ("status", "cursor", "skipped", "applied_at", "ended_at")
+    fieldsets = (
+        (None, {
+            "fields": ("name", "type", "value")
+        }),
+        ("Taikymo ribos", {
+            "fields": ("applies_to_all", "products", "categories")
+        }),
+        ("Galiojimas", {
+            "description": "Kainas keičia `manage.py apply_price_changes` (cron / --every).",
+            "fields": ("starts_at", "ends_at", "status", "cursor", "skipped", "applied_at", "ended_at")
+        }),
+    )
 
 @admin.register(Category)
 class CategoryAdmin(SortableAdminMixin, admin.ModelAdmin):
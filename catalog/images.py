@@ -0,0 +1,123 @@
+# catalog/images.py — galerijos nuotraukų apdorojimo eilė (ProductImage.status)
+"""
+Admin'e įkeltos nuotraukos tik įrašomos į storage (status=pending); sunkus darbas –
+dekodavimas, EXIF valymas, dydžiai (catalog.renditions) – vyksta worker'yje:
+
+    manage.py process_images --workers 4 --every 5
+
+claim_batch()   – optimistiškai pasiima eilutes (UPDATE ... WHERE status=<buvęs>), kaip mailer;
+process_file()  – gryna funkcija be DB, vykdoma ProcessPoolExecutor procese; EXIF išvalytas
+                  failas turi kitą turinį, todėl ir kitą vardą (catalog.storage) – eilutė perrašoma;
+process_batch() – pažymi ready/failed ir vienu products_changed atnaujina sąrašą/cache.
+
+„processing“ būsenoje užstrigusios (nukritęs worker'is) po IMAGE_CLAIM_TIMEOUT vėl laisvos.
+Nepavykusi nuotrauka grąžinama į eilę su atidėjimu (next_attempt_at, kaip mailer/webhooks),
+kad sugadintas failas neišnaudotų visų bandymų iš eilės ir neužimtų worker'ių.
+"""
+import logging
+from datetime import timedelta
+from typing import List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from . import renditions
+from .models import ProductImage
+from .signals import products_changed
+from .storage import delete_if_unreferenced
+
+log = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def add_uploads(product, files, alt: str = "") -> List[ProductImage]:
+    """Masinis įkėlimas: failai į storage + vienas INSERT (užklausų skaičius nepriklauso nuo failų)."""
+    if not files:
+        return []
+    start = product.images.aggregate(m=Max("sort"))["m"] or 0
+    # signalų nereikia: pending nuotraukos vitrinoje dar nerodomos, sąrašą atnaujins process_batch()
+    return ProductImage.objects.bulk_create([
+        ProductImage(product=product, image=f, alt=alt, sort=start + i)
+        for i, f in enumerate(files, start=1)
+    ])
+
+
+def backoff(attempts: int) -> timedelta:
+    """Eksponentinis atidėjimas: 1, 2, 4 ... min., ne daugiau kaip IMAGE_MAX_BACKOFF."""
+    base = _setting("IMAGE_BACKOFF_SECONDS", 60)
+    cap = _setting("IMAGE_MAX_BACKOFF", 3600)
+    return timedelta(seconds=min(cap, base * 2 ** max(0, attempts - 1)))
+
+
+def claim_batch(limit: int = 20) -> List[ProductImage]:
+    now = timezone.now()
+    stale = now - timedelta(seconds=_setting("IMAGE_CLAIM_TIMEOUT", 600))
+    due = ProductImage.objects.filter(
+        Q(status=ProductImage.STATUS_PENDING, next_attempt_at__lte=now)
+        | Q(status=ProductImage.STATUS_PROCESSING, claimed_at__lt=stale)
+    ).order_by("id")
+
+    claimed = []
+    for pk, status, claimed_at in due.values_list("pk", "status", "claimed_at")[:limit]:
+        won = ProductImage.objects.filter(pk=pk, status=status, claimed_at=claimed_at).update(
+            status=ProductImage.STATUS_PROCESSING, claimed_at=now, attempts=F("attempts") + 1
+        )
+        if won:
+            claimed.append(pk)
+    return list(ProductImage.objects.filter(pk__in=claimed).only("pk", "product_id", "image", "attempts"))
+
+
+def process_file(name: str) -> Tuple[str, str]:
+    """Vykdoma worker'io procese. Grąžina (galutinis failo vardas, klaidos tekstas arba "")."""
+    try:
+        clean = renditions.strip_metadata(name)
+        if not renditions.has_renditions(clean) and not renditions.generate(clean):
+            raise ValueError("nepavyko sugeneruoti dydžių")
+    except Exception as e:
+        return name, f"{type(e).__name__}: {e}"[:2000]
+    return clean, ""
+
+
+def init_worker():
+    """ProcessPoolExecutor initializer: „spawn“ režimu Django dar nesukonfigūruotas."""
+    import django
+
+    django.setup()
+
+
+def process_batch(limit: int = 20, executor=None) -> Tuple[int, int]:
+    """Apdoroja iki limit nuotraukų; grąžina (ready, failed). executor=None – šiame procese."""
+    batch = claim_batch(limit)
+    if not batch:
+        return 0, 0
+    names = [img.image.name for img in batch]
+    results = executor.map(process_file, names) if executor else map(process_file, names)
+
+    ready = failed = 0
+    max_attempts = _setting("IMAGE_MAX_ATTEMPTS", 3)
+    for img, (clean, error) in zip(batch, results):
+        if not error:
+            ProductImage.objects.filter(pk=img.pk).update(
+                image=clean, status=ProductImage.STATUS_READY, processed_at=timezone.now(), last_error=""
+            )
+            if clean != img.image.name:
+                # neišvalytas originalas – jei jo nebenaudoja kita eilutė (tas pats įkėlimas kitur)
+                transaction.on_commit(lambda old=img.image.name: delete_if_unreferenced(old))
+            ready += 1
+            continue
+        ProductImage.objects.filter(pk=img.pk).update(
+            status=ProductImage.STATUS_FAILED if img.attempts >= max_attempts else ProductImage.STATUS_PENDING,
+            next_attempt_at=timezone.now() + backoff(img.attempts),
+            last_error=error,
+        )
+        failed += 1
+        log.warning("Nuotrauka #%s neapdorota (bandymas %s): %s", img.pk, img.attempts, error)
+
+    # UPDATE be signalų – sąrašą, ETag'us ir puslapių cache atnaujinam vienu kartu
+    products_changed.send(sender=ProductImage, product_ids={img.product_id for img in batch})
+    return ready, failed
@@ -0,0 +1,71 @@
+# catalog/listing.py — denormalizuoto /shop/ sąrašo (ProductListing) palaikymas
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Prefetch
+
+from .models import Product, ProductImage, Variant, ProductListing
+
+REBUILD_BATCH = 500
+
+
+def _listing_queryset():
+    return (
+        Product.objects.filter(is_active=True)
+        .select_related("category", "size")
+        .prefetch_related(
+            # tik apdorotos nuotraukos (catalog.images) – kitų dydžių dar nėra
+            Prefetch("images", queryset=ProductImage.objects.filter(status=ProductImage.STATUS_READY).order_by("sort", "id")),
+            Prefetch("variants", queryset=Variant.objects.filter(is_active=True).order_by("price", "id")),
+        )
+    )
+
+
+def build_row(product: Product) -> ProductListing:
+    """Sudaro ProductListing eilutę iš produkto su jau prefetch'intais images/variants."""
+    variants = list(product.variants.all())     # aktyvūs, surikiuoti pagal kainą
+    images = list(product.images.all())
+    cheapest = variants[0] if variants else None
+    thumb = images[0] if images else None
+
+    return ProductListing(
+        product=product,
+        name=product.name,
+        slug=product.slug,
+        brand=product.brand or "",
+        category=product.category,
+        category_slug=product.category.slug,
+        category_name=product.category.name,
+        min_price=cheapest.price if cheapest else None,
+        max_price=variants[-1].price if variants else None,
+        compare_at_price=cheapest.compare_at_price if cheapest else None,
+        in_stock=any(v.stock > 0 for v in variants),
+        thumbnail=(thumb.image.name or "") if thumb and thumb.image else "",
+        thumbnail_alt=thumb.alt if thumb else "",
+        size_order=product.size.order if product.size_id else None,
+        created_at=product.created_at,
+    )
+
+
+def refresh_listing(product_ids: Iterable[int]) -> None:
+    """
+    Perskaičiuoja nurodytų produktų sąrašo eilutes.
+    Neaktyvūs / ištrinti produktai iš sąrašo pašalinami.
+    """
+    ids = {int(pk) for pk in product_ids if pk}
+    if not ids:
+        return
+    rows = [build_row(p) for p in _listing_queryset().filter(pk__in=ids)]
+    with transaction.atomic():
+        ProductListing.objects.filter(product_id__in=ids).delete()
+        ProductListing.objects.bulk_create(rows)
+
+
+def rebuild_listing() -> int:
+    """Pilnas perstatymas (pvz. po importo). Grąžina eilučių skaičių."""
+    ids = list(Product.objects.order_by("pk").values_list("pk", flat=True))
+    with transaction.atomic():
+        ProductListing.objects.exclude(product_id__in=Product.objects.filter(is_active=True)).delete()
+        for i in range(0, len(ids), REBUILD_BATCH):
+            refresh_listing(ids[i:i + REBUILD_BATCH])
+    return ProductListing.objects.count()
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from catalog.pricing import run_due
+
+
+class Command(BaseCommand):
+    help = "Taiko ir atstato suplanuotas akcijas (ScheduledPriceChange) partijomis"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Variantų viename UPDATE")
+        parser.add_argument("--every", type=float, default=0,
+                            help="Tikrinti kas N sekundžių (0 – pritaikyti kas priklauso ir baigti, pvz. cron'ui)")
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                close_old_connections()
+                n = run_due(batch_size=max(1, options["batch_size"]))
+                total += n
+                if n:
+                    continue
+                if not options["every"]:
+                    break
+                time.sleep(options["every"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Price changes: {total} variants updated."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from catalog import renditions
+from catalog.models import Product, ProductImage
+
+
+class Command(BaseCommand):
+    help = "Sugeneruoja trūkstamus (arba --force – visus) produktų nuotraukų dydžius"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Pergeneruoti ir jau esamus")
+
+    def handle(self, *args, **options):
+        names = set(ProductImage.objects.exclude(image="").values_list("image", flat=True))
+        for main, hover in Product.objects.values_list("main_image", "hover_image"):
+            names.update(n for n in (main, hover) if n)
+
+        done = skipped = failed = 0
+        for name in sorted(names):
+            if not options["force"] and renditions.has_renditions(name):
+                skipped += 1
+            elif renditions.generate(name):
+                done += 1
+            else:
+                failed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"Renditions: {done} generated, {skipped} up to date, {failed} failed."
+        ))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+from catalog.stock import expire_holds
+
+class Command(BaseCommand):
+    help = "Išvalo pasenusias checkout likučio rezervacijas (StockHold)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--every", type=int, default=0,
+                            help="Kartoti kas N sekundžių (0 – vieną kartą, pvz. cron'ui)")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        every = options["every"]
+        while True:
+            n = expire_holds(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Expired stock holds: {n}."))
+            if not every:
+                return
+            time.sleep(every)
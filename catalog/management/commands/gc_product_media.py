@@ -0,0 +1,53 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog import renditions
+from catalog.storage import PREFIX, product_storage, referenced_names
+
+
+def _walk(storage, path):
+    dirs, files = storage.listdir(path)
+    for f in files:
+        yield f"{path}/{f}"
+    for d in dirs:
+        yield from _walk(storage, f"{path}/{d}")
+
+
+class Command(BaseCommand):
+    help = "Ištrina products/ failus (originalus ir dydžius), į kuriuos nebesiremia DB"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Tik parodyti, ką trintų")
+        parser.add_argument("--min-age-hours", type=float, default=24,
+                            help="Neliesti naujesnių failų (įkėlimas gali būti dar neįrašytas į DB)")
+
+    def handle(self, *args, **options):
+        keep = set()
+        for name in referenced_names():
+            keep.add(name)
+            keep.update(renditions.rendition_names(name))
+
+        if not os.path.isdir(product_storage.path(PREFIX)):
+            self.stdout.write(self.style.SUCCESS("Orphans removed: 0 files, 0 bytes."))
+            return
+
+        cutoff = time.time() - options["min_age_hours"] * 3600
+        removed = freed = 0
+        for name in _walk(product_storage, PREFIX):
+            if name in keep:
+                continue
+            path = product_storage.path(name)
+            if os.path.getmtime(path) > cutoff:
+                continue
+            size = os.path.getsize(path)
+            if options["verbosity"] > 1 or options["dry_run"]:
+                self.stdout.write(name)
+            if not options["dry_run"]:
+                product_storage.delete(name)
+            removed += 1
+            freed += size
+
+        verb = "would be removed" if options["dry_run"] else "removed"
+        self.stdout.write(self.style.SUCCESS(f"Orphans {verb}: {removed} files, {freed} bytes."))
@@ -0,0 +1,50 @@
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from catalog import renditions
+from catalog.models import Product, ProductImage
+from catalog.signals import products_changed
+from catalog.storage import delete_if_unreferenced, is_content_addressed, product_storage, referenced_names
+
+
+class Command(BaseCommand):
+    help = "Perkelia senas products/<SKU>/ nuotraukas į turinio vardais pavadintą storage (su dydžiais)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Tik parodyti, ką darytų")
+
+    def handle(self, *args, **options):
+        legacy = sorted(n for n in referenced_names() if not is_content_addressed(n))
+        moved = missing = 0
+        for old in legacy:
+            if not product_storage.exists(old):
+                missing += 1
+                self.stderr.write(f"Nėra failo: {old}")
+                continue
+            if options["dry_run"]:
+                self.stdout.write(f"{old} → ?")
+                continue
+
+            with product_storage.open(old, "rb") as fh:
+                new = product_storage.save(old, File(fh))   # dublikatai susilieja į vieną failą
+            if not renditions.has_renditions(new):
+                renditions.generate(new)
+
+            with transaction.atomic():
+                ids = set(ProductImage.objects.filter(image=old).values_list("product_id", flat=True))
+                ProductImage.objects.filter(image=old).update(image=new)
+                for field in ("main_image", "hover_image"):
+                    qs = Product.objects.filter(**{field: old})
+                    ids.update(qs.values_list("pk", flat=True))
+                    qs.update(**{field: new})
+                transaction.on_commit(lambda old=old: delete_if_unreferenced(old))
+            # UPDATE be signalų – sąrašo miniatiūros, ETag'ai, puslapių cache
+            products_changed.send(sender=ProductImage, product_ids=ids)
+            moved += 1
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{old} → {new}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Media migrated: {moved} files, {missing} missing, {len(legacy) - moved - missing} skipped."
+        ))
@@ -0,0 +1,36 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from catalog.images import init_worker, process_batch
+
+
+class Command(BaseCommand):
+    help = "Apdoroja įkeltas galerijos nuotraukas (EXIF valymas, dydžiai) procesų pool'e"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Lygiagrečių procesų skaičius")
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument("--every", type=float, default=0,
+                            help="Tikrinti eilę kas N sekundžių (0 – apdoroti kas yra ir baigti, pvz. cron'ui)")
+
+    def handle(self, *args, **options):
+        ready = failed = 0
+        # DB jungtys neturi būti paveldėtos vaikiniuose procesuose (jie DB nenaudoja)
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=max(1, options["workers"]), initializer=init_worker) as pool:
+            try:
+                while True:
+                    close_old_connections()
+                    r, f = process_batch(options["batch_size"], executor=pool)
+                    ready, failed = ready + r, failed + f
+                    if r or f:
+                        continue
+                    if not options["every"]:
+                        break
+                    time.sleep(options["every"])
+            except KeyboardInterrupt:
+                pass
+        self.stdout.write(self.style.SUCCESS(f"Images processed: {ready} ready, {failed} failed."))
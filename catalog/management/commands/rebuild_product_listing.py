@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from catalog.listing import rebuild_listing
+
+class Command(BaseCommand):
+    help = "Perstato denormalizuotą /shop/ sąrašą (ProductListing) iš Product/Variant/ProductImage"
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding product listing...")
+        n = rebuild_listing()
+        self.stdout.write(self.style.SUCCESS(f"Product listing rebuilt: {n} rows."))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from catalog.search import rebuild_index
+
+class Command(BaseCommand):
+    help = "Perstato produktų paieškos indeksą (FTS5 / tsvector)"
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding search index...")
+        n = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt: {n} products."))
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_listing(apps, schema_editor):
+    """Užpildo ProductListing iš esamų aktyvių produktų (ta pati logika kaip catalog.listing.build_row)."""
+    Product = apps.get_model("catalog", "Product")
+    ProductListing = apps.get_model("catalog", "ProductListing")
+
+    rows = []
+    for p in Product.objects.filter(is_active=True).select_related("category", "size"):
+        variants = list(p.variants.filter(is_active=True).order_by("price", "id"))
+        thumb = p.images.order_by("sort", "id").first()
+        cheapest = variants[0] if variants else None
+        rows.append(ProductListing(
+            product_id=p.pk,
+            name=p.name,
+            slug=p.slug,
+            brand=p.brand or "",
+            category_id=p.category_id,
+            category_slug=p.category.slug,
+            category_name=p.category.name,
+            min_price=cheapest.price if cheapest else None,
+            max_price=variants[-1].price if variants else None,
+            compare_at_price=cheapest.compare_at_price if cheapest else None,
+            in_stock=any(v.stock > 0 for v in variants),
+            thumbnail=(thumb.image.name or "") if thumb and thumb.image else "",
+            thumbnail_alt=thumb.alt if thumb else "",
+            size_order=p.size.order if p.size_id else None,
+            created_at=p.created_at,
+        ))
+    ProductListing.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0008_alter_product_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductListing',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to='catalog.product')),
+                ('name', models.CharField(max_length=200)),
+                ('slug', models.SlugField(max_length=220)),
+                ('brand', models.CharField(blank=True, default='', max_length=120)),
+                ('category_slug', models.SlugField(max_length=140)),
+                ('category_name', models.CharField(max_length=120)),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('compare_at_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('in_stock', models.BooleanField(default=False)),
+                ('thumbnail', models.CharField(blank=True, default='', max_length=255)),
+                ('thumbnail_alt', models.CharField(blank=True, default='', max_length=160)),
+                ('size_order', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.category')),
+            ],
+            options={
+                'ordering': ['-product_id'],
+                'indexes': [models.Index(fields=['category_slug', '-product'], name='listing_cat_id_idx'), models.Index(fields=['-created_at'], name='listing_created_idx')],
+            },
+        ),
+        migrations.RunPython(populate_listing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:15
+
+import django.db.models.deletion
+import html
+import re
+import unicodedata
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+FTS_TABLE = "catalog_search_fts"
+PG_TSVECTOR = (
+    "(setweight(to_tsvector('simple', name), 'A') || "
+    "setweight(to_tsvector('simple', body), 'B'))"
+)
+
+
+def _fold(text):
+    # ta pati logika kaip catalog.search.fold (migracijoje – savarankiška kopija)
+    text = html.unescape(strip_tags(text or ""))
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(re.findall(r"[0-9a-z]+", text.lower()))
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            "USING fts5(name, body, tokenize='unicode61 remove_diacritics 2')"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS catalog_search_tsv_idx "
+            f"ON catalog_productsearchdocument USING gin ({PG_TSVECTOR})"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS catalog_search_tsv_idx")
+
+
+def populate_search_index(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+    Doc = apps.get_model("catalog", "ProductSearchDocument")
+    docs = [
+        Doc(
+            product_id=p.pk,
+            name=_fold(" ".join(filter(None, [p.brand, p.name, p.sku]))),
+            body=_fold(p.description),
+        )
+        for p in Product.objects.filter(is_active=True)
+    ]
+    Doc.objects.bulk_create(docs, batch_size=500)
+    if schema_editor.connection.vendor == "sqlite":
+        with schema_editor.connection.cursor() as cur:
+            cur.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, body) VALUES (%s, %s, %s)",
+                [(d.product_id, d.name, d.body) for d in docs],
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0009_productlisting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='catalog.product')),
+                ('name', models.TextField(blank=True, default='')),
+                ('body', models.TextField(blank=True, default='')),
+            ],
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(populate_search_index, migrations.RunPython.noop),
+    ]
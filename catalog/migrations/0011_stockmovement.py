@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0010_productsearchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.PositiveBigIntegerField(blank=True, db_index=True, null=True)),
+                ('qty', models.IntegerField(help_text='Neigiamas – nurašymas, teigiamas – papildymas')),
+                ('reason', models.CharField(choices=[('sale', 'Pardavimas')], default='sale', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('variant', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_movements', to='catalog.variant')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'constraints': [models.UniqueConstraint(fields=('order_id', 'variant', 'reason'), name='stock_movement_once_per_order')],
+            },
+        ),
+    ]
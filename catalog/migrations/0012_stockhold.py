@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0011_stockmovement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.PositiveBigIntegerField(blank=True, db_index=True, null=True)),
+                ('qty', models.PositiveIntegerField()),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='catalog.variant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['variant', 'expires_at'], name='stock_hold_active_idx'), models.Index(fields=['expires_at'], name='stock_hold_expires_idx')],
+            },
+        ),
+    ]
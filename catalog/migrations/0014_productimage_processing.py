@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0013_product_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='last_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        # jau esamos nuotraukos rodomos kaip anksčiau (dydžiai – `manage.py build_renditions`)
+        migrations.AddField(
+            model_name='productimage',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Laukia'), ('processing', 'Apdorojama'), ('ready', 'Paruošta'), ('failed', 'Nepavyko')], default='ready', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='productimage',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Laukia'), ('processing', 'Apdorojama'), ('ready', 'Paruošta'), ('failed', 'Nepavyko')], default='pending', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='productimage',
+            index=models.Index(fields=['status', 'id'], name='product_image_status_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:47
+
+import catalog.models
+import catalog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0014_productimage_processing'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='hover_image',
+            field=models.ImageField(blank=True, null=True, storage=catalog.storage.get_product_storage, upload_to=catalog.models.product_upload_to),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='main_image',
+            field=models.ImageField(blank=True, null=True, storage=catalog.storage.get_product_storage, upload_to=catalog.models.product_upload_to),
+        ),
+        migrations.AlterField(
+            model_name='productimage',
+            name='image',
+            field=models.ImageField(storage=catalog.storage.get_product_storage, upload_to=catalog.models.product_upload_to),
+        ),
+    ]
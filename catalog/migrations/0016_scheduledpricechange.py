@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:53
+
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0015_product_media_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledPriceChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120)),
+                ('type', models.CharField(choices=[('percent', '% nuo kainos'), ('fixed', 'Fiksuota suma')], default='percent', max_length=10)),
+                ('value', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))])),
+                ('applies_to_all', models.BooleanField(default=False)),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField(blank=True, help_text='Tuščia – kainos neatstatomos', null=True)),
+                ('status', models.CharField(choices=[('scheduled', 'Suplanuota'), ('applying', 'Taikoma'), ('active', 'Galioja'), ('restoring', 'Atstatoma'), ('ended', 'Baigta')], default='scheduled', max_length=10)),
+                ('cursor', models.PositiveBigIntegerField(default=0)),
+                ('applied_at', models.DateTimeField(blank=True, null=True)),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('categories', models.ManyToManyField(blank=True, related_name='price_changes', to='catalog.category')),
+                ('products', models.ManyToManyField(blank=True, related_name='price_changes', to='catalog.product')),
+            ],
+            options={
+                'ordering': ['-starts_at'],
+                'indexes': [models.Index(fields=['status', 'starts_at'], name='price_change_due_idx')],
+            },
+        ),
+    ]
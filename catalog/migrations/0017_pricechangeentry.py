@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 00:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0016_scheduledpricechange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduledpricechange',
+            name='skipped',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='PriceChangeEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('compare_at_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('change', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='catalog.scheduledpricechange')),
+                ('variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_change_entries', to='catalog.variant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['variant', 'change'], name='price_change_entry_variant_idx')],
+                'constraints': [models.UniqueConstraint(fields=('change', 'variant'), name='price_change_entry_unique')],
+            },
+        ),
+    ]
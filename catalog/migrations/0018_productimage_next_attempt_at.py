@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 00:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0017_pricechangeentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='productimage',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='product_image_due_idx'),
+        ),
+    ]
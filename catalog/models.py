@@ -1,16 +1,24 @@
 # catalog/models.py
+from decimal import Decimal
+
 from django.db import models, transaction, IntegrityError
-from django.core.validators import RegexValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator, RegexValidator
+from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.html import format_html
 from django.apps import apps
 
+from .storage import get_product_storage
+
 # ---- helper upload kelias: products/<SKU>/filename ----
 def product_upload_to(instance, filename):
     """
     Failų saugojimo kelias pagal SKU:
     - Product: products/<product.sku>/<filename>
     - ProductImage: products/<product.sku>/<filename>
+    Produktų nuotraukų laukai naudoja catalog.storage (vardas pagal turinį) – iš čia
+    galiausiai lieka tik plėtinys; funkcija paliekama migracijoms ir kitiems laukams.
     """
     sku = None
     # jei keliame Product nuotraukas
@@ -91,8 +99,8 @@ class Product(models.Model):
     description = models.TextField(blank=True)
 
     # --- 2 kortelės nuotraukos (listingo) ---
-    main_image = models.ImageField(upload_to=product_upload_to, blank=True, null=True)
-    hover_image = models.ImageField(upload_to=product_upload_to, blank=True, null=True)
+    main_image = models.ImageField(upload_to=product_upload_to, storage=get_product_storage, blank=True, null=True)
+    hover_image = models.ImageField(upload_to=product_upload_to, storage=get_product_storage, blank=True, null=True)
 
     # --- galerija detalei tvarkoma ProductImage modelyje ---
 
@@ -106,6 +114,7 @@ class Product(models.Model):
 
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)   # sitemap lastmod
 
     class Meta:
         ordering = ["-created_at"]
@@ -188,19 +197,52 @@ class Product(models.Model):
 
 
 class ProductImage(models.Model):
-    """Papildomos nuotraukos produkto detalei (kortelei atidarius)."""
+    """
+    Papildomos nuotraukos produkto detalei (kortelei atidarius).
+    Įkėlus – status=pending; EXIF valymą ir dydžius (catalog.renditions) atlieka
+    worker'is (manage.py process_images, žr. catalog/images.py). Vitrinoje rodomos tik „ready“.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_PROCESSING = "processing"
+    STATUS_READY = "ready"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Laukia"),
+        (STATUS_PROCESSING, "Apdorojama"),
+        (STATUS_READY, "Paruošta"),
+        (STATUS_FAILED, "Nepavyko"),
+    ]
+
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="images")
-    image = models.ImageField(upload_to=product_upload_to)
+    image = models.ImageField(upload_to=product_upload_to, storage=get_product_storage)
     alt = models.CharField(max_length=160, blank=True)
     sort = models.PositiveIntegerField(default=0)
 
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)   # nepavykus – atidedama (catalog.images)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+
     class Meta:
         ordering = ["sort", "id"]
+        indexes = [
+            models.Index(fields=["status", "id"], name="product_image_status_idx"),
+            models.Index(fields=["status", "next_attempt_at"], name="product_image_due_idx"),
+        ]
+
+    @property
+    def is_ready(self):
+        return self.status == self.STATUS_READY
 
     def preview(self):
-        if self.image:
-            return format_html('<img src="{}" style="height:80px; border-radius:6px;" />', self.image.url)
-        return "—"
+        if not self.image:
+            return "—"
+        if not self.is_ready:
+            return self.get_status_display()
+        from .renditions import url
+        return format_html('<img src="{}" style="height:80px; border-radius:6px;" />', url(self.image, "thumb"))
     preview.short_description = "Preview"
 
 
@@ -243,5 +285,202 @@ class Variant(models.Model):
         return f"{base} {opts}" if opts else base
 
 
+class ProductListing(models.Model):
+    """
+    Denormalizuota /shop/ sąrašo eilutė – po vieną aktyviam produktui.
+    Palaikoma catalog.listing.refresh_listing() iš Product/Variant/ProductImage signalų,
+    kad sąrašas būtų skaitomas viena užklausa be JOIN'ų ir prefetch'ų.
+    """
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True, related_name="listing"
+    )
+    name = models.CharField(max_length=200)
+    slug = models.SlugField(max_length=220)
+    brand = models.CharField(max_length=120, blank=True, default="")
+
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="+")
+    category_slug = models.SlugField(max_length=140)
+    category_name = models.CharField(max_length=120)
+
+    # pigiausio aktyvaus varianto kaina (+ jo „kaina be nuolaidos“) ir kainų rėžiai
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    compare_at_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    in_stock = models.BooleanField(default=False)
+
+    # pirmoji galerijos nuotrauka (kelias storage'e, ne URL)
+    thumbnail = models.CharField(max_length=255, blank=True, default="")
+    thumbnail_alt = models.CharField(max_length=160, blank=True, default="")
+
+    size_order = models.PositiveSmallIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-product_id"]
+        indexes = [
+            models.Index(fields=["category_slug", "-product"], name="listing_cat_id_idx"),
+            models.Index(fields=["-created_at"], name="listing_created_idx"),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def thumbnail_url(self):
+        if not self.thumbnail:
+            return None
+        return get_product_storage().url(self.thumbnail)
+
+
+class ProductSearchDocument(models.Model):
+    """
+    Paieškos dokumentas: HTML nuvalytas, diakritikai „suplokštinti“ tekstas (ą→a, š→s...).
+    Invertuotas indeksas virš jo – SQLite FTS5 lentelė arba PostgreSQL tsvector GIN indeksas
+    (žr. catalog.search ir migraciją 0010).
+    """
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True, related_name="search_document"
+    )
+    name = models.TextField(blank=True, default="")
+    body = models.TextField(blank=True, default="")
+
+    def __str__(self):
+        return self.name
+
 
+class StockMovement(models.Model):
+    """Atsargų žurnalas: kiekvienas likučio pokytis (pvz. pardavimas) – atskira eilutė."""
+    REASON_SALE = "sale"
+    REASON_CHOICES = [(REASON_SALE, "Pardavimas")]
 
+    variant = models.ForeignKey(Variant, on_delete=models.PROTECT, related_name="stock_movements")
+    # be FK į checkout.Order (kaip CouponRedemption.order_id) – catalog nepriklauso nuo checkout
+    order_id = models.PositiveBigIntegerField(null=True, blank=True, db_index=True)
+    qty = models.IntegerField(help_text="Neigiamas – nurašymas, teigiamas – papildymas")
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES, default=REASON_SALE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        constraints = [
+            # idempotencija: tas pats užsakymas tą pačią atmainą nurašo tik kartą
+            models.UniqueConstraint(fields=["order_id", "variant", "reason"], name="stock_movement_once_per_order"),
+        ]
+
+    def __str__(self):
+        return f"{self.variant_id}: {self.qty:+d} ({self.reason})"
+
+
+class StockHold(models.Model):
+    """
+    Laikinas likučio rezervavimas checkout'e. Galioja iki expires_at; apmokėjus
+    paverčiamas StockMovement įrašu (catalog.stock.record_sale), pasenę išvalomi
+    komanda expire_stock_holds.
+    """
+    variant = models.ForeignKey(Variant, on_delete=models.CASCADE, related_name="holds")
+    # užpildomas, kai užsakymas sukuriamas (rezervuojam dar prieš jį – žr. catalog.stock.reserve)
+    order_id = models.PositiveBigIntegerField(null=True, blank=True, db_index=True)
+    qty = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # available = stock − SUM(qty) WHERE variant=? AND expires_at > now
+            models.Index(fields=["variant", "expires_at"], name="stock_hold_active_idx"),
+            models.Index(fields=["expires_at"], name="stock_hold_expires_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.variant_id}: {self.qty} iki {self.expires_at:%H:%M}"
+
+
+class ScheduledPriceChange(models.Model):
+    """
+    Suplanuota nuolaida (akcija): nuo starts_at variantų kainos sumažinamos, po ends_at –
+    atstatomos į buvusias prieš akciją (PriceChangeEntry). Taiko `manage.py apply_price_changes`
+    partijomis (catalog.pricing.advance); cursor – paskutinio apdoroto Variant id, kad
+    nutrūkęs taikymas tęstųsi ten, kur baigė.
+    """
+    PERCENT = "percent"
+    FIXED = "fixed"
+    TYPE_CHOICES = [(PERCENT, "% nuo kainos"), (FIXED, "Fiksuota suma")]
+
+    STATUS_SCHEDULED = "scheduled"
+    STATUS_APPLYING = "applying"
+    STATUS_ACTIVE = "active"
+    STATUS_RESTORING = "restoring"
+    STATUS_ENDED = "ended"
+    LIVE_STATUSES = (STATUS_APPLYING, STATUS_ACTIVE, STATUS_RESTORING)
+    STATUS_CHOICES = [
+        (STATUS_SCHEDULED, "Suplanuota"),
+        (STATUS_APPLYING, "Taikoma"),
+        (STATUS_ACTIVE, "Galioja"),
+        (STATUS_RESTORING, "Atstatoma"),
+        (STATUS_ENDED, "Baigta"),
+    ]
+
+    name = models.CharField(max_length=120)
+    type = models.CharField(max_length=10, choices=TYPE_CHOICES, default=PERCENT)
+    value = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal("0.01"))])
+
+    # kur taikoma
+    applies_to_all = models.BooleanField(default=False)
+    products = models.ManyToManyField(Product, blank=True, related_name="price_changes")
+    categories = models.ManyToManyField(Category, blank=True, related_name="price_changes")
+
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField(null=True, blank=True, help_text="Tuščia – kainos neatstatomos")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_SCHEDULED)
+    cursor = models.PositiveBigIntegerField(default=0)
+    # variantai, kurių netaikyta, nes jau dalyvauja kitoje galiojančioje akcijoje
+    skipped = models.PositiveIntegerField(default=0)
+    applied_at = models.DateTimeField(null=True, blank=True)
+    ended_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-starts_at"]
+        indexes = [
+            models.Index(fields=["status", "starts_at"], name="price_change_due_idx"),
+        ]
+
+    def __str__(self):
+        t = "%" if self.type == self.PERCENT else "€"
+        return f"{self.name} (−{self.value}{t})"
+
+    def clean(self):
+        if self.type == self.PERCENT and self.value is not None and self.value >= 100:
+            raise ValidationError({"value": "Procentinė nuolaida turi būti mažesnė nei 100."})
+        if self.ends_at and self.starts_at and self.ends_at <= self.starts_at:
+            raise ValidationError({"ends_at": "Pabaiga turi būti vėliau nei pradžia."})
+
+    def variants(self):
+        """Akcijos apimami variantai (ir neaktyvūs – atstatant kaina turi grįžti visiems)."""
+        qs = Variant.objects.all()
+        if not self.applies_to_all:
+            qs = qs.filter(
+                models.Q(product__in=self.products.all()) | models.Q(product__category__in=self.categories.all())
+            )
+        return qs
+
+
+class PriceChangeEntry(models.Model):
+    """Akcijos paliestas variantas ir jo kainos prieš akciją – pagal jas atstatoma (catalog.pricing)."""
+    change = models.ForeignKey(ScheduledPriceChange, on_delete=models.CASCADE, related_name="entries")
+    variant = models.ForeignKey(Variant, on_delete=models.CASCADE, related_name="price_change_entries")
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    compare_at_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["change", "variant"], name="price_change_entry_unique"),
+        ]
+        indexes = [
+            # „ar variantas jau kitoje akcijoje?“
+            models.Index(fields=["variant", "change"], name="price_change_entry_variant_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.change_id}: {self.variant_id} ({self.price})"
@@ -0,0 +1,218 @@
+# catalog/pricing.py — masiniai kainų keitimai (nuolaidos ir jų atstatymas) vienu UPDATE
+"""
+Rankiniai veiksmai (VariantAdmin):
+    markdown(variants, percent=10)   – price = price × 0.9, compare_at_price = sąrašo kaina
+    markdown(variants, amount=5)     – price = max(price − 5, 0)
+    restore(variants)                – price = compare_at_price, compare_at_price = NULL
+„Sąrašo“ kaina – compare_at_price, jei ji didesnė už price, kitaip price. Nuolaida
+skaičiuojama nuo dabartinės kainos, todėl jau nukainuota prekė niekada nepabrangsta.
+
+Nepriklausomai nuo eilučių skaičiaus – 3 užklausos: produktų id, UPDATE variantams ir
+Product.price sinchronizavimas (Product.save ją perrašo į variantą, todėl turi sutapti).
+Bulk UPDATE signalų nesiunčia – sąrašą/ETag'us/puslapių cache atnaujina products_changed.
+
+Suplanuotos akcijos (ScheduledPriceChange, advance()/run_due()): prieš keičiant kainas
+kiekvieno varianto kainos įrašomos į PriceChangeEntry, nauja kaina skaičiuojama nuo jų
+(pakartotinai pritaikyta partija duoda tą patį), o pasibaigus atstatomos būtent jos ir
+tik tiems variantams, kuriuos akcija palietė. Variantas vienu metu gali dalyvauti tik
+vienoje galiojančioje akcijoje – kitos jį praleidžia (ScheduledPriceChange.skipped).
+"""
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest, Round
+from django.utils import timezone
+
+from .models import PriceChangeEntry, Product, ScheduledPriceChange, Variant
+from .signals import products_changed
+
+log = logging.getLogger(__name__)
+
+PRICE_FIELD = DecimalField(max_digits=10, decimal_places=2)
+
+
+def _list_price():
+    """Variant/PriceChangeEntry eilutės „sąrašo“ kaina (abu modeliai turi price ir compare_at_price)."""
+    return Case(
+        When(compare_at_price__gt=F("price"), then=F("compare_at_price")),
+        default=F("price"),
+        output_field=PRICE_FIELD,
+    )
+
+
+def _marked_down(base, percent=None, amount=None):
+    """Nauja kaina nuo `base` išraiškos."""
+    if (percent is None) == (amount is None):
+        raise ValueError("Nurodykite percent arba amount (vieną iš jų).")
+    if percent is not None:
+        percent = Decimal(percent)
+        if not 0 < percent < 100:
+            raise ValueError("percent turi būti tarp 0 ir 100.")
+        factor = (Decimal("100") - percent) / Decimal("100")
+        return Round(base * Value(factor, output_field=PRICE_FIELD), 2, output_field=PRICE_FIELD)
+    amount = Decimal(amount)
+    if amount <= 0:
+        raise ValueError("amount turi būti teigiama suma.")
+    return Greatest(base - Value(amount, output_field=PRICE_FIELD), Value(Decimal("0")), output_field=PRICE_FIELD)
+
+
+def _sync_product_prices(product_ids) -> None:
+    """Product.price = pigiausio aktyvaus varianto kaina (vienas UPDATE su subquery)."""
+    cheapest = Variant.objects.filter(product=OuterRef("pk"), is_active=True).order_by("price").values("price")[:1]
+    Product.objects.filter(pk__in=product_ids).update(
+        price=Coalesce(Subquery(cheapest), F("price")),
+        updated_at=timezone.now(),   # sitemap lastmod – kaina puslapyje pasikeitė
+    )
+
+
+def _apply(variants, **values) -> tuple:
+    """UPDATE + Product.price; kviesti transakcijoje. Grąžina (eilučių skaičius, produktų id)."""
+    variants = variants.order_by()
+    product_ids = set(variants.values_list("product_id", flat=True))
+    if not product_ids:
+        return 0, product_ids
+    n = variants.update(**values)
+    _sync_product_prices(product_ids)
+    return n, product_ids
+
+
+def _changed(product_ids) -> None:
+    # sąrašas atnaujinamas toje pačioje transakcijoje; cache imtuvai patys laukia commit'o
+    if product_ids:
+        products_changed.send(sender=Variant, product_ids=product_ids)
+
+
+def markdown(variants, percent=None, amount=None) -> int:
+    """Taiko nuolaidą visiems queryset'o variantams; grąžina pakeistų eilučių skaičių."""
+    price = _marked_down(F("price"), percent, amount)
+    with transaction.atomic():
+        n, product_ids = _apply(variants, price=price, compare_at_price=_list_price())
+        _changed(product_ids)
+    return n
+
+
+def restore(variants) -> int:
+    """Atstato kainą iš compare_at_price ten, kur ji buvo sumažinta."""
+    with transaction.atomic():
+        n, product_ids = _apply(
+            variants.filter(compare_at_price__gt=F("price")),
+            price=F("compare_at_price"),
+            compare_at_price=None,
+        )
+        _changed(product_ids)
+    return n
+
+
+# ---- Suplanuotos akcijos ------------------------------------------------------
+
+def _transition(change: ScheduledPriceChange, status: str, **fields) -> bool:
+    """Būsenos keitimas tik jei jos dar nepakeitė kitas worker'is (kaip mailer.claim_batch)."""
+    won = ScheduledPriceChange.objects.filter(pk=change.pk, status=change.status).update(status=status, **fields)
+    if won:
+        change.status = status
+        for name, value in fields.items():
+            setattr(change, name, value)
+    return bool(won)
+
+
+def _apply_batch(change: ScheduledPriceChange, batch_size: int) -> int:
+    rows = list(
+        change.variants().filter(pk__gt=change.cursor).order_by("pk")
+        .values_list("pk", "price", "compare_at_price")[:batch_size]
+    )
+    if not rows:
+        return 0
+    ids = [pk for pk, _, _ in rows]
+    taken = set(
+        PriceChangeEntry.objects.filter(variant_id__in=ids, change__status__in=ScheduledPriceChange.LIVE_STATUSES)
+        .exclude(change=change).values_list("variant_id", flat=True)
+    )
+    if taken:
+        log.warning("Akcija %s: %s variantų jau kitoje akcijoje – praleidžiama", change.pk, len(taken))
+
+    entry = PriceChangeEntry.objects.filter(change=change, variant=OuterRef("pk"))
+    before = Subquery(entry.values("price")[:1], output_field=PRICE_FIELD)
+    list_before = Subquery(entry.annotate(p=_list_price()).values("p")[:1], output_field=PRICE_FIELD)
+    percent, amount = (change.value, None) if change.type == ScheduledPriceChange.PERCENT else (None, change.value)
+
+    with transaction.atomic():
+        # ignore_conflicts – pakartotinai partijai lieka pirmą kartą užfiksuotos kainos
+        PriceChangeEntry.objects.bulk_create(
+            [PriceChangeEntry(change=change, variant_id=pk, price=price, compare_at_price=compare)
+             for pk, price, compare in rows if pk not in taken],
+            ignore_conflicts=True,
+        )
+        _, product_ids = _apply(
+            Variant.objects.filter(pk__in=[pk for pk in ids if pk not in taken]),
+            price=_marked_down(before, percent, amount),
+            compare_at_price=list_before,
+        )
+        ScheduledPriceChange.objects.filter(pk=change.pk).update(cursor=ids[-1], skipped=F("skipped") + len(taken))
+        _changed(product_ids)
+    change.cursor = ids[-1]
+    return len(ids)
+
+
+def _restore_batch(change: ScheduledPriceChange, batch_size: int) -> int:
+    ids = list(
+        change.entries.filter(variant_id__gt=change.cursor).order_by("variant_id")
+        .values_list("variant_id", flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+    entry = PriceChangeEntry.objects.filter(change=change, variant=OuterRef("pk"))
+    with transaction.atomic():
+        _, product_ids = _apply(
+            Variant.objects.filter(pk__in=ids),
+            price=Subquery(entry.values("price")[:1], output_field=PRICE_FIELD),
+            compare_at_price=Subquery(entry.values("compare_at_price")[:1], output_field=PRICE_FIELD),
+        )
+        ScheduledPriceChange.objects.filter(pk=change.pk).update(cursor=ids[-1])
+        _changed(product_ids)
+    change.cursor = ids[-1]
+    return len(ids)
+
+
+def advance(change: ScheduledPriceChange, batch_size: int = 1000, now=None) -> int:
+    """
+    Vienas akcijos žingsnis: iki batch_size variantų nuo cursor (vienas UPDATE) arba
+    būsenos perjungimas. Grąžina paliestų variantų skaičių (0 – šiuo metu nėra ką daryti).
+    """
+    now = now or timezone.now()
+    ending = change.ends_at is not None and change.ends_at <= now
+
+    if change.status == ScheduledPriceChange.STATUS_SCHEDULED and ending:
+        # taip ir nepradėta (worker'is nevyko) – atstatyti nėra ko
+        _transition(change, ScheduledPriceChange.STATUS_ENDED, ended_at=now)
+        return 0
+    if ending and change.status in (ScheduledPriceChange.STATUS_APPLYING, ScheduledPriceChange.STATUS_ACTIVE):
+        if not _transition(change, ScheduledPriceChange.STATUS_RESTORING, cursor=0):
+            return 0
+    elif change.status == ScheduledPriceChange.STATUS_SCHEDULED and change.starts_at <= now:
+        if not _transition(change, ScheduledPriceChange.STATUS_APPLYING, cursor=0):
+            return 0
+
+    if change.status == ScheduledPriceChange.STATUS_RESTORING:
+        n = _restore_batch(change, batch_size)
+        if not n:
+            _transition(change, ScheduledPriceChange.STATUS_ENDED, ended_at=now)
+        return n
+    if change.status == ScheduledPriceChange.STATUS_APPLYING:
+        n = _apply_batch(change, batch_size)
+        if not n:
+            _transition(change, ScheduledPriceChange.STATUS_ACTIVE, applied_at=now)
+        return n
+    return 0
+
+
+def run_due(batch_size: int = 1000, now=None) -> int:
+    """Po vieną žingsnį kiekvienai laikui atėjusiai akcijai; grąžina paliestų variantų skaičių."""
+    now = now or timezone.now()
+    due = ScheduledPriceChange.objects.filter(
+        Q(status=ScheduledPriceChange.STATUS_SCHEDULED, starts_at__lte=now)
+        | Q(status__in=[ScheduledPriceChange.STATUS_APPLYING, ScheduledPriceChange.STATUS_RESTORING])
+        | Q(status=ScheduledPriceChange.STATUS_ACTIVE, ends_at__lte=now)
+    ).order_by("starts_at", "id")
+    return sum(advance(change, batch_size, now) for change in due)
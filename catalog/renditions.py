@@ -0,0 +1,186 @@
+# catalog/renditions.py — produktų nuotraukų išvestiniai dydžiai (WebP + JPEG) ir srcset
+"""
+Šalia originalo (catalog.storage – vardas pagal turinį) sugeneruojami fiksuoti dydžiai:
+
+    products/3f/3fa9…c2.jpg
+    products/3f/3fa9…c2.card-320.webp
+    products/3f/3fa9…c2.card-320.jpg
+    ...
+
+Kelias apskaičiuojamas iš originalo pavadinimo, todėl šablonams ir API URL'ams nereikia
+nei DB, nei storage užklausų. Generuojama įkėlimo metu (catalog.signals), senoms
+nuotraukoms – `manage.py build_renditions`.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .storage import product_storage
+
+log = logging.getLogger(__name__)
+
+# pavadinimas -> (pločiai srcset'ui, aukštis/plotis santykis kirpimui arba None – be kirpimo)
+RENDITIONS = {
+    "thumb": ((80, 160), 1.0),            # admin peržiūra
+    "card": ((160, 320, 480), None),      # /shop/ sąrašas, detalės galerija
+    "detail": ((480, 960, 1440), None),   # didelė nuotrauka
+    "og": ((1200,), 630 / 1200),          # og:image (tik JPEG naudojamas)
+}
+FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}), "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True})}
+CONTENT_TYPES = {"webp": "image/webp", "jpg": "image/jpeg"}
+
+
+def _name_of(image) -> str:
+    """Priima FieldFile arba kelią storage'e."""
+    return (getattr(image, "name", image) or "") if image else ""
+
+
+def rendition_name(original: str, kind: str, width: int, fmt: str) -> str:
+    stem, _ = os.path.splitext(original)
+    return f"{stem}.{kind}-{width}.{fmt}"
+
+
+def rendition_names(original: str):
+    for kind, (widths, _) in RENDITIONS.items():
+        for width in widths:
+            for fmt in FORMATS:
+                yield rendition_name(original, kind, width, fmt)
+
+
+def url(image, kind: str, width: int | None = None, fmt: str = "jpg", storage=None) -> str | None:
+    """Vieno dydžio URL; width=None – didžiausias."""
+    name = _name_of(image)
+    if not name:
+        return None
+    widths = RENDITIONS[kind][0]
+    return (storage or product_storage).url(rendition_name(name, kind, width or widths[-1], fmt))
+
+
+def srcset(image, kind: str, fmt: str, storage=None) -> str:
+    """"…/foto.card-160.webp 160w, …/foto.card-320.webp 320w" (tuščias, jei nuotraukos nėra)."""
+    name = _name_of(image)
+    if not name:
+        return ""
+    storage = storage or product_storage
+    return ", ".join(
+        f"{storage.url(rendition_name(name, kind, w, fmt))} {w}w" for w in RENDITIONS[kind][0]
+    )
+
+
+def sources(image, kind: str, storage=None) -> dict:
+    """API/šablonams: {"src": jpg URL, "webp": srcset, "jpg": srcset} arba {}."""
+    if not _name_of(image):
+        return {}
+    widths = RENDITIONS[kind][0]
+    return {
+        "src": url(image, kind, widths[min(1, len(widths) - 1)], "jpg", storage),
+        **{fmt: srcset(image, kind, fmt, storage) for fmt in FORMATS},
+    }
+
+
+# ---- Generavimas -------------------------------------------------------------
+
+def _resize(img: Image.Image, width: int, ratio: float | None) -> Image.Image:
+    if ratio is not None:
+        return ImageOps.fit(img, (width, round(width * ratio)), Image.LANCZOS)
+    if img.width <= width:
+        return img   # nedidinam – tik perkoduojam
+    return img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+
+
+def _encode(img: Image.Image, fmt: str) -> bytes:
+    pil_format, options = FORMATS[fmt]
+    if pil_format == "JPEG" and img.mode != "RGB":
+        # permatomumas JPEG'e – balta fone
+        background = Image.new("RGB", img.size, "white")
+        rgba = img.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        img = background
+    buf = BytesIO()
+    img.save(buf, pil_format, **options)
+    return buf.getvalue()
+
+
+def _load(original: str, storage) -> Image.Image:
+    with storage.open(original, "rb") as fh:
+        img = Image.open(fh)
+        img.load()
+    img = ImageOps.exif_transpose(img)   # telefonų nuotraukos – pagal EXIF orientaciją
+    return img if img.mode in ("RGB", "RGBA") else img.convert("RGBA" if "A" in img.getbands() else "RGB")
+
+
+def generate(image, storage=None) -> int:
+    """Sugeneruoja visus dydžius (perrašo esamus). Grąžina failų skaičių; 0 – nepavyko."""
+    name = _name_of(image)
+    if not name:
+        return 0
+    storage = storage or product_storage
+    try:
+        img = _load(name, storage)
+    except Exception:
+        log.warning("Nuotraukos %s nepavyko atidaryti – dydžiai negeneruoti", name, exc_info=True)
+        return 0
+
+    written = 0
+    for kind, (widths, ratio) in RENDITIONS.items():
+        for width in widths:
+            resized = _resize(img, width, ratio)
+            for fmt in FORMATS:
+                storage.put(rendition_name(name, kind, width, fmt), ContentFile(_encode(resized, fmt)))
+                written += 1
+    return written
+
+
+# formatai, kuriuos perrašom be metaduomenų (kiti – pvz. animuotas GIF – paliekami kaip yra)
+STRIP_FORMATS = {"JPEG": "JPEG", "MPO": "JPEG", "PNG": "PNG", "WEBP": "WEBP"}
+
+
+def strip_metadata(image, storage=None) -> str:
+    """
+    Įrašo originalo kopiją be EXIF (GPS, kameros duomenų); orientacija pritaikoma pikseliams.
+    JPEG be pasukimo perrašomas su quality="keep" – be papildomo kokybės praradimo.
+    Grąžina naujo failo vardą (turinys kitas – vardas irgi) arba tą patį, jei valyti nebuvo ko.
+    Senojo failo netrina – jis gali būti bendras kelioms eilutėms.
+    """
+    name = _name_of(image)
+    storage = storage or product_storage
+    with storage.open(name, "rb") as fh:
+        img = Image.open(fh)
+        img.load()
+    target = STRIP_FORMATS.get(img.format)
+    exif = img.getexif()
+    if not target or (not exif and "exif" not in img.info):
+        return name
+
+    options = {"icc_profile": img.info.get("icc_profile")} if img.info.get("icc_profile") else {}
+    if exif.get(0x0112, 1) != 1:   # Orientation
+        img = ImageOps.exif_transpose(img)
+        if target == "JPEG":
+            options["quality"] = 90
+    elif target == "JPEG":
+        options["quality"] = "keep"
+    buf = BytesIO()
+    img.save(buf, target, **options)
+    return storage.save(name, ContentFile(buf.getvalue()))
+
+
+def has_renditions(image, storage=None) -> bool:
+    name = _name_of(image)
+    if not name:
+        return False
+    return (storage or product_storage).exists(rendition_name(name, "card", RENDITIONS["card"][0][0], "webp"))
+
+
+def delete(image, storage=None) -> None:
+    name = _name_of(image)
+    if not name:
+        return
+    storage = storage or product_storage
+    for target in rendition_names(name):
+        try:
+            storage.delete(target)
+        except OSError:
+            pass
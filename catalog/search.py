@@ -0,0 +1,203 @@
+# catalog/search.py — produktų paieška per iš anksto sudarytą invertuotą indeksą
+"""
+Indeksas:
+  - ProductSearchDocument: name/body be HTML, mažosiomis, be diakritikų (ą→a, ž→z...).
+  - SQLite: FTS5 lentelė catalog_search_fts (rowid = product_id), bm25 rikiavimas.
+  - PostgreSQL: GIN indeksas ant setweight(name,'A') || setweight(body,'B') tsvector'iaus.
+  - Kiti DB: atsarginis icontains per suplokštintus laukus.
+
+Užklausos žodžiai jungiami AND ir ieškomi pagal prefiksą („hood“ → „hoodie“).
+Pavadinimo atitikmenys sveria daugiau nei aprašymo.
+
+filter_ranked() atitikmenis ir aktualumą įjungia į pačią sąrašo užklausą (IN subquery +
+koreliuotas rangas), todėl kategorijos filtras ir puslapiavimas taikomi visiems atitikmenims,
+o ne pirmiems MAX_RESULTS. MAX_RESULTS riboja tik search_product_ids().
+"""
+import html
+import re
+import unicodedata
+from typing import Iterable, List
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, Case, F, FloatField, Func, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+
+from .models import Product, ProductSearchDocument
+
+FTS_TABLE = "catalog_search_fts"
+MAX_RESULTS = 500
+NAME_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+# tas pats išraiškos tekstas turi sutapti su GIN indeksu (migracija 0010)
+PG_TSVECTOR = (
+    "(setweight(to_tsvector('simple', name), 'A') || "
+    "setweight(to_tsvector('simple', body), 'B'))"
+)
+
+
+def fold(text: str) -> str:
+    """HTML → tekstas, mažosios raidės, be diakritikų („Šiltas džemperis“ → „siltas dzemperis“)."""
+    text = html.unescape(strip_tags(text or ""))
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(_TOKEN_RE.findall(text.lower()))
+
+
+def tokenize(query: str) -> List[str]:
+    return fold(query).split()
+
+
+# ----- Indeksavimas -----------------------------------------------------------
+
+def index_products(product_ids: Iterable[int]) -> None:
+    """Perindeksuoja nurodytus produktus (neaktyvūs iš indekso pašalinami)."""
+    ids = {int(pk) for pk in product_ids if pk}
+    if not ids:
+        return
+    docs = [
+        ProductSearchDocument(
+            product_id=pk,
+            name=fold(" ".join(filter(None, [brand, name, sku]))),
+            body=fold(description),
+        )
+        for pk, brand, name, sku, description in Product.objects.filter(pk__in=ids, is_active=True)
+        .values_list("pk", "brand", "name", "sku", "description")
+    ]
+    with transaction.atomic():
+        remove_products(ids)
+        ProductSearchDocument.objects.bulk_create(docs)
+        if connection.vendor == "sqlite" and docs:
+            with connection.cursor() as cur:
+                cur.executemany(
+                    f"INSERT INTO {FTS_TABLE} (rowid, name, body) VALUES (%s, %s, %s)",
+                    [(d.product_id, d.name, d.body) for d in docs],
+                )
+
+
+def remove_products(product_ids: Iterable[int]) -> None:
+    ids = [int(pk) for pk in product_ids]
+    if not ids:
+        return
+    ProductSearchDocument.objects.filter(product_id__in=ids).delete()
+    if connection.vendor == "sqlite":
+        placeholders = ", ".join(["%s"] * len(ids))
+        with connection.cursor() as cur:
+            cur.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", ids)
+
+
+def rebuild_index(batch_size: int = 500) -> int:
+    ids = list(Product.objects.order_by("pk").values_list("pk", flat=True))
+    with transaction.atomic():
+        ProductSearchDocument.objects.all().delete()
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cur:
+                cur.execute(f"DELETE FROM {FTS_TABLE}")
+        for i in range(0, len(ids), batch_size):
+            index_products(ids[i:i + batch_size])
+    return ProductSearchDocument.objects.count()
+
+
+# ----- Paieška ----------------------------------------------------------------
+
+def search_product_ids(query: str, limit: int = MAX_RESULTS) -> List[int]:
+    """Grąžina produktų ID pagal aktualumą (geriausi pirmi)."""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    if connection.vendor == "sqlite":
+        match = _fts_match(tokens)
+        sql = (
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({FTS_TABLE}, {NAME_WEIGHT}, {BODY_WEIGHT}) LIMIT %s"
+        )
+        params = [match, limit]
+    elif connection.vendor == "postgresql":
+        sql = (
+            f"SELECT product_id FROM {ProductSearchDocument._meta.db_table} "
+            f"WHERE {PG_TSVECTOR} @@ to_tsquery('simple', %s) "
+            f"ORDER BY ts_rank({PG_TSVECTOR}, to_tsquery('simple', %s)) DESC LIMIT %s"
+        )
+        tsquery = _tsquery(tokens)
+        params = [tsquery, tsquery, limit]
+    else:
+        return _fallback_ids(tokens, limit)
+
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+        return [row[0] for row in cur.fetchall()]
+
+
+def _fts_match(tokens: List[str]) -> str:
+    return " AND ".join(f'"{t}"*' for t in tokens)
+
+
+def _tsquery(tokens: List[str]) -> str:
+    return " & ".join(f"{t}:*" for t in tokens)
+
+
+def _fallback_documents(tokens: List[str]):
+    cond = Q()
+    name_hits = Q()
+    for t in tokens:
+        cond &= Q(name__contains=t) | Q(body__contains=t)
+        name_hits &= Q(name__contains=t)
+    return ProductSearchDocument.objects.filter(cond).annotate(
+        _rank=Case(When(name_hits, then=Value(1)), default=Value(0), output_field=IntegerField())
+    )
+
+
+def _fallback_ids(tokens: List[str], limit: int) -> List[int]:
+    return list(
+        _fallback_documents(tokens)
+        .order_by("-_rank", "-product_id")
+        .values_list("product_id", flat=True)[:limit]
+    )
+
+
+class _FtsRank(Func):
+    """-bm25() vienam produktui: (SELECT ... WHERE fts MATCH %s AND rowid = <laukas>)."""
+    template = (
+        f"(SELECT -bm25({FTS_TABLE}, {NAME_WEIGHT}, {BODY_WEIGHT}) FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH %(expressions)s)"
+    )
+    arg_joiner = " AND rowid = "
+    output_field = FloatField()
+
+
+def _matches_and_rank(tokens: List[str], field: str):
+    """(atitinkančių produktų id subquery, rango išraiška – didesnis aktualesnis)."""
+    if connection.vendor == "sqlite":
+        match = _fts_match(tokens)
+        return (
+            RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]),
+            _FtsRank(Value(match), F(field)),
+        )
+    if connection.vendor == "postgresql":
+        tsquery = _tsquery(tokens)
+        docs = ProductSearchDocument.objects.filter(
+            RawSQL(f"{PG_TSVECTOR} @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField())
+        )
+        rank = RawSQL(f"ts_rank({PG_TSVECTOR}, to_tsquery('simple', %s))", [tsquery], output_field=FloatField())
+    else:
+        docs = _fallback_documents(tokens)
+        rank = F("_rank")
+    ranked = docs.filter(product_id=OuterRef(field)).annotate(_search_rank=rank).values("_search_rank")[:1]
+    return docs.values("product_id"), Subquery(ranked, output_field=FloatField())
+
+
+def filter_ranked(qs, query: str, field: str = "product_id"):
+    """Apriboja queryset'ą paieškos rezultatais ir surikiuoja pagal aktualumą (viena užklausa)."""
+    tokens = tokenize(query)
+    if not tokens:
+        return qs.none()
+    matches, rank = _matches_and_rank(tokens, field)
+    return (
+        qs.filter(**{f"{field}__in": matches})
+        .annotate(_search_rank=rank)
+        .order_by("-_search_rank", f"-{field}")
+    )
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Category, Product, Variant, ProductImage
+from . import renditions
+from .models import Category, Product, Variant, ProductImage, ProductListing
 
 class CategoryMiniSerializer(serializers.ModelSerializer):
     class Meta:
@@ -7,9 +8,15 @@ class CategoryMiniSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "slug")
 
 class ProductImageSerializer(serializers.ModelSerializer):
+    # {"card": {"src", "webp", "jpg"}, "detail": {...}} – srcset eilutės <picture>/<img> žymoms
+    renditions = serializers.SerializerMethodField()
+
     class Meta:
         model = ProductImage
-        fields = ("image", "alt")
+        fields = ("image", "alt", "renditions")
+
+    def get_renditions(self, obj):
+        return {kind: renditions.sources(obj.image, kind) for kind in ("card", "detail")}
 
 class VariantSerializer(serializers.ModelSerializer):
     class Meta:
@@ -27,20 +34,72 @@ class ProductListSerializer(serializers.ModelSerializer):
         model = Product
         fields = ("id","name","slug","category","thumbnail","min_price","max_price","in_stock")
 
+    # Visi keturi laukai skaičiuojami vienu praėjimu iš prefetch'intų (atmintyje esančių)
+    # images/variants – jokių .order_by()/.filter(), kurie išmestų prefetch'ą ir darytų N+1.
+    def _summary(self, obj):
+        cached = getattr(obj, "_list_summary", None)
+        if cached is not None:
+            return cached
+
+        thumb = None
+        for img in obj.images.all():
+            if thumb is None or (img.sort, img.id) < (thumb.sort, thumb.id):
+                thumb = img
+
+        min_price = max_price = None
+        in_stock = False
+        for v in obj.variants.all():
+            if min_price is None or v.price < min_price:
+                min_price = v.price
+            if max_price is None or v.price > max_price:
+                max_price = v.price
+            if v.is_active and v.stock > 0:
+                in_stock = True
+
+        cached = obj._list_summary = {
+            "thumbnail": thumb.image.url if thumb and thumb.image else None,
+            "min_price": float(min_price) if min_price is not None else None,
+            "max_price": float(max_price) if max_price is not None else None,
+            "in_stock": in_stock,
+        }
+        return cached
+
     def get_thumbnail(self, obj):
-        img = obj.images.order_by("sort","id").first()
-        return img.image.url if img else None
+        return self._summary(obj)["thumbnail"]
 
     def get_min_price(self, obj):
-        v = obj.variants.order_by("price").first()
-        return float(v.price) if v else None
+        return self._summary(obj)["min_price"]
 
     def get_max_price(self, obj):
-        v = obj.variants.order_by("-price").first()
-        return float(v.price) if v else None
+        return self._summary(obj)["max_price"]
 
     def get_in_stock(self, obj):
-        return obj.variants.filter(stock__gt=0, is_active=True).exists()
+        return self._summary(obj)["in_stock"]
+
+class ProductListingSerializer(serializers.ModelSerializer):
+    """Tas pats formatas kaip ProductListSerializer, tik iš denormalizuotos ProductListing eilutės."""
+    id = serializers.IntegerField(source="product_id", read_only=True)
+    category = serializers.SerializerMethodField()
+    thumbnail = serializers.CharField(source="thumbnail_url", read_only=True)
+    thumbnail_srcset = serializers.SerializerMethodField()
+    min_price = serializers.SerializerMethodField()
+    max_price = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProductListing
+        fields = ("id","name","slug","category","thumbnail","thumbnail_srcset","min_price","max_price","in_stock")
+
+    def get_thumbnail_srcset(self, obj):
+        return renditions.sources(obj.thumbnail, "card") or None
+
+    def get_category(self, obj):
+        return {"id": obj.category_id, "name": obj.category_name, "slug": obj.category_slug}
+
+    def get_min_price(self, obj):
+        return float(obj.min_price) if obj.min_price is not None else None
+
+    def get_max_price(self, obj):
+        return float(obj.max_price) if obj.max_price is not None else None
 
 class ProductDetailSerializer(serializers.ModelSerializer):
     category = CategoryMiniSerializer()
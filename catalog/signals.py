@@ -1,29 +1,183 @@
-import os
-from django.db.models.signals import post_delete, pre_save
-from django.dispatch import receiver
-from .models import ProductImage
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import Signal, receiver
+from shop import pagecache
+from . import renditions, versions
+from .storage import delete_if_unreferenced
+from .listing import refresh_listing
+from .search import index_products, remove_products
+from .models import Category, Product, ProductImage, ProductListing, Size, Variant
+
+# Siunčiamas po masinių (UPDATE ... be .save()) pakeitimų: kwargs product_ids=set[int]
+products_changed = Signal()
+
+def _delete_image_files(name):
+    """
+    Originalas + jo dydžiai; tik po commit'o (atšaukus transakciją failai lieka) ir tik jei
+    tas pats turinys nenaudojamas kitur (catalog.storage – vienodi failai saugomi vieną kartą).
+    """
+    if name:
+        transaction.on_commit(lambda: delete_if_unreferenced(name))
+
+@receiver(post_init, sender=ProductImage, dispatch_uid="image_track_original")
+def remember_original_image(sender, instance, **kwargs):
+    # įkelto failo vardas – kad pre_save nereikėtų ProductImage.objects.get(); .only() be image – None
+    field = instance.__dict__.get("image")
+    instance._original_image = getattr(field, "name", field)
 
 @receiver(post_delete, sender=ProductImage)
 def delete_file_on_image_delete(sender, instance, **kwargs):
-    """Pašalina failą iš disko, kai ištrini ProductImage įrašą DB."""
-    if instance.image and hasattr(instance.image, "path") and os.path.isfile(instance.image.path):
-        try:
-            os.remove(instance.image.path)
-        except OSError:
-            pass
+    """Pašalina failą (ir jo dydžius) iš disko, kai ištrini ProductImage įrašą DB."""
+    _delete_image_files(instance.image.name)
 
 @receiver(pre_save, sender=ProductImage)
 def delete_old_file_on_change(sender, instance, **kwargs):
     """Pašalina seną failą, kai tame pačiame įraše įkeli naują nuotrauką."""
-    if not instance.pk:
-        return  # naujas įrašas, senos nuotraukos nėra
-    try:
-        old = ProductImage.objects.get(pk=instance.pk)
-    except ProductImage.DoesNotExist:
-        return
-    if old.image and old.image != instance.image:
-        if hasattr(old.image, "path") and os.path.isfile(old.image.path):
-            try:
-                os.remove(old.image.path)
-            except OSError:
-                pass
+    old = getattr(instance, "_original_image", None)
+    if instance.pk and old and old != instance.image.name:
+        _delete_image_files(old)
+
+
+# ---- ProductListing (denormalizuotas /shop/ sąrašas) sinchronizavimas ----
+
+@receiver(post_save, sender=Product, dispatch_uid="listing_product_saved")
+def listing_on_product_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_listing([instance.pk])
+
+@receiver(post_save, sender=Variant, dispatch_uid="listing_variant_saved")
+@receiver(post_delete, sender=Variant, dispatch_uid="listing_variant_deleted")
+@receiver(post_save, sender=ProductImage, dispatch_uid="listing_image_saved")
+@receiver(post_delete, sender=ProductImage, dispatch_uid="listing_image_deleted")
+def listing_on_child_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # trinant patį Product (cascade) – eilutė išsitrins kartu su produktu
+    if isinstance(kwargs.get("origin"), Product):
+        return
+    refresh_listing([instance.product_id])
+
+@receiver(post_save, sender=Category, dispatch_uid="listing_category_saved")
+def listing_on_category_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    ProductListing.objects.filter(category=instance).update(
+        category_slug=instance.slug, category_name=instance.name
+    )
+
+@receiver(post_save, sender=Size, dispatch_uid="listing_size_saved")
+def listing_on_size_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    ProductListing.objects.filter(product__size=instance).update(size_order=instance.order)
+
+
+@receiver(products_changed, dispatch_uid="listing_products_changed")
+def listing_on_bulk_change(sender, product_ids, **kwargs):
+    refresh_listing(product_ids)
+
+# ---- Paieškos indeksas (catalog.search) ----
+
+@receiver(post_save, sender=Product, dispatch_uid="search_product_saved")
+def search_on_product_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_products([instance.pk])
+
+@receiver(post_delete, sender=Product, dispatch_uid="search_product_deleted")
+def search_on_product_delete(sender, instance, **kwargs):
+    remove_products([instance.pk])
+
+
+# ---- Versijų žymos (catalog.versions) – ETag/304 katalogo puslapiams ----
+# Žymos keliamos po commit'o: anksčiau pakeltą žymą lygiagretus request'as susietų su dar
+# senais duomenimis ir klientai gautų 304 su pasenusiu turiniu.
+
+def _touch_on_commit(*scopes):
+    transaction.on_commit(lambda: versions.touch(*scopes))
+
+
+@receiver(pre_save, sender=Product, dispatch_uid="versions_product_presave")
+def versions_on_slug_change(sender, instance, raw=False, **kwargs):
+    # pervadinus slug, senas URL turi nebeatsakinėti 304
+    if raw or not instance.pk:
+        return
+    old = Product.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+    if old and old != instance.slug:
+        _touch_on_commit(f"product:{old}")
+
+@receiver(post_save, sender=Product, dispatch_uid="versions_product_saved")
+@receiver(post_delete, sender=Product, dispatch_uid="versions_product_deleted")
+def versions_on_product_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _touch_on_commit("listing", f"product:{instance.slug}")
+
+@receiver(post_save, sender=Variant, dispatch_uid="versions_variant_saved")
+@receiver(post_delete, sender=Variant, dispatch_uid="versions_variant_deleted")
+@receiver(post_save, sender=ProductImage, dispatch_uid="versions_image_saved")
+@receiver(post_delete, sender=ProductImage, dispatch_uid="versions_image_deleted")
+def versions_on_child_change(sender, instance, raw=False, **kwargs):
+    if raw or isinstance(kwargs.get("origin"), Product):
+        return
+    product_id = instance.product_id
+    transaction.on_commit(lambda: versions.touch_products([product_id]))
+
+@receiver(post_save, sender=Category, dispatch_uid="versions_category_saved")
+@receiver(post_delete, sender=Category, dispatch_uid="versions_category_deleted")
+@receiver(post_save, sender=Size, dispatch_uid="versions_size_saved")
+def versions_on_category_change(sender, raw=False, **kwargs):
+    if not raw:
+        _touch_on_commit("listing", "categories")
+
+@receiver(products_changed, dispatch_uid="versions_products_changed")
+def versions_on_bulk_change(sender, product_ids, **kwargs):
+    product_ids = set(product_ids)
+    transaction.on_commit(lambda: versions.touch_products(product_ids))
+
+
+# ---- Pilnų puslapių cache (shop.pagecache) ----
+
+@receiver(post_save, sender=Product, dispatch_uid="pagecache_product_saved")
+@receiver(post_delete, sender=Product, dispatch_uid="pagecache_product_deleted")
+@receiver(post_save, sender=Variant, dispatch_uid="pagecache_variant_saved")
+@receiver(post_delete, sender=Variant, dispatch_uid="pagecache_variant_deleted")
+@receiver(post_save, sender=ProductImage, dispatch_uid="pagecache_image_saved")
+@receiver(post_delete, sender=ProductImage, dispatch_uid="pagecache_image_deleted")
+@receiver(post_save, sender=Category, dispatch_uid="pagecache_category_saved")
+@receiver(post_delete, sender=Category, dispatch_uid="pagecache_category_deleted")
+@receiver(post_save, sender=Size, dispatch_uid="pagecache_size_saved")
+@receiver(products_changed, dispatch_uid="pagecache_products_changed")
+def pagecache_on_catalog_change(sender, raw=False, **kwargs):
+    if not raw:
+        # po commit'o – kitaip lygiagretus request'as spėtų į naują kartą įdėti seną HTML
+        transaction.on_commit(lambda: pagecache.bump("catalog"))
+
+
+# ---- Nuotraukų dydžiai (catalog.renditions) – tik naujai įkeltiems failams ----
+
+IMAGE_FIELDS = {Product: ("main_image", "hover_image"), ProductImage: ("image",)}
+
+def _new_uploads(instance, fields):
+    # neįrašytas (_committed=False) failas = ką tik įkeltas; po save jis jau bus storage'e
+    return [f for f in fields if getattr(instance, f) and not getattr(instance, f)._committed]
+
+@receiver(pre_save, sender=Product, dispatch_uid="renditions_product_presave")
+def renditions_mark_uploads(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._new_uploads = _new_uploads(instance, IMAGE_FIELDS[sender])
+
+@receiver(post_save, sender=Product, dispatch_uid="renditions_product_saved")
+def renditions_generate(sender, instance, raw=False, **kwargs):
+    # kortelės 2 nuotraukos – iškart; galerija – per worker'į (žemiau)
+    for field in getattr(instance, "_new_uploads", ()):
+        renditions.generate(getattr(instance, field))
+    instance._new_uploads = []
+
+@receiver(pre_save, sender=ProductImage, dispatch_uid="renditions_image_presave")
+def renditions_queue_upload(sender, instance, raw=False, **kwargs):
+    # nauja galerijos nuotrauka (ar pakeistas failas) – į catalog.images eilę
+    if not raw and _new_uploads(instance, IMAGE_FIELDS[sender]):
+        instance.status = ProductImage.STATUS_PENDING
+        instance.attempts = 0
+        instance.last_error = ""
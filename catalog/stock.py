@@ -0,0 +1,136 @@
+# catalog/stock.py — atsargų žurnalas, rezervacijos ir masinis likučių nurašymas
+"""
+Likučio modelis:
+    available = Variant.stock − SUM(aktyvūs StockHold.qty)
+
+Checkout'e prekės rezervuojamos (reserve) be ilgų Variant eilučių užraktų: rezervacija
+įrašoma ir iškart patikrinama, ar bendra rezervuota suma neviršija likučio; jei viršija –
+atšaukiama. Apmokėjus record_sale nurašo stock ir panaikina užsakymo rezervacijas.
+Pasenusios rezervacijos nebeskaičiuojamos, o komanda expire_stock_holds jas išvalo.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import StockHold, StockMovement, Variant
+from .signals import products_changed
+
+
+class OutOfStock(Exception):
+    """Rezervuoti nepavyko – variant_ids atmainoms trūksta likučio."""
+
+    def __init__(self, variant_ids):
+        self.variant_ids = list(variant_ids)
+        super().__init__(f"Trūksta likučio: {self.variant_ids}")
+
+
+def _qty_by_variant(lines: Iterable[Tuple[int, int]]) -> Dict[int, int]:
+    qty_by_variant = defaultdict(int)
+    for variant_id, qty in lines:
+        if qty > 0:
+            qty_by_variant[int(variant_id)] += int(qty)
+    return dict(qty_by_variant)
+
+
+def available_stock(variant_ids: Iterable[int]) -> Dict[int, int]:
+    """{variant_id: stock − aktyvios rezervacijos} viena užklausa (indeksas stock_hold_active_idx)."""
+    held = Coalesce(Sum("holds__qty", filter=Q(holds__expires_at__gt=timezone.now())), 0)
+    rows = Variant.objects.filter(pk__in=list(variant_ids)).annotate(held=held).values_list("pk", "stock", "held")
+    return {pk: stock - held for pk, stock, held in rows}
+
+
+def reserve(lines: Iterable[Tuple[int, int]], ttl_minutes: Optional[int] = None) -> List[int]:
+    """
+    Rezervuoja [(variant_id, qty), ...]; grąžina StockHold id sąrašą (vėliau attach_holds).
+    Kviesti ne transakcijos viduje: rezervacija turi būti matoma kitiems pirkėjams
+    dar prieš tikrinant likutį, kitaip du lygiagretūs checkout'ai vienas kito nepamatytų.
+    """
+    qty_by_variant = _qty_by_variant(lines)
+    if not qty_by_variant:
+        return []
+    ttl = ttl_minutes if ttl_minutes is not None else getattr(settings, "STOCK_HOLD_TTL_MINUTES", 30)
+    expires_at = timezone.now() + timedelta(minutes=ttl)
+
+    holds = StockHold.objects.bulk_create([
+        StockHold(variant_id=vid, qty=qty, expires_at=expires_at) for vid, qty in qty_by_variant.items()
+    ])
+    hold_ids = [h.pk for h in holds]
+
+    # savo rezervacija jau įskaičiuota – neigiamas likutis reiškia, kad pritrūko
+    short = [vid for vid, free in available_stock(qty_by_variant).items() if free < 0]
+    if short:
+        release_holds(hold_ids)
+        raise OutOfStock(short)
+    return hold_ids
+
+
+def attach_holds(hold_ids: List[int], order_id: int) -> None:
+    StockHold.objects.filter(pk__in=hold_ids).update(order_id=order_id)
+
+
+def release_holds(hold_ids: List[int]) -> None:
+    StockHold.objects.filter(pk__in=hold_ids).delete()
+
+
+def release_order_holds(order_id: int) -> int:
+    """Nepavykęs/atšauktas mokėjimas – užsakymo rezervuotos prekės vėl laisvos kitiems."""
+    return StockHold.objects.filter(order_id=order_id).delete()[0]
+
+
+def expire_holds(batch_size: int = 1000) -> int:
+    """Ištrina pasenusias rezervacijas partijomis; grąžina ištrintų skaičių."""
+    total = 0
+    while True:
+        ids = list(
+            StockHold.objects.filter(expires_at__lte=timezone.now()).values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return total
+        total += StockHold.objects.filter(pk__in=ids).delete()[0]
+
+
+def record_sale(order_id: int, lines: Iterable[Tuple[int, int]]) -> bool:
+    """
+    Nurašo užsakymo eilutes [(variant_id, qty), ...] vienu UPDATE ... CASE sakiniu,
+    įrašo po StockMovement eilutę kiekvienai atmainai ir panaikina užsakymo rezervacijas.
+
+    Idempotentiška pagal order_id: pakartotinis kvietimas (webhook retry, success puslapio
+    fallback) nieko nebekeičia ir grąžina False.
+    """
+    qty_by_variant = _qty_by_variant(lines)
+    if not qty_by_variant:
+        return False
+
+    if StockMovement.objects.filter(order_id=order_id, reason=StockMovement.REASON_SALE).exists():
+        return False
+
+    try:
+        with transaction.atomic():
+            # žurnalas pirmas – unikalumo apribojimas sustabdo lygiagretų antrą nurašymą
+            StockMovement.objects.bulk_create([
+                StockMovement(variant_id=vid, order_id=order_id, qty=-qty, reason=StockMovement.REASON_SALE)
+                for vid, qty in qty_by_variant.items()
+            ])
+            Variant.objects.filter(pk__in=qty_by_variant).update(
+                stock=Case(
+                    *[
+                        When(pk=vid, then=Greatest(F("stock") - Value(qty), Value(0)))
+                        for vid, qty in qty_by_variant.items()
+                    ],
+                    default=F("stock"),
+                    output_field=IntegerField(),
+                )
+            )
+            StockHold.objects.filter(order_id=order_id).delete()
+    except IntegrityError:
+        return False
+
+    product_ids = Variant.objects.filter(pk__in=qty_by_variant).values_list("product_id", flat=True)
+    products_changed.send(sender=Variant, product_ids=set(product_ids))
+    return True
@@ -0,0 +1,115 @@
+# catalog/storage.py — produktų nuotraukų storage: failo vardas = turinio SHA-256
+"""
+    products/3f/3fa9…c2.jpg               ← originalas (vardas iš turinio)
+    products/3f/3fa9…c2.card-320.webp     ← dydžiai (catalog.renditions), taip pat nekintami
+
+- Tas pats failas įkeltas kelis kartus (ar kitam produktui) – saugomas vieną kartą.
+- URL niekada nekeičia turinio, todėl naršyklės gali jį cache'inti metams
+  (žr. serve_product_media).
+- Kadangi failas gali būti bendras kelioms eilutėms, trinama tik kai į jį nebesiremia
+  nei ProductImage, nei Product (is_referenced()); likučius šluoja `manage.py gc_product_media`.
+"""
+import hashlib
+import os
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.http import Http404
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+PREFIX = "products"
+# products/<2 simboliai>/<64 hex>[.<dydis>-<plotis>].<ext>
+CAS_RE = re.compile(rf"^{PREFIX}/([0-9a-f]{{2}})/\1[0-9a-f]{{62}}(\.[a-z]+-\d+)?\.[a-z0-9]+$")
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def save(self, name, content, max_length=None):
+        """Įrašo originalą vardu pagal turinį; jei toks jau yra – tik grąžina vardą."""
+        if name is None:
+            name = content.name
+        digest = hashlib.sha256()
+        if hasattr(content, "seek"):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, "seek"):
+            content.seek(0)
+
+        ext = os.path.splitext(name)[1].lower()
+        h = digest.hexdigest()
+        target = f"{PREFIX}/{h[:2]}/{h}{ext}"
+        if self.exists(target):
+            return target
+        return super().save(target, content, max_length)
+
+    def put(self, name, content):
+        """Išvestinis failas (dydis) tiksliu vardu – perrašo, be turinio hash'o."""
+        if self.exists(name):
+            self.delete(name)
+        return super().save(name, content)
+
+
+product_storage = ContentAddressedStorage()
+
+
+def get_product_storage():
+    """ImageField(storage=...) – callable, kad migracijose nebūtų storage klasės būsenos."""
+    return product_storage
+
+
+def is_content_addressed(name: str) -> bool:
+    return bool(name and CAS_RE.match(name))
+
+
+def referenced_names() -> set:
+    """Visi originalai, į kuriuos remiasi DB (ProductImage + Product kortelės nuotraukos)."""
+    from .models import Product, ProductImage
+
+    names = set(ProductImage.objects.exclude(image="").values_list("image", flat=True))
+    for main, hover in Product.objects.values_list("main_image", "hover_image"):
+        names.update(n for n in (main, hover) if n)
+    return names
+
+
+def is_referenced(name: str) -> bool:
+    from django.db.models import Q
+
+    from .models import Product, ProductImage
+
+    return (
+        ProductImage.objects.filter(image=name).exists()
+        or Product.objects.filter(Q(main_image=name) | Q(hover_image=name)).exists()
+    )
+
+
+def delete_if_unreferenced(name: str) -> bool:
+    """Ištrina originalą ir jo dydžius, jei DB į jį nebesiremia. True – ištrinta."""
+    from . import renditions
+
+    if not name or is_referenced(name):
+        return False
+    renditions.delete(name)
+    try:
+        product_storage.delete(name)
+    except OSError:
+        pass
+    return True
+
+
+def serve_product_media(request, path):
+    """
+    /media/products/... – turinio vardu pavadinti failai su „immutable“ antraštėmis.
+    Maršrutas registruojamas tik DEBUG režime; produkcijoje /media/ atiduoda web serveris
+    su tomis pačiomis antraštėmis (žr. README „Media failai produkcijoje“).
+    """
+    name = f"{PREFIX}/{path}"
+    if not product_storage.exists(name):
+        raise Http404(name)
+    response = serve(request, name, document_root=product_storage.location)
+    if is_content_addressed(name):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=3600)   # seni products/<SKU>/ vardai
+    return response
@@ -0,0 +1,34 @@
+# catalog/templatetags/catalog_images.py — <picture> su WebP/JPEG srcset iš catalog.renditions
+from django import template
+from django.utils.html import format_html
+
+from catalog import renditions
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(image, kind="card", alt="", sizes="100vw", **attrs):
+    """
+    {% load catalog_images %}
+    {% picture p.thumbnail "card" alt=p.name sizes="80px" style="height:80px" %}
+    image – FieldFile arba kelias storage'e (ProductListing.thumbnail).
+    """
+    src = renditions.sources(image, kind)
+    if not src:
+        return ""
+    extra = format_html(
+        "".join(f' {k.replace("_", "-")}="{{}}"' for k in attrs), *attrs.values()
+    )
+    return format_html(
+        '<picture><source type="{}" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" loading="lazy" decoding="async"{}></picture>',
+        renditions.CONTENT_TYPES["webp"], src["webp"], sizes,
+        src["src"], src["jpg"], sizes, alt, extra,
+    )
+
+
+@register.simple_tag
+def rendition_url(image, kind="og", fmt="jpg"):
+    """Vienas (didžiausias) dydis, pvz. og:image."""
+    return renditions.url(image, kind, fmt=fmt) or ""
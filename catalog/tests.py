@@ -1,3 +1,590 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import Resolver404, resolve, reverse
+from django.utils import timezone
+
+from .models import (
+    Category, Product, ProductImage, ProductListing, ScheduledPriceChange, Size, StockHold, StockMovement, Variant,
+)
+from .search import fold, search_product_ids
+from .serializers import ProductListSerializer
+from .signals import products_changed
+from . import images, pricing, renditions, search, versions
+from .listing import refresh_listing
+from .storage import is_content_addressed, product_storage, serve_product_media
+from .stock import OutOfStock, attach_holds, available_stock, expire_holds, record_sale, reserve
+
+
+def _make_products(category, n, prefix):
+    for i in range(n):
+        p = Product.objects.create(name=f"{prefix} {i}", category=category, price=10 + i, stock=i % 2)
+        ProductImage.objects.create(product=p, image=f"products/{p.sku}/{i}.jpg", sort=1)
+
+
+class ProductListQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.small = Category.objects.create(name="Small")
+        cls.big = Category.objects.create(name="Big")
+        _make_products(cls.small, 2, "Small")
+        _make_products(cls.big, 12, "Big")
+
+    def _serialize(self, category):
+        qs = (
+            Product.objects.filter(category=category)
+            .select_related("category")
+            .prefetch_related("images", "variants")
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            data = ProductListSerializer(qs, many=True).data
+        return data, len(ctx)
+
+    def test_list_serializer_query_count_is_constant(self):
+        small_data, small_queries = self._serialize(self.small)
+        big_data, big_queries = self._serialize(self.big)
+        self.assertEqual(len(big_data), 12)
+        self.assertEqual(small_queries, big_queries)
+        self.assertEqual(big_queries, 3)  # produktai + images + variants
+
+    def test_list_serializer_fields(self):
+        data, _ = self._serialize(self.small)
+        row = next(r for r in data if r["name"] == "Small 1")
+        self.assertEqual(row["min_price"], 11.0)
+        self.assertEqual(row["max_price"], 11.0)
+        self.assertTrue(row["in_stock"])
+        self.assertTrue(row["thumbnail"].endswith("/1.jpg"))
+
+    def test_api_list_query_count_is_constant(self):
+        url = reverse("api-product-list")
+        with self.assertNumQueries(2):  # COUNT + puslapis
+            small = self.client.get(url, {"category__slug": self.small.slug})
+        with self.assertNumQueries(2):
+            big = self.client.get(url, {"category__slug": self.big.slug})
+        self.assertEqual(small.json()["count"], 2)
+        self.assertEqual(len(big.json()["results"]), 12)
+
+
+class ProductListingSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Hoodies")
+        cls.size = Size.objects.get(slug="m")
+        cls.product = Product.objects.create(name="Hoodie", category=cls.category, size=cls.size, price=30, stock=2)
+        cls.variant = cls.product.variants.get()
+
+    def _row(self):
+        return ProductListing.objects.get(product_id=self.product.pk)
+
+    def test_product_save(self):
+        self.product.name = "Striukė"
+        self.product.save()
+        self.assertEqual(self._row().name, "Striukė")
+
+        self.product.is_active = False
+        self.product.save()
+        self.assertFalse(ProductListing.objects.filter(product_id=self.product.pk).exists())
+
+    def test_variant_price_stock_and_active(self):
+        cheap = Variant.objects.create(product=self.product, size="L", price=Decimal("25.00"), stock=0)
+        row = self._row()
+        self.assertEqual((row.min_price, row.max_price), (Decimal("25.00"), Decimal("30.00")))
+
+        self.variant.stock = 0
+        self.variant.save()
+        self.assertFalse(self._row().in_stock)
+
+        cheap.is_active = False
+        cheap.save()
+        self.assertEqual(self._row().min_price, Decimal("30.00"))
+
+        cheap.is_active = True
+        cheap.save()
+        cheap.delete()
+        self.assertEqual(self._row().min_price, Decimal("30.00"))
+
+    def test_image_add_and_delete(self):
+        image = ProductImage.objects.create(
+            product=self.product, image="products/x/1.jpg", alt="Priekis", status=ProductImage.STATUS_READY,
+        )
+        row = self._row()
+        self.assertEqual((row.thumbnail, row.thumbnail_alt), ("products/x/1.jpg", "Priekis"))
+
+        image.delete()
+        self.assertEqual(self._row().thumbnail, "")
+
+    def test_category_rename(self):
+        self.category.name = "Džemperiai"
+        self.category.slug = "dzemperiai"
+        self.category.save()
+        row = self._row()
+        self.assertEqual((row.category_name, row.category_slug), ("Džemperiai", "dzemperiai"))
+
+    def test_size_reorder(self):
+        self.size.order = 5
+        self.size.save()
+        self.assertEqual(self._row().size_order, 5)
+
+    def test_products_changed(self):
+        Variant.objects.filter(pk=self.variant.pk).update(price=Decimal("12.00"), stock=0)
+        products_changed.send(sender=Variant, product_ids={self.product.pk})
+        row = self._row()
+        self.assertEqual((row.min_price, row.in_stock), (Decimal("12.00"), False))
+
+
+class ProductSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cat = Category.objects.create(name="Hoodies")
+        cls.named = Product.objects.create(name="Šiltas džemperis", category=cat, description="<p>Medvilnė</p>")
+        cls.described = Product.objects.create(name="Marškinėliai", category=cat, description="<p>Kaip <b>džemperis</b>, tik plonesni</p>")
+        cls.hidden = Product.objects.create(name="Džemperis (archyvas)", category=cat, is_active=False)
+
+    def test_fold_strips_html_and_diacritics(self):
+        self.assertEqual(fold("<p>Šiltas <b>DŽEMPERIS</b> &amp; ąčęėįšųūž</p>"), "siltas dzemperis aceeisuuz")
+
+    def test_prefix_match_ranks_name_hits_first(self):
+        self.assertEqual(search_product_ids("dzemp"), [self.named.pk, self.described.pk])
+
+    def test_index_follows_product_save(self):
+        self.named.name = "Striukė"
+        self.named.save()
+        self.assertEqual(search_product_ids("striuk"), [self.named.pk])
+        self.assertEqual(search_product_ids("dzemperis siltas"), [])
+
+    def test_shop_list_uses_index(self):
+        resp = self.client.get(reverse("product_list"), {"q": "medviln"})
+        self.assertEqual([p.pk for p in resp.context["page_obj"]], [self.named.pk])
+
+
+class SearchBeyondMaxResultsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        bulk = Category.objects.create(name="Bulk")
+        cls.target = Category.objects.create(name="Target")
+        products = Product.objects.bulk_create(
+            Product(name=f"Džemperis {i}", slug=f"dzemperis-{i}", sku=f"UR{i + 1:04d}", category=bulk)
+            for i in range(search.MAX_RESULTS + 1)
+        )
+        ids = [p.pk for p in products]
+        search.index_products(ids)
+        refresh_listing(ids)
+        # tik aprašyme – aktualumu už visus bulk produktus žemiau
+        cls.hit = Product.objects.create(name="Striukė", category=cls.target, description="Kaip džemperis")
+
+    def test_category_filter_sees_every_match(self):
+        resp = self.client.get(reverse("product_list"), {"q": "dzemper", "category": self.target.slug})
+        self.assertEqual([p.pk for p in resp.context["page_obj"]], [self.hit.pk])
+
+    def test_pagination_reaches_every_match(self):
+        resp = self.client.get(reverse("product_list"), {"q": "dzemper"})
+        paginator = resp.context["page_obj"].paginator
+        self.assertEqual(paginator.count, search.MAX_RESULTS + 2)
+        last = paginator.page(paginator.num_pages)
+        self.assertEqual(last.object_list[len(last.object_list) - 1].product_id, self.hit.pk)
+
+
+class StockLedgerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cat = Category.objects.create(name="Hoodies")
+        cls.a = Product.objects.create(name="Hoodie A", category=cat, price=20, stock=5).variants.get()
+        cls.b = Product.objects.create(name="Hoodie B", category=cat, price=30, stock=1).variants.get()
+
+    def test_record_sale_is_single_update_and_idempotent(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(record_sale(7, [(self.a.pk, 2), (self.b.pk, 3), (self.a.pk, 1)]))
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "catalog_variant"')]
+        self.assertEqual(len(updates), 1)
+
+        self.assertFalse(record_sale(7, [(self.a.pk, 2)]))
+        self.a.refresh_from_db()
+        self.b.refresh_from_db()
+        self.assertEqual((self.a.stock, self.b.stock), (2, 0))
+        self.assertEqual(
+            sorted(StockMovement.objects.filter(order_id=7).values_list("variant_id", "qty")),
+            sorted([(self.a.pk, -3), (self.b.pk, -3)]),
+        )
+        self.assertFalse(ProductListing.objects.get(product_id=self.b.product_id).in_stock)
+
+
+class StockHoldTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cat = Category.objects.create(name="Hoodies")
+        cls.variant = Product.objects.create(name="Hoodie", category=cat, price=20, stock=3).variants.get()
+
+    def test_holds_reduce_availability_until_paid(self):
+        first = reserve([(self.variant.pk, 2)])
+        with self.assertRaises(OutOfStock):
+            reserve([(self.variant.pk, 2)])
+        self.assertEqual(available_stock([self.variant.pk]), {self.variant.pk: 1})
+
+        attach_holds(first, 11)
+        self.assertTrue(record_sale(11, [(self.variant.pk, 2)]))
+        self.assertFalse(StockHold.objects.exists())
+        self.assertEqual(available_stock([self.variant.pk]), {self.variant.pk: 1})
+
+    def test_expired_holds_are_ignored_and_swept(self):
+        reserve([(self.variant.pk, 3)], ttl_minutes=0)
+        self.assertEqual(available_stock([self.variant.pk]), {self.variant.pk: 3})
+        self.assertEqual(expire_holds(), 1)
+        self.assertFalse(StockHold.objects.exists())
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cat = Category.objects.create(name="Hoodies")
+        cls.product = Product.objects.create(name="Hoodie", category=cat, price=20, stock=5)
+
+    def _revalidate(self, url, queries=0):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("no-cache", first["Cache-Control"])
+        with self.assertNumQueries(queries):
+            again = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        return first["ETag"]
+
+    def test_repeat_visits_get_304_without_queries(self):
+        for url in (
+            reverse("product_list"),
+            reverse("product_detail", args=[self.product.slug]),
+            reverse("api-product-list"),
+            reverse("api-product-detail", args=[self.product.slug]),
+        ):
+            with self.subTest(url=url):
+                self._revalidate(url)
+
+    def test_changes_bump_etag(self):
+        url = reverse("product_detail", args=[self.product.slug])
+        etag = self._revalidate(url)
+        variant = self.product.variants.get()
+        variant.stock = 0
+        with self.captureOnCommitCallbacks(execute=True):
+            variant.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self._revalidate(reverse("product_list"))
+        with self.captureOnCommitCallbacks(execute=True):
+            record_sale(3, [(variant.pk, 1)])
+        self.assertEqual(self.client.get(reverse("product_list"), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_is_bumped_only_after_commit(self):
+        url = reverse("product_detail", args=[self.product.slug])
+        etag = self._revalidate(url)
+        variant = self.product.variants.get()
+        variant.stock = 0
+        with self.captureOnCommitCallbacks() as callbacks:
+            variant.save()
+            # kol transakcija neįvykdyta, klientas dar gauna 304 su sena žyma
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_cart_contents_are_part_of_etag(self):
+        url = reverse("product_list")
+        etag = self._revalidate(url)
+        self.client.post(reverse("cart:cart_add"), {"variant_id": self.product.variants.get().pk, "qty": 1})
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_missing_stamp_is_recreated(self):
+        versions._cache().delete(versions.KEY.format("listing"))
+        url = reverse("api-product-list")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class AdminChangelistQueryTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+
+        admin = get_user_model().objects.create_superuser("admin", "admin@example.com", "pass")
+        self.client.force_login(admin)
+        self.category = Category.objects.create(name="Tees")
+
+    def _queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return resp, len(ctx)
+
+    def _add(self, n, prefix):
+        _make_products(self.category, n, prefix)
+        ProductImage.objects.update(status=ProductImage.STATUS_READY)
+
+    def _assert_constant(self, name):
+        url = reverse(name)
+        self._add(2, "Few")
+        self.client.get(url)   # sesija, ContentType cache ir pan. – ne šio testo reikalas
+        _, few = self._queries(url)
+        self._add(20, "Many")
+        resp, many = self._queries(url)
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 10)
+        self.assertContains(resp, ".thumb-160.jpg")
+
+    def test_product_changelist_query_count_is_constant(self):
+        self._assert_constant("admin:catalog_product_changelist")
+
+    def test_variant_changelist_query_count_is_constant(self):
+        self._assert_constant("admin:catalog_variant_changelist")
+
+
+def _jpeg(width, height, orientation=None):
+    from PIL import Image
+
+    buf = BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+        exif[0x010F] = "Telefonas"   # Make
+    Image.new("RGB", (width, height), "navy").save(buf, "JPEG", **({"exif": exif} if orientation else {}))
+    return SimpleUploadedFile("foto.jpg", buf.getvalue(), content_type="image/jpeg")
+
+
+class RenditionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cat = Category.objects.create(name="Hoodies")
+        self.product = Product.objects.create(name="Hoodie", category=cat, price=20)
+
+    def _size(self, name):
+        from PIL import Image
+
+        with product_storage.open(name) as fh:
+            img = Image.open(fh)
+            return img.format, img.size
+
+    def test_upload_generates_sizes_next_to_original(self):
+        image = ProductImage.objects.create(product=self.product, image=_jpeg(2000, 1500))
+        original = image.image.name
+        self.assertTrue(is_content_addressed(original))
+        self.assertEqual(images.process_batch(), (1, 0))
+        self.assertEqual(self._size(renditions.rendition_name(original, "card", 320, "webp")), ("WEBP", (320, 240)))
+        self.assertEqual(self._size(renditions.rendition_name(original, "og", 1200, "jpg")), ("JPEG", (1200, 630)))
+
+        resp = self.client.get(reverse("product_list"))
+        self.assertContains(resp, renditions.srcset(original, "card", "webp"))
+        api = self.client.get(reverse("api-product-list")).json()["results"][0]
+        self.assertTrue(api["thumbnail_srcset"]["jpg"].endswith(".card-480.jpg 480w"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.delete()
+        self.assertFalse(any(product_storage.exists(n) for n in renditions.rendition_names(original)))
+
+    def test_backfill_command_covers_existing_files(self):
+        name = product_storage.put(f"products/{self.product.sku}/senas.jpg", _jpeg(100, 100))
+        ProductImage.objects.create(product=self.product, image=name)
+        self.assertFalse(renditions.has_renditions(name))
+        call_command("build_renditions", stdout=StringIO())
+        self.assertEqual(self._size(renditions.rendition_name(name, "detail", 1440, "jpg")), ("JPEG", (100, 100)))
+
+    def test_bulk_upload_is_queued_then_processed_in_pool(self):
+        with self.assertNumQueries(2):   # max(sort) + vienas INSERT
+            queued = images.add_uploads(self.product, [_jpeg(400, 300, orientation=6), _jpeg(400, 300)])
+        self.assertEqual({img.status for img in queued}, {ProductImage.STATUS_PENDING})
+        self.assertEqual(ProductListing.objects.get(product=self.product).thumbnail, "")
+
+        call_command("process_images", workers=2, stdout=StringIO())
+        self.assertEqual(
+            set(self.product.images.values_list("status", flat=True)), {ProductImage.STATUS_READY}
+        )
+        first = self.product.images.first().image.name
+        self.assertEqual(ProductListing.objects.get(product=self.product).thumbnail, first)
+
+        from PIL import Image
+
+        with product_storage.open(first) as fh:
+            stripped = Image.open(fh)
+            self.assertEqual((stripped.size, dict(stripped.getexif())), ((300, 400), {}))
+
+    def test_broken_upload_fails_after_max_attempts(self):
+        broken = SimpleUploadedFile("broken.jpg", b"not an image", content_type="image/jpeg")
+        image = images.add_uploads(self.product, [broken])[0]
+        with self.settings(IMAGE_MAX_ATTEMPTS=2):
+            self.assertEqual(images.process_batch(), (0, 1))
+            self.assertEqual(images.process_batch(), (0, 0))   # atidėta – ne iškart iš naujo
+            image.refresh_from_db()
+            self.assertEqual(image.status, ProductImage.STATUS_PENDING)
+            self.assertGreater(image.next_attempt_at, timezone.now() + timedelta(seconds=30))
+
+            ProductImage.objects.filter(pk=image.pk).update(next_attempt_at=timezone.now())
+            self.assertEqual(images.process_batch(), (0, 1))
+            self.assertEqual(images.process_batch(), (0, 0))
+        image.refresh_from_db()
+        self.assertEqual(image.status, ProductImage.STATUS_FAILED)
+        self.assertIn("UnidentifiedImageError", image.last_error)
+
+    def test_identical_uploads_share_one_file_until_last_reference(self):
+        other = Product.objects.create(name="Kitas", category=self.product.category, price=5)
+        a = ProductImage.objects.create(product=self.product, image=_jpeg(50, 50))
+        b = ProductImage.objects.create(product=other, image=_jpeg(50, 50))
+        self.assertEqual(a.image.name, b.image.name)
+
+        resp = serve_product_media(RequestFactory().get(a.image.url), a.image.name.removeprefix("products/"))
+        self.assertEqual(resp["Cache-Control"], "public, max-age=31536000, immutable")
+        resp.close()
+        with self.assertRaises(Resolver404):   # be DEBUG /media/ atiduoda web serveris
+            resolve(a.image.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            a.delete()
+        self.assertTrue(product_storage.exists(b.image.name))
+        with self.captureOnCommitCallbacks(execute=True):
+            b.delete()
+        self.assertFalse(product_storage.exists(b.image.name))
+
+    def test_migrate_legacy_media_then_collect_orphans(self):
+        legacy = product_storage.put(f"products/{self.product.sku}/senas.jpg", _jpeg(60, 60))
+        image = ProductImage.objects.create(product=self.product, image=legacy, status=ProductImage.STATUS_READY)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("migrate_product_media", stdout=StringIO())
+        image.refresh_from_db()
+        self.assertTrue(is_content_addressed(image.image.name))
+        self.assertTrue(renditions.has_renditions(image.image))
+        self.assertFalse(product_storage.exists(legacy))
+        self.assertEqual(ProductListing.objects.get(product=self.product).thumbnail, image.image.name)
+
+        orphan = product_storage.save("x.jpg", _jpeg(10, 10))
+        call_command("gc_product_media", min_age_hours=0, stdout=StringIO())
+        self.assertFalse(product_storage.exists(orphan))
+        self.assertTrue(product_storage.exists(image.image.name))
+        self.assertTrue(product_storage.exists(renditions.rendition_name(image.image.name, "card", 160, "webp")))
+
+
+class PricingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tees = Category.objects.create(name="Tees")
+        cls.hoodies = Category.objects.create(name="Hoodies")
+        cls.tee_a = Product.objects.create(name="Tee A", category=cls.tees, price="20.00")
+        cls.tee_b = Product.objects.create(name="Tee B", category=cls.tees, price="9.99")
+        cls.hoodie = Product.objects.create(name="Hoodie", category=cls.hoodies, price="50.00")
+
+    def _prices(self, product):
+        v = product.variants.get()
+        product.refresh_from_db()
+        listing = ProductListing.objects.get(product=product)
+        return v.price, v.compare_at_price, product.price, listing.min_price
+
+    def test_markdown_is_one_update_and_never_raises_price(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(pricing.markdown(Variant.objects.all(), percent=10), 3)
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "catalog_variant"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self._prices(self.tee_b), (Decimal("8.99"), Decimal("9.99"), Decimal("8.99"), Decimal("8.99")))
+
+        # antra nuolaida – nuo dabartinės kainos, „kaina be nuolaidos“ lieka pradinė
+        pricing.markdown(Variant.objects.filter(product__category=self.tees), percent=20)
+        self.assertEqual(self._prices(self.tee_a)[:2], (Decimal("14.40"), Decimal("20.00")))
+
+        pricing.markdown(Variant.objects.filter(product=self.hoodie), amount=60)
+        self.assertEqual(self._prices(self.hoodie)[:2], (Decimal("0.00"), Decimal("50.00")))
+
+        self.assertEqual(pricing.restore(Variant.objects.all()), 3)
+        self.assertEqual(self._prices(self.tee_a), (Decimal("20.00"), None, Decimal("20.00"), Decimal("20.00")))
+        self.assertEqual(pricing.restore(Variant.objects.all()), 0)
+
+    def test_admin_actions_use_pricing(self):
+        from django.contrib.auth import get_user_model
+
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "pass"))
+        url = reverse("admin:catalog_variant_changelist")
+        ids = [str(pk) for pk in Variant.objects.filter(product__category=self.tees).values_list("pk", flat=True)]
+        self.client.post(url, {"action": "discount_20", "_selected_action": ids})
+        self.assertEqual(self._prices(self.tee_a)[0], Decimal("16.00"))
+        self.client.post(url, {"action": "clear_discount", "_selected_action": ids})
+        self.assertEqual(self._prices(self.tee_a)[:2], (Decimal("20.00"), None))
+
+    def test_scheduled_change_applies_in_batches_and_restores(self):
+        now = timezone.now()
+        change = ScheduledPriceChange.objects.create(
+            name="Rudens akcija", type=ScheduledPriceChange.PERCENT, value=50,
+            starts_at=now - timedelta(minutes=1), ends_at=now + timedelta(days=1),
+        )
+        change.categories.add(self.tees)
+
+        call_command("apply_price_changes", "--batch-size=1", stdout=StringIO())
+        change.refresh_from_db()
+        self.assertEqual(change.status, ScheduledPriceChange.STATUS_ACTIVE)
+        self.assertEqual(self._prices(self.tee_a)[:2], (Decimal("10.00"), Decimal("20.00")))
+        self.assertEqual(self._prices(self.hoodie)[:2], (Decimal("50.00"), None))
+
+        ScheduledPriceChange.objects.filter(pk=change.pk).update(ends_at=now)
+        call_command("apply_price_changes", "--batch-size=1", stdout=StringIO())
+        change.refresh_from_db()
+        self.assertEqual(change.status, ScheduledPriceChange.STATUS_ENDED)
+        self.assertEqual(self._prices(self.tee_a)[:2], (Decimal("20.00"), None))
+
+    def _sale(self, value, *categories, starts=1, **fields):
+        now = timezone.now()
+        change = ScheduledPriceChange.objects.create(
+            name=f"−{value}%", type=ScheduledPriceChange.PERCENT, value=value,
+            starts_at=now - timedelta(minutes=starts), ends_at=now + timedelta(days=1), **fields,
+        )
+        change.categories.add(*categories)
+        return change
+
+    def _end(self, change):
+        ScheduledPriceChange.objects.filter(pk=change.pk).update(ends_at=timezone.now())
+        while pricing.run_due():
+            pass
+        change.refresh_from_db()
+        self.assertEqual(change.status, ScheduledPriceChange.STATUS_ENDED)
+
+    def test_sale_keeps_manual_discount_and_restores_it(self):
+        Variant.objects.filter(product=self.tee_a).update(price="16.00", compare_at_price="20.00")
+        change = self._sale(10, self.tees)
+        while pricing.run_due():
+            pass
+        # nuo jau sumažintos kainos, ne nuo „sąrašo“ – nepabrangsta
+        self.assertEqual(self._prices(self.tee_a)[:2], (Decimal("14.40"), Decimal("20.00")))
+
+        # akcijai prasidėjus pridėta prekė ir rankinė nuolaida – ne šios akcijos reikalas
+        late = Product.objects.create(name="Tee C", category=self.tees, price="30.00")
+        pricing.markdown(Variant.objects.filter(product=late), percent=50)
+
+        self._end(change)
+        self.assertEqual(self._prices(self.tee_a)[:2], (Decimal("16.00"), Decimal("20.00")))
+        self.assertEqual(self._prices(self.tee_b)[:2], (Decimal("9.99"), None))
+        self.assertEqual(self._prices(late)[:2], (Decimal("15.00"), Decimal("30.00")))
+
+    def test_overlapping_sales_do_not_touch_each_others_variants(self):
+        tees_sale = self._sale(10, self.tees, starts=2)
+        everything = self._sale(50, starts=1, applies_to_all=True)
+        while pricing.run_due():
+            pass
+        everything.refresh_from_db()
+        self.assertEqual(everything.skipped, 2)
+        self.assertEqual(self._prices(self.tee_a)[:2], (Decimal("18.00"), Decimal("20.00")))
+        self.assertEqual(self._prices(self.hoodie)[:2], (Decimal("25.00"), Decimal("50.00")))
+
+        self._end(everything)
+        self.assertEqual(self._prices(self.tee_a)[:2], (Decimal("18.00"), Decimal("20.00")))
+        self.assertEqual(self._prices(self.hoodie)[:2], (Decimal("50.00"), None))
+
+        self._end(tees_sale)
+        self.assertEqual(self._prices(self.tee_a)[:2], (Decimal("20.00"), None))
@@ -0,0 +1,126 @@
+# catalog/versions.py — katalogo versijų žymos sąlyginiams GET (ETag / Last-Modified / 304)
+"""
+Kiekvienam resursui laikoma „žyma“ cache'e – paskutinio pakeitimo laikas (time.time()).
+Ji veikia kaip pakeitimų skaitliukas (kiekvienas pakeitimas – nauja reikšmė) ir kartu
+duoda Last-Modified. Žymas kelia catalog.signals, o view'ai jas tik skaito – 304 atsakymui
+užtenka vieno cache get_many, be DB ir be šablono.
+
+Sritys:
+    "listing"          – /shop/ sąrašas ir API sąrašas (bet koks produkto/varianto/nuotraukos pakeitimas)
+    "categories"       – kategorijų šoninis meniu
+    "product:<slug>"   – produkto detalė (HTML ir API)
+    "site"             – bendri šablono duomenys (SiteSettings ir pan.)
+
+Jei žymos cache'e nėra (išvalytas cache), ji sukuriama iš naujo su dabartiniu laiku –
+klientai vieną kartą gauna pilną atsakymą, pasenusio 304 nebūna.
+"""
+import hashlib
+import time
+from functools import wraps
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from cart.services import CART_SNAPSHOT_KEY
+
+KEY = "catalog:ver:{}"
+TIMEOUT = 60 * 60 * 24   # pasibaigus – tiesiog nauja žyma (vienas pilnas atsakymas)
+
+
+def _cache():
+    return caches[getattr(settings, "CATALOG_VERSION_CACHE_ALIAS", "default")]
+
+
+def touch(*scopes):
+    """Pažymi sritis kaip pasikeitusias."""
+    now = time.time()
+    _cache().set_many({KEY.format(s): now for s in scopes}, TIMEOUT)
+
+
+def stamps(*scopes) -> dict:
+    """{scope: žyma}; trūkstamos sukuriamos (add – kad lygiagretūs procesai sutartų)."""
+    cache = _cache()
+    keys = {KEY.format(s): s for s in scopes}
+    found = cache.get_many(keys)
+    missing = [k for k in keys if k not in found]
+    if missing:
+        now = time.time()
+        for k in missing:
+            cache.add(k, now, TIMEOUT)
+        found.update(cache.get_many(missing))
+    return {keys[k]: v for k, v in found.items()}
+
+
+def touch_products(product_ids):
+    """Produktų (ar jų variantų/nuotraukų) pakeitimas: detalės + sąrašas."""
+    from .models import Product
+
+    slugs = Product.objects.filter(pk__in=list(product_ids)).values_list("slug", flat=True)
+    touch("listing", *(f"product:{s}" for s in slugs))
+
+
+# ---- Sąlyginis GET view'ams ------------------------------------------------
+
+def _visitor_parts(request) -> list:
+    """
+    Lankytojo būsena, kuri matoma šablone: krepšelio suvestinė (header'is) ir CSRF paslaptis
+    (formų token'as). get_token() – kad slapukas būtų nustatytas jau pirmame atsakyme ir
+    ETag'as nepasikeistų antrame. Sesija skaitoma tik jei lankytojas ją turi (anonimui – be DB).
+    """
+    get_token(request)
+    parts = [request.META.get("CSRF_COOKIE", "")]
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        snap = request.session.get(CART_SNAPSHOT_KEY) or {}
+        parts += [snap.get("count", 0), snap.get("total", "0")]
+    return parts
+
+
+def _state(request, scopes_func, html, args, kwargs):
+    """Vienas skaičiavimas per request'ą: (etag, last_modified) arba (None, None)."""
+    memo = getattr(request, "_catalog_condition", None)
+    if memo is not None:
+        return memo
+    memo = (None, None)
+    if request.method in ("GET", "HEAD") and not (html and len(get_messages(request))):
+        # su neparodytais messages visada renderinam – kitaip jie „užstrigtų“
+        scopes = scopes_func(request, *args, **kwargs)
+        found = stamps(*scopes)
+        parts = [request.get_full_path(), request.META.get("HTTP_ACCEPT", "")]
+        parts += [f"{s}={found[s]!r}" for s in scopes]
+        if html:
+            parts += _visitor_parts(request)
+        etag = hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()
+        memo = (etag, datetime.fromtimestamp(max(found.values()), tz=timezone.utc))
+    request._catalog_condition = memo
+    return memo
+
+
+def conditional(scopes_func, html=True):
+    """
+    View'o dekoratorius; klasėms – per method_decorator (tinka ir DRF APIView):
+        @method_decorator(conditional(lambda request, slug: ["site", f"product:{slug}"]))
+        def get(self, request, slug): ...
+    ETag = hash(URL, Accept, žymos[, krepšelis, CSRF]); Last-Modified = naujausia žyma.
+    """
+    def decorator(func):
+        wrapped = condition(
+            etag_func=lambda request, *a, **kw: _state(request, scopes_func, html, a, kw)[0],
+            last_modified_func=lambda request, *a, **kw: _state(request, scopes_func, html, a, kw)[1],
+        )(func)
+
+        @wraps(func)
+        def inner(request, *args, **kwargs):
+            response = wrapped(request, *args, **kwargs)
+            if getattr(request, "_catalog_condition", (None,))[0]:
+                # naršyklė visada pasitikrina; HTML su krepšeliu – tik privačiam cache
+                patch_cache_control(response, no_cache=True, **({"private": True} if html else {}))
+            return response
+
+        return inner
+
+    return decorator
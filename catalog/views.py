@@ -1,12 +1,17 @@
 # catalog/views.py — SSR: produktų sąrašas ir detalė (su SEO kontekstu)
 from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from django.shortcuts import render, get_object_or_404
+from django.utils.decorators import method_decorator
 from django.views import View
 from django.core.paginator import Paginator
 from django.db.models import Q, Prefetch, Count
 from django.utils.html import strip_tags
 from django.utils.text import Truncator
-from .models import Product, Category, Variant, ProductImage, Size
+from shop.pagecache import page_cache
+from . import renditions
+from .models import Product, Category, Variant, ProductImage, ProductListing, Size
+from .search import filter_ranked
+from .versions import conditional
 
 
 # ----- Helperiai -------------------------------------------------------------
@@ -47,23 +52,20 @@ class ProductListView(View):
     template_name = "shop/list.html"
     paginate_by = 12
 
+    # 304 be užklausų į DB, kol sąrašas/kategorijos nepasikeitė
+    @method_decorator(conditional(lambda request: ["site", "categories", "listing"]))
+    @method_decorator(page_cache("catalog"))
     def get(self, request):
         q = (request.GET.get("q") or "").strip()
         current_category = (request.GET.get("category") or "").strip()
 
-        qs = (
-            Product.objects.filter(is_active=True)
-            .select_related("category")
-            .prefetch_related(
-                Prefetch("images", queryset=ProductImage.objects.all()),
-                Prefetch("variants", queryset=Variant.objects.filter(is_active=True).order_by("price")),
-            )
-            .order_by("-id")
-        )
-        if q:
-            qs = qs.filter(Q(name__icontains=q) | Q(description__icontains=q))
+        # Denormalizuotas sąrašas (ProductListing) – viena užklausa be JOIN/prefetch
+        qs = ProductListing.objects.order_by("-product_id")
         if current_category:
-            qs = qs.filter(category__slug=current_category)
+            qs = qs.filter(category_slug=current_category)
+        if q:
+            # invertuotas indeksas (catalog.search), rezultatai pagal aktualumą
+            qs = filter_ranked(qs, q)
 
         paginator = Paginator(qs, self.paginate_by)
         page_obj = paginator.get_page(request.GET.get("page") or 1)
@@ -121,10 +123,12 @@ class ProductListView(View):
 class ProductDetailView(View):
     template_name = "shop/detail.html"
 
+    @method_decorator(conditional(lambda request, slug: ["site", "categories", f"product:{slug}"]))
+    @method_decorator(page_cache("catalog"))
     def get(self, request, slug):
         product = get_object_or_404(
             Product.objects.filter(is_active=True).select_related("category").prefetch_related(
-                Prefetch("images", queryset=ProductImage.objects.all()),
+                Prefetch("images", queryset=ProductImage.objects.filter(status=ProductImage.STATUS_READY)),
                 Prefetch("variants", queryset=Variant.objects.filter(is_active=True)),
             ),
             slug=slug,
@@ -133,17 +137,10 @@ class ProductDetailView(View):
         desc = _truncate(getattr(product, "description", "") or "", 160)
         long_desc = _truncate(getattr(product, "description", "") or "", 200)
 
-        # --- og:image: bandome main_image_url, tada pirmą iš images ---
-        main_img = getattr(product, "main_image_url", None)
-        if not main_img:
-            first_img = product.images.first() if hasattr(product, "images") else None
-            if first_img:
-                # jei yra ImageField "image" -> imame .url
-                if hasattr(first_img, "image") and getattr(first_img.image, "url", None):
-                    main_img = first_img.image.url
-                # jei modelyje yra 'url' atributas -> naudok jį
-                elif getattr(first_img, "url", None):
-                    main_img = first_img.url
+        # --- og:image: main_image, tada pirmoji galerijos nuotrauka (1200x630 JPEG dydis) ---
+        og_source = product.main_image or next(iter(product.images.all()), None)
+        og_source = getattr(og_source, "image", og_source)
+        main_img = renditions.url(og_source, "og") if og_source else None
 
         ctx = {
             "product": product,
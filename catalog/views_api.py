@@ -1,29 +1,63 @@
+from django.db.models import F, Prefetch
+from django.utils.decorators import method_decorator
+from django_filters import rest_framework as df
 from rest_framework import generics, filters
+from rest_framework.filters import BaseFilterBackend
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Product
-from .serializers import ProductListSerializer, ProductDetailSerializer
+from .models import Product, ProductImage, ProductListing
+from .search import filter_ranked
+from .serializers import ProductListingSerializer, ProductDetailSerializer
+from .versions import conditional
+
+
+class ProductListingFilter(df.FilterSet):
+    # išlaikom seną parametrą: /api/v1/products/?category__slug=hoodies
+    category__slug = df.CharFilter(field_name="category_slug")
+
+    class Meta:
+        model = ProductListing
+        fields = []
+
+
+class ProductSearchFilter(BaseFilterBackend):
+    """?search=... per catalog.search indeksą (vietoj SearchFilter icontains skenavimo)."""
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        q = (request.query_params.get(self.search_param) or "").strip()
+        return filter_ranked(queryset, q) if q else queryset
+
 
 class ProductListView(generics.ListAPIView):
+    # denormalizuotas sąrašas (ProductListing) – vienas indeksuotas skenavimas
     queryset = (
-        Product.objects.filter(is_active=True)
-        .select_related("category")
-        .prefetch_related("images","variants")
+        ProductListing.objects.annotate(id=F("product_id"))
         .order_by("-created_at")
     )
-    serializer_class = ProductListSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    # /api/products/?category=hoodies
-    filterset_fields = {"category__slug": ["exact"]}
-    # /api/products/?search=hoodie
-    search_fields = ["name", "description"]
+    serializer_class = ProductListingSerializer
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, filters.OrderingFilter]
+    # /api/products/?category__slug=hoodies
+    filterset_class = ProductListingFilter
+    # /api/products/?search=hoodie  (žr. ProductSearchFilter)
     # /api/products/?ordering=name  (arba -created_at)
     ordering_fields = ["id", "name", "created_at"]
 
+    @method_decorator(conditional(lambda request: ["categories", "listing"], html=False))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
 class ProductDetailView(generics.RetrieveAPIView):
     lookup_field = "slug"
     queryset = (
         Product.objects.filter(is_active=True)
         .select_related("category")
-        .prefetch_related("images","variants")
+        .prefetch_related(
+            Prefetch("images", queryset=ProductImage.objects.filter(status=ProductImage.STATUS_READY)),
+            "variants",
+        )
     )
     serializer_class = ProductDetailSerializer
+
+    @method_decorator(conditional(lambda request, slug: ["categories", f"product:{slug}"], html=False))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
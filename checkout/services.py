@@ -0,0 +1,76 @@
+# checkout/services.py — užsakymo pateikimas (bendras checkout_view ir checkout_create_order_api)
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from catalog.stock import attach_holds, release_order_holds, reserve
+from .models import Order, OrderItem
+
+FLAT_SHIPPING = Decimal("4.99")
+
+CUSTOMER_FIELDS = ("first_name", "last_name", "email", "address", "city", "postal_code")
+
+# paskutinis šios sesijos Stripe užsakymas, kuris dar neapmokėtas (žr. abandon_pending_order)
+PENDING_ORDER_SESSION_KEY = "checkout_pending_order"
+
+
+def place_order(customer: dict, summary: dict, payment_method: str, status: str) -> Order:
+    """
+    Sukuria užsakymą iš krepšelio suvestinės (Cart.summary()) pastoviu užklausų skaičiumi:
+    rezervacija (catalog.stock.reserve) → Order INSERT su jau paskaičiuota suma →
+    visos eilutės vienu bulk_create → rezervacijų priskyrimas užsakymui.
+
+    Trūkstant likučio kelia catalog.stock.OutOfStock (užsakymas nesukuriamas).
+    """
+    lines = list(summary["items"])
+    hold_ids = reserve((line.variant.pk, line.qty) for line in lines)
+
+    # jei kas nors žemiau nulūžtų – rezervacijos tiesiog pasibaigs (STOCK_HOLD_TTL_MINUTES)
+    with transaction.atomic():
+        order = Order.objects.create(
+            **{f: customer[f] for f in CUSTOMER_FIELDS},
+            shipping_cost=FLAT_SHIPPING,
+            payment_method=payment_method,
+            status=status,
+            coupon_code=(summary.get("coupon_code") or ""),
+            discount_amount=(summary.get("discount") or Decimal("0")),
+            total=summary["total"] + FLAT_SHIPPING,   # suma PO kupono + pristatymas
+        )
+        # stock mažinsim tik kai apmokėta (catalog.stock.record_sale)
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                variant=line.variant,
+                product_name=line.variant.product.name,
+                variant_sku=line.variant.sku,
+                qty=line.qty,
+                price=line.variant.price,
+                line_total=line.variant.price * line.qty,
+            )
+            for line in lines
+        ])
+        attach_holds(hold_ids, order.pk)
+    return order
+
+
+def reserve_order(order: Order) -> None:
+    """Iš naujo rezervuoja užsakymo eilutes (pvz. kartojant nepavykusį mokėjimą); gali kelti OutOfStock."""
+    attach_holds(reserve(order.items.values_list("variant_id", "qty")), order.pk)
+
+
+def abandon_pending_order(session) -> None:
+    """
+    Stripe: kortelę atmetus, FE tą patį krepšelį pateikia dar kartą (naujas užsakymas).
+    Ankstesnis neapmokėtas šios sesijos užsakymas atšaukiamas ir jo rezervacijos
+    atlaisvinamos – kitaip jos (ypač paskutiniam vienetui) blokuotų pakartotinį bandymą.
+    Jau apmokėto (webhook'as suspėjo) neliečiam.
+    """
+    order_id = session.pop(PENDING_ORDER_SESSION_KEY, None)
+    if not order_id:
+        return
+    with transaction.atomic():
+        if Order.objects.filter(pk=order_id, status__in=("pending", "failed")).update(
+            status="canceled", updated_at=timezone.now()
+        ):
+            release_order_holds(order_id)
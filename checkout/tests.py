@@ -1,3 +1,89 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from catalog.models import Category, Product, StockHold
+from paysera.views import _mark_failed
+from .models import Order
+
+CUSTOMER = {
+    "first_name": "Jonas", "last_name": "Jonaitis", "email": "jonas@example.com",
+    "address": "Gedimino pr. 1", "city": "Vilnius", "postal_code": "01103",
+    "payment_method": "cod",
+}
+
+
+class PlaceOrderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cat = Category.objects.create(name="Hoodies")
+        cls.variants = [
+            Product.objects.create(name=f"Hoodie {i}", category=cat, price=10 + i, stock=5).variants.get()
+            for i in range(4)
+        ]
+
+    def _checkout(self, variants):
+        for v in variants:
+            self.client.post(reverse("cart:cart_add"), {"variant_id": v.pk, "qty": 2})
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post(reverse("checkout"), CUSTOMER)
+        self.assertEqual(resp.status_code, 302)
+        return Order.objects.latest("id"), len(ctx)
+
+    def test_query_count_does_not_grow_with_lines(self):
+        one, one_queries = self._checkout(self.variants[:1])
+        four, four_queries = self._checkout(self.variants)
+        self.assertEqual(one_queries, four_queries)
+        self.assertEqual(four.items.count(), 4)
+        self.assertEqual(str(four.total), "96.99")   # (10+11+12+13)*2 + 4.99
+        self.assertEqual(StockHold.objects.filter(order_id=four.pk).count(), 4)
+
+
+class FailedPaymentHoldTests(TestCase):
+    """Paskutinis vienetas: atmesta kortelė neturi blokuoti pakartotinio bandymo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cat = Category.objects.create(name="Hoodies")
+        cls.variant = Product.objects.create(name="Hoodie", category=cat, price=20, stock=1).variants.get()
+
+    def setUp(self):
+        import threading
+
+        from stripe_payments.tests import FakeStripe
+
+        self.stripe = FakeStripe()
+        threading.Thread(target=self.stripe.serve_forever, daemon=True).start()
+        self.addCleanup(self.stripe.server_close)
+        self.addCleanup(self.stripe.shutdown)
+        override = override_settings(STRIPE_SECRET_KEY="sk_test_fake", STRIPE_API_BASE=self.stripe.url)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client.post(reverse("cart:cart_add"), {"variant_id": self.variant.pk, "qty": 1})
+
+    def _create_order(self):
+        return self.client.post(reverse("checkout_create_order_api"), {**CUSTOMER, "payment_method": "stripe"})
+
+    def test_decline_then_retry_gets_the_last_unit(self):
+        first = self._create_order()
+        self.assertEqual(first.status_code, 200)
+        # kortelė atmesta – FE iškart pateikia dar kartą (webhook'as dar neapdorotas)
+        retry = self._create_order()
+        self.assertEqual(retry.status_code, 200, retry.content)
+
+        self.assertEqual(Order.objects.get(pk=first.json()["order_id"]).status, "canceled")
+        self.assertEqual(list(StockHold.objects.values_list("order_id", flat=True)), [retry.json()["order_id"]])
+
+    def test_failed_payment_releases_holds(self):
+        order = Order.objects.get(pk=self._create_order().json()["order_id"])
+        other = self.client_class()
+        add = lambda: other.post(reverse("cart:cart_add"), {"variant_id": self.variant.pk, "qty": 1})
+        # kol rezervuota – kitam pirkėjui vieneto nėra
+        self.assertRedirects(add(), reverse("product_detail", args=[self.variant.product.slug]),
+                             fetch_redirect_response=False)
+
+        _mark_failed(order)
+        self.assertEqual(order.status, "failed")
+        self.assertFalse(StockHold.objects.exists())
+        self.assertRedirects(add(), reverse("cart:cart_view"), fetch_redirect_response=False)
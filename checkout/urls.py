@@ -9,6 +9,7 @@ urlpatterns = [
     path("", views.checkout_view, name="checkout_view"),
 
     path("success/<int:order_id>/", views.checkout_success, name="checkout_success"),
+    path("status/<int:order_id>/", views.checkout_status, name="checkout_status"),
 
     # API kelias naujam 1-žingsnio Stripe flow’ui
     # galutinis URL bus /checkout/api/create/
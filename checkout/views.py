@@ -2,33 +2,29 @@
 from decimal import Decimal
 import logging
 
-from django.conf import settings
 from django.contrib import messages
-from django.db import transaction
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
-from django.views.decorators.http import require_http_methods, require_POST
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
 
-import stripe
-
-from cart.services import Cart, CART_SESSION_KEY, COUPON_SESSION_KEY
-from catalog.models import Variant
+from cart.services import Cart, CART_SESSION_KEY, CART_SNAPSHOT_KEY, COUPON_SESSION_KEY
+from catalog.stock import OutOfStock
 from .forms import CheckoutForm
-from .models import Order, OrderItem
+from .models import Order
+from .services import FLAT_SHIPPING, PENDING_ORDER_SESSION_KEY, abandon_pending_order, place_order
 
 from paysera.utils import parse_callback
-from paysera.views import _mark_paid_and_decrease_stock
+from paysera.views import _mark_failed, _mark_paid_and_decrease_stock
+from stripe_payments.status import payment_status
 from stripe_payments.views import _ensure_pi_for_order
 
 logger = logging.getLogger(__name__)
 
-FLAT_SHIPPING = Decimal("4.99")
-
 
 @require_http_methods(["GET", "POST"])
 def checkout_view(request):
-    cart = Cart(request)
+    cart = Cart.for_request(request)
     s = cart.summary()             # {items, subtotal, discount, total, coupon_code, coupon_error}
     items = list(s["items"])       # materializuojam
 
@@ -75,63 +71,32 @@ def checkout_view(request):
     if payment_method not in ("cod", "paysera", "stripe"):
         payment_method = "cod"
 
-    with transaction.atomic():
-        # 1) atsargų patikra (be mažinimo)
-        for line in items:
-            v = Variant.objects.select_for_update().get(pk=line.variant.pk)
-            if line.qty > v.stock:
-                messages.error(
-                    request,
-                    f"Prekei „{v.product.name} {v.color} {v.size}“ trūksta likučio."
-                )
-                return redirect("cart:cart_view")
-
-        # 2) Pradinis statusas pagal PM
-        initial_status = (
-            "cod_placed" if payment_method == "cod"
-            else "paysera_pending" if payment_method == "paysera"
-            else "pending"   # stripe
+    # Pradinis statusas pagal PM
+    initial_status = (
+        "cod_placed" if payment_method == "cod"
+        else "paysera_pending" if payment_method == "paysera"
+        else "pending"   # stripe
+    )
+
+    # Užsakymas + eilutės + atsargų rezervacija (stock mažinsim tik kai apmokėta)
+    try:
+        order = place_order(form.cleaned_data, s, payment_method, initial_status)
+    except OutOfStock as e:
+        v = next(line.variant for line in items if line.variant.pk in e.variant_ids)
+        messages.error(
+            request,
+            f"Prekei „{v.product.name} {v.color} {v.size}“ trūksta likučio."
         )
+        return redirect("cart:cart_view")
 
-        # 3) Užsakymas (įrašom kuponą ir nuolaidą)
-        order = Order.objects.create(
-            first_name=form.cleaned_data["first_name"],
-            last_name=form.cleaned_data["last_name"],
-            email=form.cleaned_data["email"],
-            address=form.cleaned_data["address"],
-            city=form.cleaned_data["city"],
-            postal_code=form.cleaned_data["postal_code"],
-            shipping_cost=FLAT_SHIPPING,
-            payment_method=payment_method,
-            status=initial_status,
-            coupon_code=(s.get("coupon_code") or ""),
-            discount_amount=(s.get("discount") or Decimal("0")),
-        )
-
-        # 4) Eilutės (stock mažinsim tik kai apmokėta)
-        for line in items:
-            v = line.variant
-            OrderItem.objects.create(
-                order=order,
-                variant=v,
-                product_name=v.product.name,
-                variant_sku=v.sku,
-                qty=line.qty,
-                price=v.price,
-                line_total=(v.price * line.qty),
-            )
-
-        # 5) Bendra suma PO kupono + pristatymas
-        order.total = s["total"] + FLAT_SHIPPING
-        order.save(update_fields=["total"])
-
-    # 6) Krepšelio išvalymas
+    # Krepšelio išvalymas
     if payment_method != "stripe":
         request.session.pop(CART_SESSION_KEY, None)
         request.session.pop(COUPON_SESSION_KEY, None)
+        request.session.pop(CART_SNAPSHOT_KEY, None)
         request.session.modified = True
 
-    # 7) Nukreipimas pagal apmokėjimo būdą
+    # Nukreipimas pagal apmokėjimo būdą
     if payment_method == "paysera":
         return redirect(reverse("paysera_redirect", kwargs={"order_id": order.id}))
 
@@ -190,27 +155,11 @@ def checkout_success(request, order_id: int):
 
                 elif status in ("0", "failed", "cancelled", "canceled"):
                     if order.status != "paid":
-                        order.status = "failed"
-                        order.save(update_fields=["status"])
+                        _mark_failed(order)
     # --- /SS1 fallback ---
 
-    # --- Stripe fallback (jei webhook dar nepažymėjo) ---
-    if order.payment_method == "stripe" and order.status != "paid":
-        pi_id = getattr(order, "stripe_pi_id", None)
-        if pi_id:
-            try:
-                stripe.api_key = settings.STRIPE_SECRET_KEY
-                pi = stripe.PaymentIntent.retrieve(pi_id)
-                pi_status = getattr(pi, "status", "")
-
-                if pi_status == "succeeded" and order.status != "paid":
-                    _mark_paid_and_decrease_stock(order)
-                elif pi_status in {"requires_payment_method", "canceled"} and order.status != "paid":
-                    order.status = "failed"
-                    order.save(update_fields=["status"])
-            except Exception:
-                logger.exception("Stripe fallback poll failed on success page")
-    # --- /Stripe fallback ---
+    # --- Stripe: vietinė būsena; PI tikrinamas tik fone (jei webhook dar nepažymėjo) ---
+    payment_status(order)
 
     ctx = {
         "order": order,
@@ -223,9 +172,17 @@ def checkout_success(request, order_id: int):
     return render(request, "checkout/success.html", ctx)
 
 
+@require_GET
+def checkout_status(request, order_id: int):
+    """Lengvas success puslapio JS poll'as: tik vietinė būsena (+ foninis Stripe atnaujinimas)."""
+    order = get_object_or_404(Order.objects.only("id", "status", "payment_method", "stripe_pi_id"), pk=order_id)
+    status = payment_status(order)
+    return JsonResponse({"status": status, "paid": status == "paid"})
+
+
 @require_POST
 def checkout_create_order_api(request):
-    cart = Cart(request)
+    cart = Cart.for_request(request)
     s = cart.summary()
     items = list(s["items"])
     if not items:
@@ -235,42 +192,14 @@ def checkout_create_order_api(request):
     if not form.is_valid():
         return JsonResponse({"error": "Patikrinkite formos laukus."}, status=400)
 
-    with transaction.atomic():
-        # 1) likučiai
-        for line in items:
-            v = Variant.objects.select_for_update().get(pk=line.variant.pk)
-            if line.qty > v.stock:
-                return JsonResponse({"error": f"Likutis nepakankamas: {v.product.name} {v.color} {v.size}."}, status=400)
-
-        # 2) orderis (Stripe flow)
-        order = Order.objects.create(
-            first_name=form.cleaned_data["first_name"],
-            last_name=form.cleaned_data["last_name"],
-            email=form.cleaned_data["email"],
-            address=form.cleaned_data["address"],
-            city=form.cleaned_data["city"],
-            postal_code=form.cleaned_data["postal_code"],
-            shipping_cost=FLAT_SHIPPING,
-            payment_method="stripe",
-            status="pending",
-            coupon_code=(s.get("coupon_code") or ""),
-            discount_amount=(s.get("discount") or Decimal("0")),
-        )
-
-        for line in items:
-            v = line.variant
-            OrderItem.objects.create(
-                order=order,
-                variant=v,
-                product_name=v.product.name,
-                variant_sku=v.sku,
-                qty=line.qty,
-                price=v.price,
-                line_total=v.price * line.qty,
-            )
-
-        order.total = s["total"] + FLAT_SHIPPING
-        order.save(update_fields=["total"])
+    # orderis (Stripe flow) + likučių rezervacija; ankstesnio nepavykusio bandymo rezervacijos atlaisvinamos
+    abandon_pending_order(request.session)
+    try:
+        order = place_order(form.cleaned_data, s, "stripe", "pending")
+    except OutOfStock as e:
+        v = next(line.variant for line in items if line.variant.pk in e.variant_ids)
+        return JsonResponse({"error": f"Likutis nepakankamas: {v.product.name} {v.color} {v.size}."}, status=400)
+    request.session[PENDING_ORDER_SESSION_KEY] = order.id
 
     client_secret = _ensure_pi_for_order(order)
     return JsonResponse({"order_id": order.id, "clientSecret": client_secret})
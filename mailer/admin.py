@@ -0,0 +1,18 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "to", "status", "attempts", "next_attempt_at", "sent_at", "created_at")
+    list_filter = ("status", "created_at")
+    search_fields = ("subject", "key")
+    readonly_fields = ("key", "attempts", "claimed_at", "last_error", "created_at", "sent_at")
+    actions = ["requeue"]
+
+    @admin.action(description="Siųsti iš naujo")
+    def requeue(self, request, queryset):
+        queryset.exclude(status=OutboundEmail.STATUS_SENT).update(
+            status=OutboundEmail.STATUS_QUEUED, attempts=0, next_attempt_at=timezone.now(), last_error=""
+        )
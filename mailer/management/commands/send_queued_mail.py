@@ -0,0 +1,50 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from mailer.services import process_batch
+from mailer.transport import MailTransport
+
+class Command(BaseCommand):
+    help = "Išsiunčia laiškus iš OutboundEmail eilės (keli worker'iai, pakartojimai su backoff)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Lygiagrečių gijų skaičius")
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument("--every", type=float, default=0,
+                            help="Tikrinti eilę kas N sekundžių (0 – išsiųsti kas yra ir baigti, pvz. cron'ui)")
+
+    def handle(self, *args, **options):
+        totals = []
+        threads = [
+            threading.Thread(target=self._work, args=(options, totals), daemon=True)
+            for _ in range(max(1, options["workers"]))
+        ]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                t.join()
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Sent {sum(totals)} e-mails."))
+
+    def _work(self, options, totals):
+        sent = 0
+        transport = MailTransport()   # kiekvienai gijai – sava, tarp partijų neuždaroma
+        try:
+            while True:
+                close_old_connections()
+                n = process_batch(options["batch_size"], transport=transport)
+                sent += n
+                if n:
+                    continue
+                if not options["every"]:
+                    return
+                time.sleep(options["every"])
+        finally:
+            transport.close()
+            totals.append(sent)
+            close_old_connections()
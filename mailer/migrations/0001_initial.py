@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(blank=True, max_length=100, null=True, unique=True)),
+                ('subject', models.CharField(max_length=255)),
+                ('from_email', models.CharField(max_length=255)),
+                ('to', models.JSONField(default=list)),
+                ('body_text', models.TextField()),
+                ('body_html', models.TextField(blank=True, default='')),
+                ('status', models.CharField(choices=[('queued', 'Eilėje'), ('sending', 'Siunčiama'), ('sent', 'Išsiųsta'), ('failed', 'Nepavyko')], default='queued', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField()),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbound_due_idx')],
+            },
+        ),
+    ]
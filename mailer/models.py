@@ -0,0 +1,45 @@
+from django.db import models
+
+
+class OutboundEmail(models.Model):
+    """
+    Išsiunčiamų laiškų eilė. Request'as tik įrašo eilutę, SMTP siuntimą atlieka
+    worker'is (manage.py send_queued_mail) – žr. mailer/services.py.
+    """
+    STATUS_QUEUED = "queued"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Eilėje"),
+        (STATUS_SENDING, "Siunčiama"),
+        (STATUS_SENT, "Išsiųsta"),
+        (STATUS_FAILED, "Nepavyko"),
+    ]
+
+    # pvz. "order:12:customer" – tas pats laiškas į eilę patenka tik kartą
+    key = models.CharField(max_length=100, unique=True, null=True, blank=True)
+
+    subject = models.CharField(max_length=255)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    body_text = models.TextField()
+    body_html = models.TextField(blank=True, default="")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbound_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)} ({self.status})"
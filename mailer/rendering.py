@@ -0,0 +1,106 @@
+# mailer/rendering.py — laiškų šablonų kompiliavimo cache ir CSS „inline'inimas“
+"""
+Laiškų šablonai sukompiliuojami vieną kartą procese (compiled()). HTML šablonų
+<style data-inline> blokas išskleidžiamas į style="" atributus dar prieš kompiliavimą –
+t. y. vieną kartą šablonui, ne kiekvienam laiškui.
+
+    ctx = Context({...})                                        # kontekstas kuriamas vieną kartą
+    text, html = render_pair("emails/order_confirmation", ctx)  # .txt + .html
+
+Palaikomi paprasti selektoriai: `tag`, `.klase`, `tag.klase` ir jų sąrašai per kablelį.
+Taisyklės taikomos dokumento tvarka, elemento paties style="" – paskutinis (svarbiausias).
+Kitos taisyklės (`a:hover`, `td > p`, @media ...) neinline'inamos: jos paliekamos įprastame
+<style> bloke (jį supranta dauguma pašto klientų), o nepalaikomi selektoriai – žurnale.
+"""
+import logging
+import re
+from functools import lru_cache
+from typing import Tuple
+
+from django.template import Context, TemplateDoesNotExist, engines
+
+log = logging.getLogger(__name__)
+
+STYLE_BLOCK_RE = re.compile(r"\s*<style\s+data-inline\s*>(.*?)</style>", re.S | re.I)
+RULE_RE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+AT_RULE_RE = re.compile(r"@[^{};]+(?:;|\{(?:[^{}]*\{[^{}]*\})*[^{}]*\})")
+START_TAG_RE = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*)(\s[^<>]*?)?(/?)>")
+CLASS_ATTR_RE = re.compile(r"""\sclass\s*=\s*(["'])(.*?)\1""", re.S)
+STYLE_ATTR_RE = re.compile(r"""\sstyle\s*=\s*(["'])(.*?)\1""", re.S)
+SELECTOR_RE = re.compile(r"^([a-zA-Z][a-zA-Z0-9]*)?(?:\.([\w-]+))?$")
+
+
+def _parse_rules(css: str):
+    """(inline'inamos taisyklės, <style> bloke paliekamas CSS)."""
+    css = COMMENT_RE.sub("", css)
+    kept = [m.group(0).strip() for m in AT_RULE_RE.finditer(css)]
+    rules = []
+    for selectors, decls in RULE_RE.findall(AT_RULE_RE.sub("", css)):
+        decls = ";".join(d.strip() for d in decls.split(";") if d.strip())
+        for selector in selectors.split(","):
+            selector = selector.strip()
+            m = SELECTOR_RE.match(selector)
+            if not m or not any(m.groups()):
+                log.warning("Nepalaikomas CSS selektorius laiško šablone (paliekamas <style>): %r", selector)
+                kept.append(f"{selector} {{ {decls} }}")
+                continue
+            rules.append(((m.group(1) or "").lower(), m.group(2), decls))
+    return rules, kept
+
+
+def inline_css(html: str) -> str:
+    """Perkelia <style data-inline> taisykles į atitinkamų elementų style="" atributus."""
+    rules, kept = [], []
+    for css in STYLE_BLOCK_RE.findall(html):
+        block_rules, block_kept = _parse_rules(css)
+        rules.extend(block_rules)
+        kept.extend(block_kept)
+    if not rules and not kept:
+        return html
+    # pirmo bloko vietoje – neinline'inamos taisyklės, kiti blokai išmetami
+    blocks = iter([f"<style>{' '.join(kept)}</style>" if kept else ""])
+    html = STYLE_BLOCK_RE.sub(lambda m: next(blocks, ""), html)
+
+    def apply(m):
+        tag, attrs, selfclose = m.group(1).lower(), m.group(2) or "", m.group(3)
+        class_m = CLASS_ATTR_RE.search(attrs)
+        classes = set(class_m.group(2).split()) if class_m else set()
+        decls = [d for t, c, d in rules if (not t or t == tag) and (not c or c in classes)]
+        if not decls:
+            return m.group(0)
+        style_m = STYLE_ATTR_RE.search(attrs)
+        if style_m:
+            decls.append(style_m.group(2).strip().rstrip(";"))
+            attrs = attrs[:style_m.start()] + attrs[style_m.end():]
+        return f'<{m.group(1)}{attrs} style="{";".join(decls)}"{selfclose}>'
+
+    return START_TAG_RE.sub(apply, html)
+
+
+@lru_cache(maxsize=None)
+def compiled(name: str):
+    """Sukompiliuotas šablonas (django.template.base.Template), .html – jau su inline CSS."""
+    engine = engines["django"].engine
+    template = engine.get_template(name)
+    if name.endswith(".html"):
+        template = engine.from_string(inline_css(template.source))
+    return template
+
+
+def clear_cache():
+    compiled.cache_clear()
+
+
+def render(name: str, context: Context) -> str:
+    return compiled(name).render(context)
+
+
+def render_pair(base: str, context: Context) -> Tuple[str, str]:
+    """(text, html) iš `<base>.txt` ir `<base>.html`; HTML šablono gali ir nebūti."""
+    text = render(f"{base}.txt", context)
+    try:
+        html = render(f"{base}.html", context)
+    except TemplateDoesNotExist:
+        html = ""
+    return text, html
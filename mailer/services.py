@@ -0,0 +1,117 @@
+# mailer/services.py — laiškų eilė: enqueue() request'e, process_batch() worker'yje
+"""
+Worker'io ciklas:
+    claim_batch()  – optimistiškai pasiima laiškus (UPDATE ... WHERE status=<buvęs>),
+                     todėl keli worker'iai/gijos to paties laiško nepaims du kartus;
+    deliver()      – siunčia per MailTransport (ta pati SMTP jungtis daugeliui laiškų);
+    nepavykus      – attempts++, next_attempt_at = now + backoff; po MAILER_MAX_ATTEMPTS – failed.
+
+„sending“ būsenoje užstrigę laiškai (nukritęs worker'is) po MAILER_CLAIM_TIMEOUT vėl tampa laisvi.
+"""
+import logging
+from datetime import timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboundEmail
+from .transport import MailTransport
+
+log = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(subject: str, body_text: str, to: List[str], body_html: str = "",
+            from_email: Optional[str] = None, key: Optional[str] = None) -> Optional[OutboundEmail]:
+    """Įrašo laišką į eilę. Jei laiškas su tokiu key jau yra – nieko nedaro ir grąžina None."""
+    email = OutboundEmail(
+        key=key,
+        subject=subject,
+        from_email=from_email or _setting("DEFAULT_FROM_EMAIL", "no-reply@localhost"),
+        to=list(to),
+        body_text=body_text,
+        body_html=body_html,
+        next_attempt_at=timezone.now(),
+    )
+    try:
+        with transaction.atomic():
+            email.save()
+    except IntegrityError:
+        if key and OutboundEmail.objects.filter(key=key).exists():
+            return None
+        raise
+    return email
+
+
+def backoff(attempts: int) -> timedelta:
+    """Eksponentinis atidėjimas: 1, 2, 4, 8 ... min., ne daugiau kaip MAILER_MAX_BACKOFF."""
+    base = _setting("MAILER_BACKOFF_SECONDS", 60)
+    cap = _setting("MAILER_MAX_BACKOFF", 3600)
+    return timedelta(seconds=min(cap, base * 2 ** max(0, attempts - 1)))
+
+
+def claim_batch(limit: int = 20) -> List[OutboundEmail]:
+    now = timezone.now()
+    stale = now - timedelta(seconds=_setting("MAILER_CLAIM_TIMEOUT", 600))
+    due = OutboundEmail.objects.filter(
+        Q(status=OutboundEmail.STATUS_QUEUED, next_attempt_at__lte=now)
+        | Q(status=OutboundEmail.STATUS_SENDING, claimed_at__lt=stale)
+    ).order_by("next_attempt_at", "id")
+
+    claimed = []
+    for pk, status, claimed_at in due.values_list("pk", "status", "claimed_at")[:limit]:
+        # laimi tik tas, kurio UPDATE dar rado tą pačią būseną
+        won = OutboundEmail.objects.filter(pk=pk, status=status, claimed_at=claimed_at).update(
+            status=OutboundEmail.STATUS_SENDING, claimed_at=now, attempts=F("attempts") + 1
+        )
+        if won:
+            claimed.append(pk)
+    return list(OutboundEmail.objects.filter(pk__in=claimed).order_by("id"))
+
+
+def build_message(email: OutboundEmail) -> EmailMultiAlternatives:
+    msg = EmailMultiAlternatives(email.subject, email.body_text, email.from_email, email.to)
+    if email.body_html:
+        msg.attach_alternative(email.body_html, "text/html")
+    return msg
+
+
+def deliver(email: OutboundEmail, transport: MailTransport) -> bool:
+    try:
+        transport.send(build_message(email))
+    except Exception as e:
+        failed = email.attempts >= _setting("MAILER_MAX_ATTEMPTS", 5)
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            status=OutboundEmail.STATUS_FAILED if failed else OutboundEmail.STATUS_QUEUED,
+            next_attempt_at=timezone.now() + backoff(email.attempts),
+            last_error=f"{type(e).__name__}: {e}"[:2000],
+        )
+        log.warning("Laiškas #%s neišsiųstas (bandymas %s): %s", email.pk, email.attempts, e)
+        return False
+
+    OutboundEmail.objects.filter(pk=email.pk).update(
+        status=OutboundEmail.STATUS_SENT, sent_at=timezone.now(), last_error=""
+    )
+    return True
+
+
+def process_batch(limit: int = 20, transport: Optional[MailTransport] = None) -> int:
+    """
+    Pasiima ir išsiunčia iki limit laiškų; grąžina išsiųstų skaičių.
+    Worker'is perduoda savo transport – tada SMTP jungtis išlieka tarp partijų.
+    """
+    batch = claim_batch(limit)
+    if not batch:
+        return 0
+    if transport is None:
+        # savo jungtis – uždaroma baigus šią partiją
+        with MailTransport() as own:
+            return sum(deliver(email, own) for email in batch)
+    return sum(deliver(email, transport) for email in batch)
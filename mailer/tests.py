@@ -0,0 +1,157 @@
+import socketserver
+import threading
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from checkout.models import Order
+from .models import OutboundEmail
+from .rendering import compiled, inline_css
+from .services import claim_batch, enqueue, process_batch
+from .transport import MailTransport
+
+
+class OutboundQueueTests(TestCase):
+    def test_order_emails_are_queued_not_sent(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(
+                first_name="Jonas", last_name="Jonaitis", email="jonas@example.com",
+                address="Gedimino pr. 1", city="Vilnius", postal_code="01103", status="cod_placed",
+            )
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.STATUS_QUEUED).count(), 2)
+        html = OutboundEmail.objects.get(key=f"order:{order.id}:customer").body_html
+        self.assertIn('<th align="left" style="border-bottom:1px solid #eee">', html)
+        self.assertNotIn("<style", html)
+
+        self.assertEqual(process_batch(), 2)
+        self.assertEqual(sorted(m.subject for m in mail.outbox),
+                         sorted([f"Užsakymo #{order.id} patvirtinimas", f"Naujas užsakymas #{order.id}"]))
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT).exists())
+
+    def test_key_deduplicates(self):
+        self.assertIsNotNone(enqueue("A", "a", ["a@example.com"], key="once"))
+        self.assertIsNone(enqueue("A", "a", ["a@example.com"], key="once"))
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+    def test_failure_backs_off_then_gives_up(self):
+        email = enqueue("A", "a", ["a@example.com"])
+        with self.settings(MAILER_MAX_ATTEMPTS=2), \
+                mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=OSError("smtp down")):
+            self.assertEqual(process_batch(), 0)
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_QUEUED, 1))
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            self.assertEqual(claim_batch(), [])   # dar neatėjo laikas
+
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            process_batch()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_FAILED, 2))
+        self.assertIn("smtp down", email.last_error)
+
+
+class RenderingTests(SimpleTestCase):
+    def test_inline_css_merges_rules_before_own_style(self):
+        html = (
+            "<style data-inline>td { padding:4px } td.x, .y { color:red }</style>"
+            '<table><tr><td class="x" style="color:blue">{{ a }}</td><td>b</td><p class="y">c</p></tr></table>'
+        )
+        self.assertEqual(
+            inline_css(html),
+            '<table><tr><td class="x" style="padding:4px;color:red;color:blue">{{ a }}</td>'
+            '<td style="padding:4px">b</td><p class="y" style="color:red">c</p></tr></table>',
+        )
+
+    def test_unsupported_rules_stay_in_style_block(self):
+        html = (
+            "<style data-inline>td { padding:4px } a:hover, .y { color:red }"
+            "@media (max-width:600px) { td { padding:0 } }</style>"
+            '<td>a</td><a class="y">b</a>'
+        )
+        with self.assertLogs("mailer.rendering", "WARNING"):
+            result = inline_css(html)
+        self.assertEqual(
+            result,
+            "<style>@media (max-width:600px) { td { padding:0 } } a:hover { color:red }</style>"
+            '<td style="padding:4px">a</td><a class="y" style="color:red">b</a>',
+        )
+
+    def test_templates_are_compiled_once(self):
+        self.assertIs(compiled("emails/order_confirmation.html"), compiled("emails/order_confirmation.html"))
+
+
+class _SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Minimalus vietinis SMTP serveris: skaičiuoja jungtis ir priimtus laiškus."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        self.connections = 0
+        self.messages = 0
+        self.drop_after = None   # po tiek priimtų laiškų vieną kartą nutraukia jungtį
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.connections += 1
+        self.wfile.write(b"220 localhost ESMTP\r\n")
+        for line in self.rfile:
+            cmd = line.strip().upper()
+            if cmd.startswith(b"MAIL") and self.server.drop_after is not None \
+                    and self.server.messages >= self.server.drop_after:
+                self.server.drop_after = None
+                return
+            if cmd.startswith(b"DATA"):
+                self.wfile.write(b"354 go ahead\r\n")
+                for body in self.rfile:
+                    if body in (b".\r\n", b".\n"):
+                        break
+                self.server.messages += 1
+                self.wfile.write(b"250 queued\r\n")
+            elif cmd.startswith(b"QUIT"):
+                self.wfile.write(b"221 bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 ok\r\n")
+
+
+class MailTransportTests(SimpleTestCase):
+    def setUp(self):
+        self.server = _SMTPStandIn()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def _messages(self, n):
+        return (EmailMessage(f"#{i}", "body", "shop@example.com", ["a@example.com"]) for i in range(n))
+
+    def test_reuses_one_smtp_connection_and_recycles(self):
+        smtp = "django.core.mail.backends.smtp.EmailBackend"
+        with self.settings(EMAIL_HOST="127.0.0.1", EMAIL_PORT=self.server.server_address[1], EMAIL_USE_TLS=False):
+            with MailTransport(backend=smtp, batch_size=4, max_messages=8) as transport:
+                self.assertEqual(transport.send_many(self._messages(10)), 10)
+                self.assertTrue(transport.send(next(self._messages(1))))
+        self.assertEqual(self.server.messages, 11)
+        self.assertEqual(self.server.connections, 2)   # 8 + 3
+
+    def test_reconnect_resends_only_unaccepted_messages(self):
+        smtp = "django.core.mail.backends.smtp.EmailBackend"
+        self.server.drop_after = 2
+        with self.settings(EMAIL_HOST="127.0.0.1", EMAIL_PORT=self.server.server_address[1], EMAIL_USE_TLS=False):
+            with MailTransport(backend=smtp, batch_size=5) as transport:
+                self.assertEqual(transport.send_many(self._messages(5)), 5)
+        self.assertEqual(self.server.messages, 5)   # be dublikatų
+        self.assertEqual(self.server.connections, 2)
+
+    def test_rate_limit_spaces_batches(self):
+        with mock.patch("mailer.transport.time.sleep") as sleep:
+            with MailTransport(batch_size=5, rate=10) as transport:
+                transport.send_many(self._messages(15))
+        self.assertEqual(len(mail.outbox), 15)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertAlmostEqual(sleep.call_args_list[-1].args[0], 1.0, delta=0.1)   # 3-ia partija – po 1 s
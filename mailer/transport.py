@@ -0,0 +1,122 @@
+# mailer/transport.py — SMTP jungties pakartotinis naudojimas, partijos ir siuntimo greičio riba
+"""
+Vienas MailTransport = viena atvira backend'o jungtis (SMTP, locmem, file ...), kuri
+naudojama daugeliui laiškų ir atnaujinama kas MAILER_CONNECTION_MAX_MESSAGES arba nutrūkus
+(tada per naują jungtį siunčiami tik dar nepriimti partijos laiškai – be dublikatų).
+
+    with MailTransport() as transport:
+        transport.send_many(messages)     # partijomis po MAILER_BATCH_SIZE
+        transport.send_many(messages, on_done=cb)   # cb(message, klaida | None) – progresui;
+                                          #   atmestas adresas partijos tada nestabdo
+        transport.send(message)           # po vieną (eilės worker'iui – klaida konkrečiam laiškui)
+
+MailTransport nėra thread-safe – kiekviena gija turi savo.
+"""
+import smtplib
+import time
+from typing import Callable, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+# klaidos, po kurių verta vieną kartą bandyti per naują jungtį
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+def _chunks(iterable: Iterable, size: int):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class MailTransport:
+    def __init__(self, backend=None, batch_size=None, rate=None, max_messages=None):
+        self.backend = backend
+        self.batch_size = batch_size or getattr(settings, "MAILER_BATCH_SIZE", 50)
+        # laiškai per sekundę (0 – neribojama), kad neperžengtume tiekėjo limitų
+        self.rate = rate if rate is not None else getattr(settings, "MAILER_RATE_LIMIT", 0)
+        self.max_messages = max_messages or getattr(settings, "MAILER_CONNECTION_MAX_MESSAGES", 100)
+        self._conn = None
+        self._sent_on_conn = 0
+        self._next_slot = 0.0
+        self.connections_opened = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is not None and self._sent_on_conn >= self.max_messages:
+            self.close()
+        if self._conn is None:
+            conn = get_connection(self.backend)
+            conn.open()
+            self._conn = conn
+            self._sent_on_conn = 0
+            self.connections_opened += 1
+        return self._conn
+
+    def _throttle(self, n: int):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        if self._next_slot > now:
+            time.sleep(self._next_slot - now)
+            now = self._next_slot
+        self._next_slot = now + n / self.rate
+
+    def _send_batch(self, messages: List, on_done: Optional[Callable] = None) -> int:
+        self._throttle(len(messages))
+        sent = 0
+        done = 0          # kiek partijos laiškų serveris jau priėmė (ar atmetė) – jų nekartojam
+        reconnected = False
+        while done < len(messages):
+            message = messages[done]
+            error = None
+            try:
+                # po vieną per tą pačią jungtį: nutrūkus vidury partijos žinom, kur sustota
+                sent += self._connection().send_messages([message]) or 0
+            except RECONNECT_ERRORS:
+                if reconnected:
+                    raise
+                # serveris uždarė „seną“ jungtį – likusius bandome dar kartą per naują
+                self.close()
+                reconnected = True
+                continue
+            except smtplib.SMTPException as e:
+                # atmestas gavėjas / DATA klaida – jungtis tvarkinga (smtplib daro RSET)
+                if on_done is None:
+                    raise
+                error = e
+            done += 1
+            self._sent_on_conn += 1
+            if on_done is not None:
+                on_done(message, error)
+        return sent
+
+    def send(self, message) -> bool:
+        """Vienas laiškas; klaida iškeliama kvietėjui."""
+        return self._send_batch([message]) == 1
+
+    def send_many(self, messages: Iterable, on_done: Optional[Callable] = None) -> int:
+        """
+        Siunčia (ir generatorių) partijomis; grąžina išsiųstų skaičių.
+        on_done(message, error) kviečiamas kiekvienam apdorotam laiškui (error – None, jei
+        priimtas); su juo atskiro laiško SMTP klaida perduodama jam, o ne iškeliama.
+        """
+        return sum(self._send_batch(batch, on_done) for batch in _chunks(messages, self.batch_size))
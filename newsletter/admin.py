@@ -4,7 +4,7 @@ from django.contrib import admin
 from django.contrib import admin
 from django.http import HttpResponse
 import csv
-from .models import Subscriber
+from .models import Campaign, Subscriber
 
 @admin.register(Subscriber)
 class SubscriberAdmin(admin.ModelAdmin):
@@ -30,3 +30,10 @@ class SubscriberAdmin(admin.ModelAdmin):
     @admin.action(description="Mark as active")
     def activate(self, request, queryset):
         queryset.update(is_active=True)
+
+
+@admin.register(Campaign)
+class CampaignAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "sent_count", "created_at", "sent_at")
+    list_filter = ("status",)
+    readonly_fields = ("status", "last_subscriber_id", "sent_count", "sent_at")
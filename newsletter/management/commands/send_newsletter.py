@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mailer.transport import MailTransport
+from newsletter.models import Campaign
+from newsletter.services import send_campaign
+
+class Command(BaseCommand):
+    help = "Išsiunčia naujienlaiškio kampaniją aktyviems prenumeratoriams (tęsia nutrūkusią)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("campaign_id", type=int)
+        parser.add_argument("--rate", type=float, default=None, help="Laiškų per sekundę riba")
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            campaign = Campaign.objects.get(pk=options["campaign_id"])
+        except Campaign.DoesNotExist:
+            raise CommandError(f"Kampanija #{options['campaign_id']} nerasta.")
+        if campaign.status == "sent":
+            raise CommandError(f"Kampanija #{campaign.pk} jau išsiųsta.")
+
+        with MailTransport(batch_size=options["batch_size"], rate=options["rate"]) as transport:
+            n = send_campaign(campaign, transport=transport)
+        self.stdout.write(self.style.SUCCESS(
+            f"Campaign #{campaign.pk}: sent {n} e-mails over {transport.connections_opened} connection(s)."
+        ))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Campaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255)),
+                ('body_text', models.TextField()),
+                ('body_html', models.TextField(blank=True, default='')),
+                ('status', models.CharField(choices=[('draft', 'Juodraštis'), ('sending', 'Siunčiama'), ('sent', 'Išsiųsta')], default='draft', max_length=10)),
+                ('last_subscriber_id', models.PositiveBigIntegerField(default=0)),
+                ('sent_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
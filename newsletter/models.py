@@ -14,3 +14,29 @@ class Subscriber(models.Model):
 
     def __str__(self):
         return self.email
+
+
+class Campaign(models.Model):
+    """Naujienlaiškio kampanija – siunčiama `manage.py send_newsletter <id>` (newsletter/services.py)."""
+    STATUS_CHOICES = [
+        ("draft", "Juodraštis"),
+        ("sending", "Siunčiama"),
+        ("sent", "Išsiųsta"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body_text = models.TextField()
+    body_html = models.TextField(blank=True, default="")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="draft")
+    # iki kurio Subscriber.id jau išsiųsta – nutrūkus siuntimą galima tęsti
+    last_subscriber_id = models.PositiveBigIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return self.subject
@@ -0,0 +1,94 @@
+# newsletter/services.py — naujienlaiškio kampanijos siuntimas
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.utils import timezone
+
+from mailer.rendering import inline_css
+from mailer.transport import MailTransport
+from .models import Campaign, Subscriber
+
+log = logging.getLogger(__name__)
+
+
+def _messages(campaign: Campaign, emails):
+    from_email = getattr(settings, "DEFAULT_FROM_EMAIL", "no-reply@localhost")
+    html = inline_css(campaign.body_html) if campaign.body_html else ""   # kartą kampanijai
+    for email in emails:
+        msg = EmailMultiAlternatives(campaign.subject, campaign.body_text, from_email, [email])
+        if html:
+            msg.attach_alternative(html, "text/html")
+        yield msg
+
+
+def send_campaign(campaign: Campaign, transport: MailTransport = None, chunk_size: int = 500) -> int:
+    """
+    Išsiunčia kampaniją aktyviems prenumeratoriams. Prenumeratoriai skaitomi srautu
+    (.iterator(), pagal id), laiškai siunčiami partijomis per vieną SMTP jungtį.
+    Po kiekvienos partijos įrašomas progresas, todėl nutrūkus siuntimą jis tęsiamas
+    nuo last_subscriber_id. Grąžina šio paleidimo metu išsiųstų laiškų skaičių.
+    """
+    own_transport = transport is None
+    transport = transport or MailTransport()
+    Campaign.objects.filter(pk=campaign.pk).update(status="sending")
+
+    rows = (
+        Subscriber.objects.filter(is_active=True, pk__gt=campaign.last_subscriber_id)
+        .order_by("pk")
+        .values_list("pk", "email")
+        .iterator(chunk_size=chunk_size)
+    )
+    sent = 0
+    batch = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= transport.batch_size:
+                sent += _send_batch(campaign, transport, batch)
+                batch = []
+        if batch:
+            sent += _send_batch(campaign, transport, batch)
+    finally:
+        if own_transport:
+            transport.close()
+
+    campaign.status = "sent"
+    campaign.sent_at = timezone.now()
+    campaign.save(update_fields=["status", "sent_at"])
+    return sent
+
+
+def _refused(campaign: Campaign, email: str, error: Exception) -> None:
+    """Atmestas gavėjas: visam laikui (5xx) atmestą adresą išjungiam, kad kitos kampanijos jo nebandytų."""
+    codes = [code for code, _ in getattr(error, "recipients", {}).values()]
+    if codes and min(codes) >= 500:
+        Subscriber.objects.filter(email=email).update(is_active=False)
+    log.warning("Kampanija #%s: %s neišsiųsta: %s: %s", campaign.pk, email, type(error).__name__, error)
+
+
+def _send_batch(campaign: Campaign, transport: MailTransport, batch) -> int:
+    subscriber_ids = {email: pk for pk, email in batch}
+    last_id, sent = None, 0
+
+    def done(message, error):
+        nonlocal last_id, sent
+        email = message.to[0]
+        last_id = subscriber_ids[email]
+        if error is None:
+            sent += 1
+        else:
+            _refused(campaign, email, error)
+
+    try:
+        transport.send_many(_messages(campaign, [email for _, email in batch]), on_done=done)
+    finally:
+        # progresas – iki paskutinio apdoroto, net jei jungtis galutinai nutrūko vidury partijos
+        if last_id is not None:
+            campaign.last_subscriber_id = last_id
+            campaign.sent_count += sent
+            Campaign.objects.filter(pk=campaign.pk).update(
+                last_subscriber_id=campaign.last_subscriber_id, sent_count=campaign.sent_count
+            )
+            log.info("Kampanija #%s: išsiųsta %s (iki subscriber #%s)", campaign.pk, campaign.sent_count, campaign.last_subscriber_id)
+    return sent
@@ -1,3 +1,74 @@
+import smtplib
+
+from django.core import mail
+from django.core.mail.backends import locmem
 from django.test import TestCase
 
-# Create your tests here.
+from mailer.transport import MailTransport
+from .models import Campaign, Subscriber
+from .services import send_campaign
+
+
+class _RefusingBackend(locmem.EmailBackend):
+    """s3 – neegzistuojanti dėžutė (550), s4 – jungtis nutrūksta kiekvieną kartą."""
+    refuse = "s3@example.com"
+    drop = None
+
+    def send_messages(self, messages):
+        for m in messages:
+            if m.to[0] == self.refuse:
+                raise smtplib.SMTPRecipientsRefused({m.to[0]: (550, b"no such user")})
+            if m.to[0] == self.drop:
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        return super().send_messages(messages)
+
+
+class _DroppingBackend(_RefusingBackend):
+    refuse = None
+    drop = "s4@example.com"
+
+
+class CampaignSendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Subscriber.objects.bulk_create(
+            [Subscriber(email=f"s{i}@example.com") for i in range(7)]
+            + [Subscriber(email="off@example.com", is_active=False)]
+        )
+        cls.campaign = Campaign.objects.create(subject="Naujiena", body_text="Sveiki", body_html="<p>Sveiki</p>")
+
+    def test_sends_to_active_subscribers_in_batches(self):
+        with MailTransport(batch_size=3) as transport:
+            self.assertEqual(send_campaign(self.campaign, transport=transport, chunk_size=2), 7)
+        self.assertEqual(len(mail.outbox), 7)
+        self.assertNotIn(["off@example.com"], [m.to for m in mail.outbox])
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.status, self.campaign.sent_count), ("sent", 7))
+
+    def test_resumes_after_last_subscriber(self):
+        cutoff = Subscriber.objects.order_by("pk")[4].pk
+        Campaign.objects.filter(pk=self.campaign.pk).update(last_subscriber_id=cutoff, sent_count=5)
+        self.campaign.refresh_from_db()
+        self.assertEqual(send_campaign(self.campaign), 2)
+        self.assertEqual(self.campaign.sent_count, 7)
+
+    def test_refused_recipient_is_skipped_and_deactivated(self):
+        with MailTransport(backend="newsletter.tests._RefusingBackend", batch_size=3) as transport:
+            self.assertEqual(send_campaign(self.campaign, transport=transport), 6)
+        self.assertEqual(len(mail.outbox), 6)
+        self.assertNotIn(["s3@example.com"], [m.to for m in mail.outbox])
+        self.assertFalse(Subscriber.objects.get(email="s3@example.com").is_active)
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.status, self.campaign.sent_count), ("sent", 6))
+
+    def test_fatal_disconnect_keeps_progress_for_resume(self):
+        with MailTransport(backend="newsletter.tests._DroppingBackend", batch_size=3) as transport:
+            with self.assertRaises(smtplib.SMTPServerDisconnected):
+                send_campaign(self.campaign, transport=transport)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, "sending")
+        self.assertEqual(self.campaign.last_subscriber_id, Subscriber.objects.get(email="s3@example.com").pk)
+        self.assertEqual(self.campaign.sent_count, 4)
+
+        self.assertEqual(send_campaign(self.campaign), 3)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), sorted(f"s{i}@example.com" for i in range(7)))
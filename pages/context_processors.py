@@ -1,4 +1,4 @@
-from .models import SiteSettings
+from .services import get_site_settings
 
 def site_settings(request):
-    return {"site": SiteSettings.objects.first()}
+    return {"site": get_site_settings()}
@@ -0,0 +1,15 @@
+# pages/management/commands/build_sitemaps.py
+from django.core.management.base import BaseCommand
+
+from shop.sitemaps import build_all
+
+
+class Command(BaseCommand):
+    help = "Sugeneruoja pasikeitusius (arba --force – visus) sitemap failus į cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Perstatyti visus, ne tik trūkstamus")
+
+    def handle(self, *args, **options):
+        n = build_all(force=options["force"])
+        self.stdout.write(self.style.SUCCESS(f"Sitemaps built: {n}."))
@@ -0,0 +1,44 @@
+# pages/management/commands/warm_page_cache.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from catalog.models import ProductListing
+
+
+class Command(BaseCommand):
+    help = "Užpildo pilnų puslapių cache: pradžia, /shop/ ir didžiausių kategorijų pirmi puslapiai"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=10, help="Kiek didžiausių kategorijų (default 10)")
+        parser.add_argument("--pages", type=int, default=1, help="Kiek sąrašo puslapių kiekvienai (default 1)")
+
+    def handle(self, *args, **options):
+        top = (
+            ProductListing.objects.values("category_slug")
+            .annotate(n=Count("product"))
+            .order_by("-n", "category_slug")[: options["categories"]]
+        )
+        shop = reverse("product_list")
+        urls = [reverse("home"), reverse("about"), reverse("blog_list")]
+        urls += [f"{shop}?page={p}" for p in range(1, options["pages"] + 1)]
+        urls += [
+            f"{shop}?category={row['category_slug']}&page={p}"
+            for row in top
+            for p in range(1, options["pages"] + 1)
+        ]
+
+        # pilnas middleware kelias kaip tikram anonimui (host/schema patenka į raktą)
+        client = Client(HTTP_HOST=settings.SITE_HOST)
+        secure = settings.SITE_SCHEME == "https"
+        states = {}
+        for url in urls:
+            resp = client.get(url, secure=secure)
+            state = resp.get("X-Page-Cache", "skip")
+            states[state] = states.get(state, 0) + 1
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{resp.status_code} {state:<5} {url}")
+        summary = ", ".join(f"{k}: {v}" for k, v in sorted(states.items()))
+        self.stdout.write(self.style.SUCCESS(f"Warmed {len(urls)} pages ({summary})."))
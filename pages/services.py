@@ -0,0 +1,21 @@
+# pages/services.py — cache'inti svetainės „rėmo“ duomenys (žr. shop.singletons)
+from shop.singletons import singletons
+from .models import SiteSettings, HomePage
+
+SITE_SETTINGS = "site_settings"
+HOME_PAGE = "home_page"
+
+
+def get_site_settings():
+    return singletons.get(SITE_SETTINGS, lambda: SiteSettings.objects.first())
+
+
+def _load_home_page():
+    home = HomePage.objects.first()
+    tiles = list(home.tiles.filter(is_active=True).order_by("order")) if home else []
+    return home, tiles
+
+
+def get_home_page():
+    """Grąžina (HomePage | None, [aktyvios HomeTile])."""
+    return singletons.get(HOME_PAGE, _load_home_page)
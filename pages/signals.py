@@ -0,0 +1,57 @@
+# pages/signals.py — singleton ir sitemap cache invalidacija po admin pakeitimų
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalog import versions
+from catalog.models import Category, Product
+from shop import pagecache, sitemaps
+from shop.singletons import singletons
+from .models import SiteSettings, HomePage, HomeTile, StaticPage
+from .services import SITE_SETTINGS, HOME_PAGE
+
+
+@receiver(post_save, sender=SiteSettings, dispatch_uid="singleton_site_settings_saved")
+@receiver(post_delete, sender=SiteSettings, dispatch_uid="singleton_site_settings_deleted")
+def invalidate_site_settings(sender, **kwargs):
+    def invalidate():
+        singletons.invalidate(SITE_SETTINGS)
+        versions.touch("site")   # katalogo ETag'ai (header'is/footer'is)
+        pagecache.bump("site")
+    # po commit'o – kitaip lygiagretus request'as spėtų į cache vėl įdėti seną eilutę
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=HomePage, dispatch_uid="singleton_home_saved")
+@receiver(post_delete, sender=HomePage, dispatch_uid="singleton_home_deleted")
+@receiver(post_save, sender=HomeTile, dispatch_uid="singleton_home_tile_saved")
+@receiver(post_delete, sender=HomeTile, dispatch_uid="singleton_home_tile_deleted")
+def invalidate_home_page(sender, **kwargs):
+    def invalidate():
+        singletons.invalidate(HOME_PAGE)
+        pagecache.bump("pages")
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=StaticPage, dispatch_uid="pagecache_static_page_saved")
+@receiver(post_delete, sender=StaticPage, dispatch_uid="pagecache_static_page_deleted")
+def invalidate_static_pages(sender, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: pagecache.bump("pages"))
+
+
+# ---- Sitemap'ai (shop.sitemaps): išmetam tik paveiktą puslapį + indeksą (po commit'o) ----
+
+@receiver(post_save, sender=Product, dispatch_uid="sitemap_product_saved")
+@receiver(post_delete, sender=Product, dispatch_uid="sitemap_product_deleted")
+def invalidate_product_sitemap(sender, instance, raw=False, **kwargs):
+    if not raw:
+        pk = instance.pk   # po delete instance.pk jau None
+        transaction.on_commit(lambda: sitemaps.invalidate_product(pk))
+
+
+@receiver(post_save, sender=Category, dispatch_uid="sitemap_category_saved")
+@receiver(post_delete, sender=Category, dispatch_uid="sitemap_category_deleted")
+def invalidate_category_sitemap(sender, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: sitemaps.invalidate_section("categories"))
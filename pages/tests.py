@@ -1,3 +1,141 @@
-from django.test import TestCase
+import re
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.models import Category, Product
+from shop import pagecache, sitemaps
+from shop.singletons import singletons
+from .models import HomePage, HomeTile, SiteSettings
+
+
+class SingletonCacheTests(TestCase):
+    def setUp(self):
+        singletons.invalidate("site_settings", "home_page")
+
+    def tearDown(self):
+        singletons.invalidate("site_settings", "home_page")
+
+    def _chrome_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return [q for q in ctx.captured_queries if '"pages_' in q["sql"]]
+
+    def test_steady_state_renders_without_chrome_queries(self):
+        SiteSettings.objects.create(site_name="Urock test")
+        home = HomePage.objects.create(hero_title="Labas")
+        HomeTile.objects.create(home=home, title="Paltai", image="pages/tiles/a.jpg", link_url="/shop/")
+
+        self.assertTrue(self._chrome_queries(reverse("home")))
+        self.assertEqual(self._chrome_queries(reverse("home")), [])
+        self.assertEqual(self._chrome_queries(reverse("product_list")), [])
+
+        stats = singletons.stats()["site_settings"]
+        self.assertGreaterEqual(stats["misses"], 1)
+        self.assertGreaterEqual(stats["local_hits"] + stats["shared_hits"], 2)
+
+    def test_admin_save_invalidates_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            site = SiteSettings.objects.create(site_name="Senas")
+        self.assertContains(self.client.get(reverse("product_list")), "Senas")
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            site.site_name = "Naujas"
+            site.save()
+            # transakcija dar neįvykdyta – cache'e turi likti tai, ką mato kiti procesai
+            self.assertIsNotNone(singletons.cache.get(singletons.key_prefix + "site_settings"))
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertIsNone(singletons.cache.get(singletons.key_prefix + "site_settings"))
+        self.assertContains(self.client.get(reverse("product_list")), "Naujas")
+
+
+@override_settings(SITEMAP_PAGE_SIZE=2, SITE_HOST="urock.test", SITE_SCHEME="https")
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cat = Category.objects.create(name="Hoodies")
+        cls.products = [Product.objects.create(name=f"Hoodie {i}", category=cat) for i in range(4)]
+
+    def setUp(self):
+        sitemaps._cache().clear()
+
+    def test_served_from_cache_with_validators(self):
+        page = sitemaps.product_page(self.products[0].pk)
+        url = reverse("sitemap_section_page", kwargs={"section": "products", "page": page})
+        first = self.client.get(url)
+        self.assertContains(first, f"https://urock.test/shop/{self.products[0].slug}/")
+        with self.assertNumQueries(0):
+            again = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+        index = self.client.get(reverse("sitemap"))
+        self.assertContains(index, f"https://urock.test/sitemap-products-{page}.xml")
+        self.assertContains(index, "https://urock.test/sitemap-categories.xml")
+        self.assertIn("Last-Modified", index)
+
+    def test_product_change_rebuilds_only_its_page(self):
+        self.assertEqual(sitemaps.build_all(), 5)   # 2 produktų puslapiai + categories + static + indeksas
+        changed = self.products[-1]
+        changed.name = "Naujas"
+        with self.captureOnCommitCallbacks(execute=True):
+            changed.save()
+        self.assertEqual(sitemaps.build_all(), 2)   # tik jo puslapis + indeksas
+        self.assertEqual(self.client.get("/sitemap-products-999.xml").status_code, 404)
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Hoodies")
+        cls.product = Product.objects.create(name="Hoodie", category=cls.category, price=20, stock=5)
+
+    def setUp(self):
+        pagecache._cache().clear()
+
+    def test_anonymous_hit_needs_no_queries_and_gets_own_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        self.assertEqual(client.get(reverse("home"))["X-Page-Cache"], "miss")
+        with self.assertNumQueries(0):
+            hit = client.get(reverse("home"))
+        self.assertEqual(hit["X-Page-Cache"], "hit")
+        self.assertNotContains(hit, pagecache.CSRF_PLACEHOLDER)
+
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', hit.content.decode()).group(1)
+        resp = client.post(reverse("newsletter_subscribe"), {"email": "a@b.lt", "csrfmiddlewaretoken": token})
+        self.assertNotEqual(resp.status_code, 403)
+
+    def test_query_is_normalized_and_signals_invalidate(self):
+        url = reverse("product_list")
+        self.assertEqual(self.client.get(url, {"page": 1, "utm_source": "x"})["X-Page-Cache"], "miss")
+        self.assertEqual(self.client.get(url)["X-Page-Cache"], "hit")
+        self.product.name = "Striukė"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+            # iki commit'o kartos nekeičiam – kitaip senas HTML pakliūtų į naują kartą
+            self.assertEqual(self.client.get(url)["X-Page-Cache"], "hit")
+        resp = self.client.get(url)
+        self.assertEqual(resp["X-Page-Cache"], "miss")
+        self.assertContains(resp, "Striukė")
+
+    def test_cart_contents_bypass_cache(self):
+        self.client.get(reverse("product_list"))
+        self.client.post(reverse("cart:cart_add"), {"variant_id": self.product.variants.get().pk, "qty": 1})
+        resp = self.client.get(reverse("product_list"))
+        self.assertNotIn("X-Page-Cache", resp)
+        self.assertContains(resp, "Cart: 1 vnt")
+
+    def test_warm_command_fills_top_categories(self):
+        call_command("warm_page_cache", categories=1, stdout=StringIO())
+        resp = self.client.get(
+            reverse("product_list"), {"category": self.category.slug},
+            HTTP_HOST=settings.SITE_HOST, secure=settings.SITE_SCHEME == "https",
+        )
+        self.assertEqual(resp["X-Page-Cache"], "hit")
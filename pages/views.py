@@ -1,27 +1,22 @@
 # pages/views.py
 from django.views.generic import TemplateView
 from django.shortcuts import render, get_object_or_404
+from django.utils.decorators import method_decorator
 
-from .models import StaticPage, HomePage
+from shop.pagecache import page_cache
+from .models import StaticPage
+from .services import get_home_page
 
 
+@method_decorator(page_cache("pages"), name="get")
 class HomeView(TemplateView):
     template_name = "home.html"
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
 
-        home = (
-            HomePage.objects
-            .prefetch_related("tiles")
-            .only(
-                "hero_title", "hero_subtitle", "hero_note",
-                "hero_cta_text", "hero_cta_url",
-                "seo_title", "seo_description", "hero_image"
-            )
-            .first()
-        )
-        tiles = home.tiles.filter(is_active=True).order_by("order") if home else []
+        # HomePage + aktyvios plytelės iš singleton cache (invaliduojama signalais)
+        home, tiles = get_home_page()
 
         ctx.update({
             "home": home,               # <— pasirinkau 'home'
@@ -36,6 +31,7 @@ class HomeView(TemplateView):
         return ctx
 
 
+@page_cache("pages")
 def about_view(request):
     page = get_object_or_404(StaticPage, slug="about", is_published=True)
     ctx = {
@@ -1,5 +1,10 @@
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET
+
+from shop import sitemaps
 
 def robots_txt(request):
     host = getattr(settings, "SITE_HOST", request.get_host() or "")
@@ -9,3 +14,28 @@ Disallow:
 Sitemap: https://{host}/sitemap.xml
 """
     return HttpResponse(body, content_type="text/plain")
+
+
+def _sitemap_response(request, entry):
+    """Iš anksto sugeneruotas sitemap'as kaip baitai su ETag/Last-Modified (304 robotams)."""
+    last_modified = int(entry["last_modified"].timestamp())
+    response = get_conditional_response(request, etag=entry["etag"], last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(entry["body"], content_type="application/xml")
+    response.headers["ETag"] = entry["etag"]
+    response.headers["Last-Modified"] = http_date(last_modified)
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return response
+
+
+@require_GET
+def sitemap_index(request):
+    return _sitemap_response(request, sitemaps.get_index())
+
+
+@require_GET
+def sitemap_section(request, section, page=1):
+    entry = sitemaps.get_section(section, page)
+    if entry is None:
+        raise Http404("No such sitemap")
+    return _sitemap_response(request, entry)
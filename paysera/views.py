@@ -3,14 +3,19 @@ from decimal import Decimal
 import logging
 
 from django.conf import settings
+from django.contrib import messages
 from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
-from catalog.models import Variant
+from catalog.stock import OutOfStock, record_sale, release_order_holds
 from checkout.models import Order
+from checkout.services import reserve_order
+from webhooks.models import WebhookEvent
+from webhooks.services import ingest
 from .utils import make_payment_data, parse_callback, PAYMENT_URL
 
 logger = logging.getLogger(__name__)
@@ -28,8 +33,13 @@ def paysera_redirect(request, order_id: int):
     if order.payment_method != "paysera":
         return redirect(reverse("checkout_success", kwargs={"order_id": order.id}))
 
-    # Jei buvo nepavykęs bandymas – leiskime bandyti iš naujo
+    # Jei buvo nepavykęs bandymas – leiskime bandyti iš naujo (rezervacijos nepavykus atlaisvintos)
     if order.status == "failed":
+        try:
+            reserve_order(order)
+        except OutOfStock:
+            messages.error(request, "Deja, dalies prekių likutis jau išparduotas – užsakymo apmokėti nebegalima.")
+            return redirect(reverse("checkout_success", kwargs={"order_id": order.id}))
         order.status = "paysera_pending"
         order.save(update_fields=["status"])
 
@@ -100,44 +110,31 @@ def paysera_callback(request):
 
     order_id = int(parsed.get("orderid", "0") or "0")
     status   = (parsed.get("status", "") or "").lower()
-    amount_ct = parsed.get("amount", "")
-    currency  = (parsed.get("currency", "") or "").upper()
 
-    order = get_object_or_404(Order, pk=order_id)
-
-    if order.payment_method != "paysera":
-        return render(request, "paysera/plain.txt", {"text": "OK"}, content_type="text/plain")
-    if order.status == "paid":
-        return render(request, "paysera/plain.txt", {"text": "OK"}, content_type="text/plain")
-
-    success = status in ("1", "success")
-
-    # (pasirinktinai) sutikrinti sumą/valiutą
-    try:
-        expected_ct = int((order.total * Decimal("100")).quantize(Decimal("1")))
-    except Exception:
-        expected_ct = None
-    if success and ((currency and currency != "EUR") or (amount_ct.isdigit() and expected_ct is not None and int(amount_ct) != expected_ct)):
-        success = False
-
-    if not success:
-        order.status = "failed"
-        order.save(update_fields=["status"])
-        logger.warning("Paysera FAIL: order=%s status=%s", order.id, status)
-        return render(request, "paysera/plain.txt", {"text": "OK"}, content_type="text/plain")
-
-    # Sekmes kelias – sutvarkom per helperį
-    _mark_paid_and_decrease_stock(order)
-
-    logger.info("Paysera OK: order=%s status=%s", order.id, status)
+    # tik įrašom į inbox'ą ir iškart atsakom – apdoroja webhooks worker'is (paysera/webhooks.py);
+    # Paysera retry su tuo pačiu orderid+status – dublikatas, ignoruojamas
+    ingest(WebhookEvent.PROVIDER_PAYSERA, f"{order_id}:{status}", status, dict(parsed), order_id=order_id or None)
     return render(request, "paysera/plain.txt", {"text": "OK"}, content_type="text/plain")
 
 def _mark_paid_and_decrease_stock(order):
+    """
+    Pažymi užsakymą apmokėtu ir nurašo likučius per catalog.stock (vienas UPDATE visoms
+    atmainoms, idempotentiška – pakartotinis callback'as likučių antrą kartą nebemažina).
+    """
     with transaction.atomic():
-        for item in order.items.select_related("variant").select_for_update():
-            v: Variant = item.variant
-            v.stock = max(0, v.stock - item.qty)
-            v.save(update_fields=["stock"])
+        Order.objects.select_for_update().only("pk").get(pk=order.pk)   # lygiagretūs callback'ai eina po vieną
+        record_sale(order.pk, order.items.values_list("variant_id", "qty"))
         order.status = "paid"
         order.save(update_fields=["status"])
 
+
+def _mark_failed(order):
+    """
+    Nepavykęs mokėjimas – bet jau apmokėto užsakymo (lygiagretus callback'as) nebekeičiam.
+    Rezervacijos atlaisvinamos iškart, kad pakartotinis bandymas (ar kitas pirkėjas)
+    nelauktų STOCK_HOLD_TTL_MINUTES.
+    """
+    with transaction.atomic():
+        if Order.objects.filter(pk=order.pk).exclude(status="paid").update(status="failed", updated_at=timezone.now()):
+            release_order_holds(order.pk)
+            order.status = "failed"
@@ -0,0 +1,41 @@
+# paysera/webhooks.py — Paysera callback'ų apdorojimas (iškviečia webhooks worker'is)
+from decimal import Decimal
+import logging
+
+from checkout.models import Order
+from .views import _mark_failed, _mark_paid_and_decrease_stock
+
+logger = logging.getLogger(__name__)
+
+
+def handle_event(event):
+    """event.payload – parse_callback() rezultatas (parašas jau patikrintas view'e)."""
+    parsed = event.payload
+    status    = (parsed.get("status", "") or "").lower()
+    amount_ct = parsed.get("amount", "")
+    currency  = (parsed.get("currency", "") or "").upper()
+
+    order = Order.objects.filter(pk=event.order_id).first()
+    if order is None:
+        logger.warning("Paysera: užsakymas %s nerastas", event.order_id)
+        return
+    if order.payment_method != "paysera" or order.status == "paid":
+        return
+
+    success = status in ("1", "success")
+
+    # (pasirinktinai) sutikrinti sumą/valiutą
+    try:
+        expected_ct = int((order.total * Decimal("100")).quantize(Decimal("1")))
+    except Exception:
+        expected_ct = None
+    if success and ((currency and currency != "EUR") or (amount_ct.isdigit() and expected_ct is not None and int(amount_ct) != expected_ct)):
+        success = False
+
+    if not success:
+        _mark_failed(order)
+        logger.warning("Paysera FAIL: order=%s status=%s", order.id, status)
+        return
+
+    _mark_paid_and_decrease_stock(order)
+    logger.info("Paysera OK: order=%s status=%s", order.id, status)
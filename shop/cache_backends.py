@@ -0,0 +1,74 @@
+# shop/cache_backends.py — Django cache backend'ai su hit/miss skaitliukais (cache_stats komandai)
+"""
+Skaitliukai kaupiami procese ir kas FLUSH_EVERY get() iškvietimų „nupilami“ į tą patį cache
+(raktai __stats__:hits / __stats__:misses), todėl file/redis backend'e matomi visiems procesams.
+Redis INFO keyspace_hits/misses skaičiuojami visam serveriui (visiems alias'ams kartu), todėl
+ir Redis alias'ai turi savo skaitliukus.
+"""
+import threading
+
+from django.core.cache.backends import filebased, locmem, redis
+
+STATS_HITS = "__stats__:hits"
+STATS_MISSES = "__stats__:misses"
+FLUSH_EVERY = 100
+
+_MISSING = object()
+
+
+class StatsMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._stats_local = threading.local()
+        self._pending = [0, 0]   # [hits, misses]
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if not getattr(self._stats_local, "busy", False):
+            self._record(value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def _record(self, hit: bool):
+        with self._stats_lock:
+            self._pending[0 if hit else 1] += 1
+            if sum(self._pending) < FLUSH_EVERY:
+                return
+            hits, misses = self._pending
+            self._pending = [0, 0]
+        self._flush(hits, misses)
+
+    def _flush(self, hits: int, misses: int):
+        self._stats_local.busy = True
+        try:
+            for key, n in ((STATS_HITS, hits), (STATS_MISSES, misses)):
+                if n and not self.add(key, n, timeout=None):
+                    try:
+                        self.incr(key, n)
+                    except ValueError:   # raktas ką tik išnyko
+                        self.set(key, n, timeout=None)
+        finally:
+            self._stats_local.busy = False
+
+    def hit_stats(self):
+        """(hits, misses): suvestinė cache'e + dar nenupilti šio proceso skaičiai."""
+        self._stats_local.busy = True
+        try:
+            hits = self.get(STATS_HITS, 0)
+            misses = self.get(STATS_MISSES, 0)
+        finally:
+            self._stats_local.busy = False
+        with self._stats_lock:
+            return hits + self._pending[0], misses + self._pending[1]
+
+
+class LocMemCache(StatsMixin, locmem.LocMemCache):
+    pass
+
+
+class FileBasedCache(StatsMixin, filebased.FileBasedCache):
+    pass
+
+
+class RedisCache(StatsMixin, redis.RedisCache):
+    pass
@@ -0,0 +1,63 @@
+# shop/management/commands/cache_stats.py
+import os
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+
+def _human(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+
+def _ratio(hits, misses) -> str:
+    return f"{hits / (hits + misses):.1%}" if hits is not None and (hits + misses) else "n/a"
+
+
+class Command(BaseCommand):
+    help = "Parodo kiekvieno CACHES alias'o hit ratio ir dydį"
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"CACHE_BACKEND={getattr(settings, 'CACHE_BACKEND', '?')}")
+        for alias in settings.CACHES:
+            cache = caches[alias]
+            try:
+                hits, misses, size, server = self._stats(cache)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"{alias:<10} klaida: {e}"))
+                continue
+
+            self.stdout.write(f"{alias:<10} {type(cache).__name__:<14} hit ratio: {_ratio(hits, misses):<7} size: {size}")
+            if server:
+                self.stdout.write(f"{'':<10} serveris (visi alias'ai): {server}")
+
+    def _stats(self, cache):
+        """Grąžina (hits | None, misses | None, dydžio aprašas, serverio suvestinė | None)."""
+        hits = misses = None
+        if hasattr(cache, "hit_stats"):   # shop.cache_backends – šio alias'o skaitliukai
+            hits, misses = cache.hit_stats()
+
+        if isinstance(cache, FileBasedCache):
+            files = [f for f in cache._list_cache_files() if os.path.exists(f)]
+            total = sum(os.path.getsize(f) for f in files)
+            return hits, misses, f"{len(files)} keys, {_human(total)}", None
+
+        if isinstance(cache, LocMemCache):
+            # locmem gyvena procese – komanda mato tik savo (tuščią) egzempliorių
+            return hits, misses, f"{len(cache._cache)} keys (tik šis procesas)", None
+
+        client = getattr(getattr(cache, "_cache", None), "get_client", None)
+        if client is not None:  # django RedisCache: dbsize – šio alias'o DB, INFO – viso serverio
+            c = client()
+            info = c.info("stats")
+            mem = c.info("memory").get("used_memory", 0)
+            server = f"hit ratio: {_ratio(info.get('keyspace_hits', 0), info.get('keyspace_misses', 0))}, {_human(mem)}"
+            return hits, misses, f"{c.dbsize()} keys", server
+
+        return None, None, "n/a", None
@@ -0,0 +1,136 @@
+# shop/pagecache.py — pilnų puslapių cache anonimams su tuščiu krepšeliu
+"""
+Raktas: schema + host + kelias + normalizuoti parametrai (category, page, q) + grupių kartos.
+Kartas („generation“) kelia signalai (catalog/pages/blog), todėl invalidacija – O(1):
+seni įrašai tiesiog nebeskaitomi ir išsenka pagal TIMEOUT.
+
+Apeinama, jei: ne GET/HEAD, prisijungęs vartotojas, krepšelyje yra prekių arba laukia messages.
+
+CSRF: renderinant cache'ui šablonas gauna vietoj token'o žymą (csrf_placeholder context
+processorius), o kiekvienam lankytojui atiduodant žyma pakeičiama jo paties token'u.
+
+Naudojimas:
+    @page_cache("pages")
+    def about_view(request): ...
+    pagecache.bump("catalog")
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from cart.services import CART_SESSION_KEY
+
+GEN_KEY = "page:gen:{}"
+PAGE_KEY = "page:{}:{}"
+QUERY_PARAMS = ("category", "page", "q")
+CSRF_PLACEHOLDER = "__page_cache_csrf__"
+
+
+def _cache():
+    return caches[getattr(settings, "PAGE_CACHE_ALIAS", "fragments")]
+
+
+def enabled() -> bool:
+    return getattr(settings, "PAGE_CACHE_ENABLED", True)
+
+
+def bump(*groups):
+    """Paseniname visus grupių puslapius (signalams)."""
+    now = time.time()
+    _cache().set_many({GEN_KEY.format(g): now for g in groups}, None)
+
+
+def _generations(groups) -> str:
+    cache = _cache()
+    keys = [GEN_KEY.format(g) for g in groups]
+    found = cache.get_many(keys)
+    for k in keys:
+        if k not in found:
+            cache.add(k, time.time(), None)
+            found[k] = cache.get(k)
+    return "-".join(repr(found[k]) for k in keys)
+
+
+def normalized_query(request) -> str:
+    pairs = []
+    for name in QUERY_PARAMS:
+        value = (request.GET.get(name) or "").strip()
+        if name == "page" and value == "1":
+            value = ""
+        if value:
+            pairs.append(f"{name}={value}")
+    return "&".join(pairs)
+
+
+def page_key(request, groups) -> str:
+    url = f"{request.scheme}://{request.get_host()}{request.path}?{normalized_query(request)}"
+    return PAGE_KEY.format(_generations(groups), hashlib.md5(url.encode()).hexdigest())
+
+
+def _cacheable_request(request) -> bool:
+    if not enabled() or request.method not in ("GET", "HEAD"):
+        return False
+    # be sesijos slapuko – tikrai anonimas su tuščiu krepšeliu (sesija neliečiama)
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        if request.user.is_authenticated:
+            return False
+        if (request.session.get(CART_SESSION_KEY) or {}).get("items"):
+            return False
+    return not len(get_messages(request))
+
+
+def _personalize(content: bytes, request) -> bytes:
+    marker = CSRF_PLACEHOLDER.encode()
+    if marker in content:
+        content = content.replace(marker, get_token(request).encode())
+    return content
+
+
+def _response(entry, request, state):
+    response = HttpResponse(_personalize(entry["content"], request), content_type=entry["content_type"])
+    response["X-Page-Cache"] = state
+    return response
+
+
+def page_cache(*groups, timeout=None):
+    """View'o dekoratorius; visi puslapiai priklauso ir grupei "site" (header'is/footer'is)."""
+    groups = ("site",) + groups
+
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if not _cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            cache = _cache()
+            key = page_key(request, groups)
+            entry = cache.get(key)
+            if entry is not None:
+                return _response(entry, request, "hit")
+
+            request._page_cache_capture = True
+            response = view(request, *args, **kwargs)
+            if hasattr(response, "render") and callable(response.render):
+                response = response.render()   # TemplateResponse
+            if response.status_code != 200 or response.streaming or response.cookies:
+                return response
+            entry = {"content": response.content, "content_type": response["Content-Type"]}
+            cache.set(key, entry, timeout if timeout is not None else getattr(settings, "PAGE_CACHE_TIMEOUT", 600))
+            return _response(entry, request, "miss")
+
+        return inner
+
+    return decorator
+
+
+def csrf_placeholder(request):
+    """Context processorius: cache'uojamam renderiui – žyma vietoj lankytojo CSRF token'o."""
+    if getattr(request, "_page_cache_capture", False):
+        return {"csrf_token": CSRF_PLACEHOLDER}
+    return {}
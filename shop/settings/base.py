@@ -53,6 +53,9 @@ INSTALLED_APPS = [
 
 INSTALLED_APPS += ["django.contrib.sitemaps"]
 INSTALLED_APPS += ["newsletter"]
+INSTALLED_APPS += ["mailer"]
+INSTALLED_APPS += ["webhooks"]
+INSTALLED_APPS += ["shop"]   # valdymo komandos (cache_stats)
 
 
 MIDDLEWARE = [
@@ -80,6 +83,7 @@ TEMPLATES = [{
             "cart.context_processors.cart_info",
             "pages.context_processors.site_settings",
             "stripe_payments.context_processors.stripe_public_key",
+            "shop.pagecache.csrf_placeholder",
         ],
     },
 }]
@@ -107,6 +111,72 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# ========= Cache =========
+# CACHE_BACKEND: "locmem" (numatytas, vieno proceso) | "file" (bendras visiems procesams per diską)
+#                | "redis" (Redis ar suderinamas lokalus serveris – Valkey/KeyDB; reikia `pip install redis`)
+# Aliasai: default, fragments (šablonų fragmentai/puslapiai), sessions, querysets (singleton'ai ir pan.),
+#          ratelimit. Ataskaita: `python manage.py cache_stats` (skaitliukai – shop.cache_backends).
+CACHE_ALIASES = {
+    # alias: (TIMEOUT sek., redis DB numeris)
+    "default": (300, 0),
+    "fragments": (600, 1),
+    "sessions": (60 * 60 * 24 * 14, 2),
+    "querysets": (3600, 3),
+    "ratelimit": (60, 4),
+}
+
+
+def build_caches(backend: str) -> dict:
+    backend = (backend or "locmem").strip().lower()
+    cache_dir = Path(os.getenv("CACHE_DIR", str(BASE_DIR / ".cache")))
+    redis_url = os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379").rstrip("/")
+
+    caches = {}
+    for alias, (timeout, db) in CACHE_ALIASES.items():
+        if backend == "redis":
+            conf = {
+                "BACKEND": "shop.cache_backends.RedisCache",
+                "LOCATION": f"{redis_url}/{db}",
+            }
+        elif backend == "file":
+            conf = {
+                "BACKEND": "shop.cache_backends.FileBasedCache",
+                "LOCATION": str(cache_dir / alias),
+                "OPTIONS": {"MAX_ENTRIES": 10000},
+            }
+        else:
+            conf = {
+                "BACKEND": "shop.cache_backends.LocMemCache",
+                "LOCATION": f"urock-{alias}",
+            }
+        conf["TIMEOUT"] = timeout
+        conf["KEY_PREFIX"] = "urock"
+        caches[alias] = conf
+    return caches
+
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+CACHES = build_caches(CACHE_BACKEND)
+
+# Sesijos: skaitymai iš cache, rašymai – ir į DB (saugu net su locmem)
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+SESSION_CACHE_ALIAS = "sessions"
+
+# shop.singletons (SiteSettings/HomePage/BlogSettings)
+SINGLETON_CACHE_ALIAS = "querysets"
+
+# catalog.versions – versijų žymos katalogo ETag/Last-Modified (304) atsakymams
+CATALOG_VERSION_CACHE_ALIAS = "default"
+
+# shop.pagecache – pilni puslapiai anonimams su tuščiu krepšeliu (warm_page_cache komanda)
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "true").lower() == "true"
+PAGE_CACHE_ALIAS = "fragments"
+PAGE_CACHE_TIMEOUT = 600
+
+# shop.sitemaps – iš anksto sugeneruoti sitemap failai
+SITEMAP_CACHE_ALIAS = "fragments"
+SITEMAP_PAGE_SIZE = 5000   # produktų id per vieną sitemap-products-<n>.xml
+
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
@@ -117,6 +187,21 @@ REST_FRAMEWORK = {
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "info@urock.lt")
 ORDER_ADMIN_EMAIL = os.getenv("ORDER_ADMIN_EMAIL", "info@urock.lt")
 
+# Laiškų eilė (mailer) – siunčia `manage.py send_queued_mail`
+MAILER_MAX_ATTEMPTS = int(os.getenv("MAILER_MAX_ATTEMPTS", "5"))
+MAILER_BACKOFF_SECONDS = 60      # 1, 2, 4, 8 ... min.
+MAILER_MAX_BACKOFF = 3600
+MAILER_CLAIM_TIMEOUT = 600       # po tiek sek. „sending“ laiškas vėl laisvas (nukritęs worker'is)
+MAILER_BATCH_SIZE = 50
+MAILER_RATE_LIMIT = float(os.getenv("MAILER_RATE_LIMIT", "0"))   # laiškų/s per giją, 0 – be ribos
+MAILER_CONNECTION_MAX_MESSAGES = 100   # po tiek laiškų SMTP jungtis atnaujinama
+
+# Galerijos nuotraukų apdorojimas (catalog.images) – `manage.py process_images`
+IMAGE_MAX_ATTEMPTS = 3
+IMAGE_CLAIM_TIMEOUT = 600       # po tiek sek. „processing“ nuotrauka vėl laisva (nukritęs worker'is)
+IMAGE_BACKOFF_SECONDS = 60       # nepavykus – kitas bandymas po 1, 2, 4 ... min.
+IMAGE_MAX_BACKOFF = 3600
+
 # === Paysera ===
 PAYSERA_PROJECT_ID = int(os.getenv("PAYSERA_PROJECT_ID", "0"))
 PAYSERA_SIGN_PASSWORD = os.getenv("PAYSERA_SIGN_PASSWORD", "")
@@ -133,6 +218,20 @@ STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY", "")
 STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY", "")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "")
 STRIPE_CURRENCY = os.getenv("STRIPE_CURRENCY", "eur")
+STRIPE_API_BASE = os.getenv("STRIPE_API_BASE", "https://api.stripe.com")   # netikram serveriui testuose
+STRIPE_CONNECT_TIMEOUT = 3       # sek. – stripe_payments.client
+STRIPE_READ_TIMEOUT = 15
+STRIPE_MAX_NETWORK_RETRIES = 2   # SDK retry'ai (su idempotency raktais)
+STRIPE_HTTP_POOL_SIZE = 10       # keep-alive jungčių į api.stripe.com
+STRIPE_STATUS_TIMEOUT = 3        # sek. – PaymentIntent būsenos užklausos biudžetas (fone)
+STRIPE_STATUS_CACHE_TTL = 10     # sek. – kiek laikom PI būseną cache'e
+
+# Mokėjimų webhook'ų inbox'as (webhooks) – apdoroja `manage.py process_webhooks`
+WEBHOOK_MAX_ATTEMPTS = 8
+WEBHOOK_CLAIM_TIMEOUT = 300
+
+# Likučio rezervacija checkout'e (catalog.stock.reserve) – kiek minučių laikom prekę
+STOCK_HOLD_TTL_MINUTES = int(os.getenv("STOCK_HOLD_TTL_MINUTES", "30"))
 
 INSTALLED_APPS += ["django_ckeditor_5"]
 
@@ -19,4 +19,6 @@ SESSION_COOKIE_SECURE = False
 CSRF_COOKIE_SECURE = False
 SECURE_SSL_REDIRECT = False
 
+PAGE_CACHE_ENABLED = False   # kuriant šablonai visada švieži
+
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
@@ -28,6 +28,11 @@ SECURE_CONTENT_TYPE_NOSNIFF = True
 SECURE_REFERRER_POLICY = "strict-origin-when-cross-origin"
 X_FRAME_OPTIONS = "DENY"
 
+# ========= Cache =========
+# PythonAnywhere: keli web worker'iai be Redis – numatytai bendras failų cache
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "file")
+CACHES = build_caches(CACHE_BACKEND)
+
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.yourprovider.com")
 EMAIL_PORT = int(os.getenv("EMAIL_PORT", "587"))
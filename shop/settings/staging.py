@@ -36,6 +36,11 @@ DATABASES = {
     }
 }
 
+# ========= Cache =========
+# PythonAnywhere: keli web worker'iai be Redis – numatytai bendras failų cache
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "file")
+CACHES = build_caches(CACHE_BACKEND)
+
 # ========= Failai =========
 STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_ROOT = BASE_DIR / "media"
@@ -0,0 +1,83 @@
+# shop/singletons.py — retai besikeičiančių „vienetinių“ įrašų (SiteSettings, HomePage, BlogSettings) cache
+"""
+Dviejų lygių cache:
+  1) proceso atmintis (labai trumpas TTL – kiti procesai invalidaciją pamato per jį);
+  2) bendras Django cache (CACHES), invaliduojamas post_save/post_delete signalais.
+
+Naudojimas:
+    from shop.singletons import singletons
+    site = singletons.get("site_settings", lambda: SiteSettings.objects.first())
+    singletons.invalidate("site_settings")
+"""
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+
+_MISSING = object()
+
+
+class SingletonCache:
+    key_prefix = "singleton:"
+
+    def __init__(self, alias=None, timeout=None, local_ttl=None):
+        self._alias = alias
+        self._timeout = timeout
+        self._local_ttl = local_ttl
+        self._local = {}            # name -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"local_hits": 0, "shared_hits": 0, "misses": 0})
+
+    # nustatymai skaitomi tingiai, kad veiktų ir override_settings testuose
+    @property
+    def cache(self):
+        return caches[self._alias or getattr(settings, "SINGLETON_CACHE_ALIAS", "default")]
+
+    @property
+    def timeout(self):
+        return self._timeout if self._timeout is not None else getattr(settings, "SINGLETON_CACHE_TIMEOUT", 3600)
+
+    @property
+    def local_ttl(self):
+        return self._local_ttl if self._local_ttl is not None else getattr(settings, "SINGLETON_CACHE_LOCAL_TTL", 5)
+
+    def get(self, name, loader):
+        now = time.monotonic()
+        entry = self._local.get(name)
+        if entry is not None and entry[1] > now:
+            self._count(name, "local_hits")
+            return entry[0]
+
+        key = self.key_prefix + name
+        wrapped = self.cache.get(key, _MISSING)
+        if wrapped is _MISSING:
+            self._count(name, "misses")
+            wrapped = (loader(),)   # tuple – kad galėtume cache'inti ir None
+            self.cache.set(key, wrapped, self.timeout)
+        else:
+            self._count(name, "shared_hits")
+
+        self._local[name] = (wrapped[0], now + self.local_ttl)
+        return wrapped[0]
+
+    def invalidate(self, *names):
+        for name in names:
+            self._local.pop(name, None)
+        self.cache.delete_many([self.key_prefix + n for n in names])
+
+    def clear_local(self):
+        self._local.clear()
+
+    def _count(self, name, field):
+        with self._lock:
+            self._stats[name][field] += 1
+
+    def stats(self) -> dict:
+        """Šio proceso hit/miss skaitliukai pagal įrašą."""
+        with self._lock:
+            return {name: dict(v) for name, v in self._stats.items()}
+
+
+singletons = SingletonCache()
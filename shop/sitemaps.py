@@ -1,31 +1,48 @@
 # shop/sitemaps.py
+"""
+Sitemap'ai generuojami iš anksto ir laikomi cache'e (SITEMAP_CACHE_ALIAS, prod'e – failai diske):
+
+    /sitemap.xml                      – indeksas
+    /sitemap-products-<n>.xml         – produktai, n-tasis pk intervalas (po SITEMAP_PAGE_SIZE id)
+    /sitemap-categories.xml, /sitemap-static.xml
+
+Produktų puslapiai skaidomi pagal pk intervalus, todėl pakeistas produktas visada priklauso
+tam pačiam puslapiui – signalai (pages/signals.py) išmeta tik jį ir indeksą, o kitą kartą
+(arba `manage.py build_sitemaps`) perstatomas tik tas puslapis.
+"""
+import hashlib
+from types import SimpleNamespace
+
+from django.conf import settings
 from django.contrib.sitemaps import Sitemap
-from django.urls import reverse, NoReverseMatch
+from django.contrib.sitemaps.views import SitemapIndexItem
+from django.core.cache import caches
+from django.db.models import F, Max
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
 from catalog.models import Product, Category
 
+
 class ProductSitemap(Sitemap):
     changefreq = "weekly"
     priority = 0.8
 
+    def __init__(self, pk_range=None):
+        self.pk_range = pk_range
+
     def items(self):
-        try:
-            return Product.objects.filter(is_active=True).order_by("pk")
-        except Exception:
-            return Product.objects.all().order_by("pk")
+        qs = Product.objects.filter(is_active=True).only("slug", "updated_at").order_by("pk")
+        if self.pk_range:
+            qs = qs.filter(pk__range=self.pk_range)
+        return qs
 
     def lastmod(self, obj):
-        return getattr(obj, "updated_at", None) or getattr(obj, "created_at", None)
+        return obj.updated_at
 
     def location(self, obj):
-        for name in ("product_detail", "catalog_product_detail"):
-            try:
-                return reverse(name, kwargs={"slug": obj.slug})
-            except NoReverseMatch:
-                pass
-        try:
-            return obj.get_absolute_url()
-        except Exception:
-            return f"/shop/{obj.slug}/"
+        return reverse("product_detail", kwargs={"slug": obj.slug})
 
 
 class CategorySitemap(Sitemap):
@@ -33,18 +50,11 @@ class CategorySitemap(Sitemap):
     priority = 0.6
 
     def items(self):
-        return Category.objects.all().order_by("pk")
+        return Category.objects.only("slug").order_by("pk")
 
     def location(self, obj):
-        for name in ("category_detail", "catalog_category"):
-            try:
-                return reverse(name, kwargs={"slug": obj.slug})
-            except NoReverseMatch:
-                pass
-        try:
-            return obj.get_absolute_url()
-        except Exception:
-            return f"/shop/{obj.slug}/"
+        # kategorijos atskiro puslapio neturi – tai produktų sąrašo filtras
+        return f"{reverse('product_list')}?category={obj.slug}"
 
 
 class StaticViewSitemap(Sitemap):
@@ -57,3 +67,117 @@ class StaticViewSitemap(Sitemap):
 
     def location(self, name):
         return reverse(name)
+
+
+# ---- Iš anksto sugeneruoti sitemap failai ----
+
+SECTIONS = {"products": ProductSitemap, "categories": CategorySitemap, "static": StaticViewSitemap}
+INDEX_KEY = "sitemap:index"
+SECTION_KEY = "sitemap:{}:{}"
+
+
+def _cache():
+    return caches[getattr(settings, "SITEMAP_CACHE_ALIAS", "fragments")]
+
+
+def page_size() -> int:
+    return getattr(settings, "SITEMAP_PAGE_SIZE", 5000)
+
+
+def product_page(pk: int) -> int:
+    return (pk - 1) // page_size() + 1
+
+
+def _absolute(path: str) -> str:
+    return f"{settings.SITE_SCHEME}://{settings.SITE_HOST}{path}"
+
+
+def _entry(body: str, last_modified) -> dict:
+    data = body.encode("utf-8")
+    return {
+        "body": data,
+        "etag": f'"{hashlib.md5(data).hexdigest()}"',
+        "last_modified": last_modified or timezone.now(),
+    }
+
+
+def _product_pages():
+    """[(puslapis, max(updated_at))] viena GROUP BY užklausa – be produktų eilučių krovimo."""
+    return list(
+        Product.objects.filter(is_active=True)
+        .annotate(page=(F("pk") - 1) / page_size() + 1)
+        .values("page")
+        .annotate(lastmod=Max("updated_at"))
+        .order_by("page")
+        .values_list("page", "lastmod")
+    )
+
+
+def _build_index() -> dict:
+    items = [
+        SitemapIndexItem(_absolute(f"/sitemap-products-{page}.xml"), lastmod)
+        for page, lastmod in _product_pages()
+    ]
+    items += [SitemapIndexItem(_absolute(f"/sitemap-{name}.xml")) for name in ("categories", "static")]
+    lastmods = [i.last_mod for i in items if i.last_mod]
+    return _entry(render_to_string("sitemap_index.xml", {"sitemaps": items}), max(lastmods, default=None))
+
+
+def _build_section(section: str, page: int):
+    if section == "products":
+        first = (page - 1) * page_size() + 1
+        sitemap = ProductSitemap(pk_range=(first, first + page_size() - 1))
+    elif section in SECTIONS and page == 1:
+        sitemap = SECTIONS[section]()
+    else:
+        return None
+    site = SimpleNamespace(domain=settings.SITE_HOST, name=settings.SITE_HOST)
+    urls = sitemap.get_urls(page=1, site=site, protocol=settings.SITE_SCHEME)
+    if not urls and section == "products":
+        return None
+    lastmods = [u["lastmod"] for u in urls if u.get("lastmod")]
+    return _entry(render_to_string("sitemap.xml", {"urlset": urls}), max(lastmods, default=None))
+
+
+def get_index(rebuild: bool = False) -> dict:
+    """{"body": bytes, "etag", "last_modified"} – iš cache, o jei nėra – sugeneruoja ir įrašo."""
+    entry = None if rebuild else _cache().get(INDEX_KEY)
+    if entry is None:
+        entry = _build_index()
+        _cache().set(INDEX_KEY, entry, None)
+    return entry
+
+
+def get_section(section: str, page: int = 1, rebuild: bool = False):
+    """Kaip get_index(); None – tokios sekcijos/puslapio nėra."""
+    key = SECTION_KEY.format(section, page)
+    entry = None if rebuild else _cache().get(key)
+    if entry is None:
+        entry = _build_section(section, page)
+        if entry is None:
+            return None
+        _cache().set(key, entry, None)
+    return entry
+
+
+def invalidate_product(pk: int):
+    _cache().delete_many([INDEX_KEY, SECTION_KEY.format("products", product_page(pk))])
+
+
+def invalidate_section(section: str):
+    _cache().delete_many([INDEX_KEY, SECTION_KEY.format(section, 1)])
+
+
+def build_all(force: bool = False) -> int:
+    """Sugeneruoja trūkstamus (force – visus) failus; grąžina sugeneruotų skaičių."""
+    cache = _cache()
+    wanted = [("products", page) for page, _ in _product_pages()] + [("categories", 1), ("static", 1)]
+    built = 0
+    for section, page in wanted:
+        if force or cache.get(SECTION_KEY.format(section, page)) is None:
+            get_section(section, page, rebuild=True)
+            built += 1
+    if force or cache.get(INDEX_KEY) is None:
+        get_index(rebuild=True)
+        built += 1
+    return built
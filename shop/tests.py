@@ -0,0 +1,63 @@
+import os
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from .cache_backends import FLUSH_EVERY, LocMemCache
+from .settings.base import CACHE_ALIASES, build_caches
+
+
+class BuildCachesTests(SimpleTestCase):
+    def test_env_selects_backend(self):
+        env = {"CACHE_DIR": "/var/cache/urock", "CACHE_REDIS_URL": "redis://cache:6380/"}
+        with mock.patch.dict(os.environ, env):
+            redis = build_caches(" Redis ")
+            files = build_caches("file")
+            default = build_caches("")
+
+        self.assertEqual(set(redis), set(CACHE_ALIASES))
+        self.assertEqual(redis["querysets"]["BACKEND"], "shop.cache_backends.RedisCache")
+        self.assertEqual(redis["querysets"]["LOCATION"], "redis://cache:6380/3")
+        self.assertEqual(files["fragments"]["BACKEND"], "shop.cache_backends.FileBasedCache")
+        self.assertEqual(files["fragments"]["LOCATION"], "/var/cache/urock/fragments")
+        self.assertEqual(default["sessions"]["BACKEND"], "shop.cache_backends.LocMemCache")
+        self.assertEqual(default["sessions"]["TIMEOUT"], CACHE_ALIASES["sessions"][0])
+
+
+@override_settings(CACHES={
+    "default": {"BACKEND": "shop.cache_backends.LocMemCache", "LOCATION": "cache-stats-test"},
+    "plain": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "cache-stats-plain"},
+})
+class CacheStatsTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        del caches["default"]   # naujas egzempliorius – be ankstesnių testų skaitliukų
+        self.addCleanup(caches["default"].clear)
+
+    def test_counters_are_flushed_for_other_processes(self):
+        cache = caches["default"]
+        cache.set("k", 1)
+        for _ in range(FLUSH_EVERY):
+            cache.get("k")
+        cache.get("missing")
+        self.assertEqual(cache.hit_stats(), (FLUSH_EVERY, 1))
+        # kitas egzempliorius (kitas procesas file/redis atveju) mato tik nupiltus skaičius
+        self.assertEqual(LocMemCache("cache-stats-test", {}).hit_stats(), (FLUSH_EVERY, 0))
+
+    def test_command_reports_each_alias(self):
+        cache = caches["default"]
+        cache.set("k", 1)
+        cache.get("k")
+        cache.get("k")
+        cache.get("missing")
+
+        out = StringIO()
+        call_command("cache_stats", stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertIn("hit ratio: 66.7%", lines[1])
+        self.assertTrue(lines[1].startswith("default"))
+        self.assertIn("hit ratio: n/a", lines[2])
+        self.assertTrue(lines[2].startswith("plain"))
@@ -5,19 +5,12 @@ from django.conf import settings
 from django.conf.urls.static import static
 from pages.views import HomeView, about_view
 from stripe_payments import views as stripe_views
+from catalog.storage import serve_product_media
 
 # SEO
-from pages.views_seo import robots_txt
-from django.contrib.sitemaps.views import sitemap
-from shop.sitemaps import ProductSitemap, CategorySitemap, StaticViewSitemap
+from pages.views_seo import robots_txt, sitemap_index, sitemap_section
 from django.views.generic import TemplateView
 
-sitemaps = {
-    "products": ProductSitemap,
-    "categories": CategorySitemap,
-    "static": StaticViewSitemap,
-}
-
 urlpatterns = [
     path("admin/", admin.site.urls),
 
@@ -34,7 +27,9 @@ urlpatterns = [
     path("api/v1/", include("catalog.urls_api")),
 
     path("robots.txt", robots_txt, name="robots_txt"),
-    path("sitemap.xml", sitemap, {"sitemaps": sitemaps}, name="sitemap"),
+    path("sitemap.xml", sitemap_index, name="sitemap"),
+    path("sitemap-<str:section>-<int:page>.xml", sitemap_section, name="sitemap_section_page"),
+    path("sitemap-<str:section>.xml", sitemap_section, name="sitemap_section"),
     path("paysera/", include("paysera.urls")),
 
     #Sripe
@@ -46,6 +41,11 @@ urlpatterns += [
     path("ckeditor5/", include("django_ckeditor_5.urls")),
 ]
 
-# Media failai per dev
+# Media failai per dev. Produkcijoje /media/ atiduoda web serveris – cache antraštės
+# nustatomos ten (žr. README „Media failai produkcijoje“).
 if settings.DEBUG:
+    urlpatterns += [
+        # produktų nuotraukos (catalog.storage): vardas = turinio hash → „immutable“ cache antraštės
+        path(settings.MEDIA_URL.lstrip("/") + "products/<path:path>", serve_product_media, name="product_media"),
+    ]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -0,0 +1,116 @@
+# stripe_payments/client.py — bendras Stripe klientas: keep-alive HTTP jungtys, timeout'ai, latencija
+"""
+    from stripe_payments.client import get_client
+    pi = get_client().v1.payment_intents.retrieve(pi_id)
+
+Visi klientai dalinasi vienu requests.Session (urllib3 jungčių pool'u), todėl TLS
+handshake'as Stripe API atliekamas vieną kartą, o ne kiekvienam kvietimui.
+Kiekvienos HTTP užklausos trukmė loguojama (DEBUG) ir kaupiama latency_stats().
+"""
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+
+import requests
+import stripe
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_session = None
+_clients = {}
+_stats = defaultdict(lambda: {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+
+# objektų id (pi_3Nx..., evt_...) metrikose sutraukiam į :id; resursų vardai (payment_intents) – tik mažosios
+ID_RE = re.compile(r"/[a-z]+_(?=[a-z_]*[A-Z0-9])[A-Za-z0-9_]+")
+
+
+class TimedRequestsClient(stripe.RequestsClient):
+    """RequestsClient, matuojantis kiekvienos HTTP užklausos (taip pat ir retry) trukmę."""
+
+    def request(self, method, url, headers, post_data=None):
+        started = time.monotonic()
+        ok = False
+        try:
+            result = super().request(method, url, headers, post_data)
+            ok = True
+            return result
+        finally:
+            _record(method, url, (time.monotonic() - started) * 1000, ok)
+
+
+def _record(method, url, ms, ok):
+    path = ID_RE.sub("/:id", url.split("://", 1)[-1].split("/", 1)[-1].split("?")[0])
+    name = f"{method.upper()} /{path}"
+    with _lock:
+        s = _stats[name]
+        s["calls"] += 1
+        s["errors"] += 0 if ok else 1
+        s["total_ms"] += ms
+        s["max_ms"] = max(s["max_ms"], ms)
+    logger.debug("Stripe %s %.0f ms%s", name, ms, "" if ok else " (klaida)")
+
+
+def latency_stats() -> dict:
+    """{"GET /v1/payment_intents/:id": {"calls", "errors", "avg_ms", "max_ms"}, ...} šiam procesui."""
+    with _lock:
+        return {
+            name: {"calls": s["calls"], "errors": s["errors"], "max_ms": round(s["max_ms"], 1),
+                   "avg_ms": round(s["total_ms"] / s["calls"], 1) if s["calls"] else 0.0}
+            for name, s in _stats.items()
+        }
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        size = getattr(settings, "STRIPE_HTTP_POOL_SIZE", 10)
+        session = requests.Session()
+        # retry'us daro Stripe SDK (su idempotency raktais), ne urllib3
+        session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=0))
+        session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=0))
+        _session = session
+    return _session
+
+
+def get_client(timeout=None, max_retries=None) -> stripe.StripeClient:
+    """
+    Stripe klientas su bendru jungčių pool'u. Numatyti nustatymai – STRIPE_CONNECT_TIMEOUT,
+    STRIPE_READ_TIMEOUT, STRIPE_MAX_NETWORK_RETRIES; timeout/max_retries – atskiram biudžetui
+    (pvz. foniniam būsenos tikrinimui).
+    """
+    if timeout is None:
+        timeout = (getattr(settings, "STRIPE_CONNECT_TIMEOUT", 3), getattr(settings, "STRIPE_READ_TIMEOUT", 15))
+    if max_retries is None:
+        max_retries = getattr(settings, "STRIPE_MAX_NETWORK_RETRIES", 2)
+    key = (timeout, max_retries)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = stripe.StripeClient(
+                settings.STRIPE_SECRET_KEY,
+                base_addresses={"api": getattr(settings, "STRIPE_API_BASE", "https://api.stripe.com")},
+                http_client=TimedRequestsClient(timeout=timeout, session=_get_session()),
+                max_network_retries=max_retries,
+            )
+    return client
+
+
+def reset_clients():
+    global _session
+    with _lock:
+        _clients.clear()
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+@receiver(setting_changed, dispatch_uid="stripe_client_settings")
+def _on_setting_changed(setting, **kwargs):
+    if setting.startswith("STRIPE_"):
+        reset_clients()
@@ -0,0 +1,78 @@
+# stripe_payments/status.py — užsakymo mokėjimo būsena be blokuojančių Stripe užklausų request'e
+"""
+payment_status(order) grąžina vietinę būseną iškart. Laukiančiam Stripe užsakymui:
+  - jei cache'e yra šviežia PaymentIntent būsena (STRIPE_STATUS_CACHE_TTL) – pritaiko ją;
+  - kitaip foniniu darbu paleidžia refresh_payment_status() (ne dažniau kaip kartą per PI
+    vienu metu) su laiko biudžetu STRIPE_STATUS_TIMEOUT.
+Success puslapis būseną atnaujina per checkout_status JSON endpoint'ą.
+Foninis darbas visada eina per executor'ių (numatytasis – modulio _executor; testai gali
+perduoti savo ir palaukti future.result()), sinchroninio režimo nėra.
+
+STRIPE_API_BASE leidžia nukreipti užklausas į vietinį netikrą Stripe serverį (testai).
+"""
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from checkout.models import Order
+from paysera.views import _mark_failed, _mark_paid_and_decrease_stock
+from .client import get_client
+
+logger = logging.getLogger(__name__)
+
+STATUS_KEY = "stripe:pi:{}:status"
+REFRESHING_KEY = "stripe:pi:{}:refreshing"
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="stripe-status")
+
+
+def apply_pi_status(order: Order, pi_status: str) -> None:
+    if order.status == "paid":
+        return
+    if pi_status == "succeeded":
+        _mark_paid_and_decrease_stock(order)
+    elif pi_status in {"requires_payment_method", "canceled"}:
+        _mark_failed(order)
+
+
+def refresh_payment_status(order_id: int) -> Optional[str]:
+    """Paklausia Stripe apie užsakymo PI, įrašo į cache ir pritaiko. None – nepavyko / nereikia."""
+    order = Order.objects.filter(pk=order_id, payment_method="stripe").first()
+    if order is None or not order.stripe_pi_id or order.status == "paid":
+        return None
+    try:
+        client = get_client(timeout=getattr(settings, "STRIPE_STATUS_TIMEOUT", 3), max_retries=0)
+        pi = client.v1.payment_intents.retrieve(order.stripe_pi_id)
+    except Exception:
+        logger.exception("Stripe PI %s būsenos atnaujinti nepavyko", order.stripe_pi_id)
+        return None
+    finally:
+        cache.delete(REFRESHING_KEY.format(order.stripe_pi_id))
+
+    cache.set(STATUS_KEY.format(pi.id), pi.status, getattr(settings, "STRIPE_STATUS_CACHE_TTL", 10))
+    apply_pi_status(order, pi.status)
+    return pi.status
+
+
+def _refresh_in_background(order_id: int) -> None:
+    try:
+        refresh_payment_status(order_id)
+    finally:
+        connections.close_all()   # foninė gija – DB jungčių nepaliekam
+
+
+def payment_status(order: Order, executor: Optional[Executor] = None) -> str:
+    """Vietinė užsakymo būsena; Stripe tikrinimas – tik fone (žr. modulio aprašą)."""
+    if order.payment_method != "stripe" or order.status == "paid" or not order.stripe_pi_id:
+        return order.status
+
+    cached = cache.get(STATUS_KEY.format(order.stripe_pi_id))
+    if cached is not None:
+        apply_pi_status(order, cached)
+    elif cache.add(REFRESHING_KEY.format(order.stripe_pi_id), 1, timeout=getattr(settings, "STRIPE_STATUS_TIMEOUT", 3) * 2):
+        (executor or _executor).submit(_refresh_in_background, order.pk)
+    return order.status
@@ -1,3 +1,193 @@
-from django.test import TestCase
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from checkout.models import Order
+from . import status
+from .client import latency_stats
+from .views import _ensure_pi_for_order
+
+
+class FakeStripe(ThreadingHTTPServer):
+    """
+    Vietinis netikras Stripe API (PaymentIntent retrieve/create/update).
+    Skaičiuoja užklausas ir TCP jungtis – keep-alive patikrai.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        self.intents = {}
+        self.requests = []
+        self.connections = 0
+        super().__init__(("127.0.0.1", 0), _FakeStripeHandler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def set_status(self, pi_id, status, **fields):
+        self.intents[pi_id] = {"id": pi_id, "object": "payment_intent", "status": status,
+                               "client_secret": f"{pi_id}_secret", "payment_method_types": ["card"], **fields}
+
+
+class _FakeStripeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def _reply(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _pi_id(self):
+        parts = self.path.split("?")[0].strip("/").split("/")
+        return parts[2] if len(parts) > 2 else None
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path))
+        pi = self.server.intents.get(self._pi_id())
+        if pi is None:
+            return self._reply(404, {"error": {"type": "invalid_request_error", "message": "No such payment_intent"}})
+        self._reply(200, pi)
+
+    def do_POST(self):
+        self.server.requests.append(("POST", self.path))
+        form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode())
+        pi_id = self._pi_id() or f"pi_{len(self.server.intents) + 1}"
+        if pi_id not in self.server.intents:
+            self.server.set_status(pi_id, "requires_payment_method")
+        pi = self.server.intents[pi_id]
+        if "amount" in form:
+            pi["amount"] = int(form["amount"][0])
+        types = [v[0] for k, v in sorted(form.items()) if k.startswith("payment_method_types")]
+        if types:
+            pi["payment_method_types"] = types
+        self._reply(200, pi)
+
+    def log_message(self, *args):
+        pass
+
+
+class _RecordingExecutor(ThreadPoolExecutor):
+    """Tikras gijų executor'ius, kuris įsimena future'us – testas jų palaukia."""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.futures = []
+
+    def submit(self, *args, **kwargs):
+        future = super().submit(*args, **kwargs)
+        self.futures.append(future)
+        return future
+
+    def wait(self):
+        for future in self.futures:
+            future.result(timeout=10)
+
+
+# foninė gija naudoja savo DB jungtį – duomenys turi būti commit'inti
+class PaymentStatusTests(TransactionTestCase):
+    def setUp(self):
+        self.stripe = FakeStripe()
+        threading.Thread(target=self.stripe.serve_forever, daemon=True).start()
+        self.addCleanup(self.stripe.server_close)
+        self.addCleanup(self.stripe.shutdown)
+        cache.clear()
+        self.executor = _RecordingExecutor()
+        self.addCleanup(self.executor.shutdown)
+        patcher = mock.patch.object(status, "_executor", self.executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.order = Order.objects.create(
+            first_name="Jonas", last_name="Jonaitis", email="jonas@example.com", address="Gedimino pr. 1",
+            city="Vilnius", postal_code="01103", payment_method="stripe", status="pending", stripe_pi_id="pi_1",
+        )
+
+    def _settings(self):
+        return override_settings(STRIPE_SECRET_KEY="sk_test_fake", STRIPE_API_BASE=self.stripe.url)
+
+    def test_status_endpoint_refreshes_once_per_ttl(self):
+        self.stripe.set_status("pi_1", "processing")
+        url = reverse("checkout_status", kwargs={"order_id": self.order.id})
+        with self._settings():
+            for _ in range(3):
+                self.assertEqual(self.client.get(url).json(), {"status": "pending", "paid": False})
+                self.executor.wait()
+            self.assertEqual(len(self.stripe.requests), 1)   # kiti – iš cache
+
+            cache.clear()
+            self.stripe.set_status("pi_1", "succeeded")
+            # atsakymas neblokuoja – grąžina vietinę būseną, Stripe klausiama fone
+            self.assertEqual(self.client.get(url).json(), {"status": "pending", "paid": False})
+            self.executor.wait()
+            self.assertEqual(self.client.get(url).json(), {"status": "paid", "paid": True})
+
+    def test_injected_executor_runs_refresh(self):
+        self.stripe.set_status("pi_1", "succeeded")
+        injected = _RecordingExecutor()
+        self.addCleanup(injected.shutdown)
+        with self._settings():
+            self.assertEqual(status.payment_status(self.order, executor=injected), "pending")
+            [future] = injected.futures
+            future.result(timeout=10)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, "paid")
+        self.assertFalse(self.executor.futures)   # numatytasis executor'ius nenaudotas
+
+    def test_success_page_does_not_wait_for_stripe(self):
+        self.stripe.set_status("pi_1", "succeeded")
+        with self._settings():
+            cache.add("stripe:pi:pi_1:refreshing", 1)   # foninis atnaujinimas jau vyksta
+            resp = self.client.get(reverse("checkout_success", kwargs={"order_id": self.order.id}))
+        self.assertContains(resp, "Laukiame Stripe mokėjimo patvirtinimo")
+        self.assertEqual(len(self.stripe.requests), 0)
+
+    def test_stripe_outage_keeps_local_status(self):
+        with self._settings(), self.assertLogs("stripe_payments.status", "ERROR"):
+            resp = self.client.get(reverse("checkout_status", kwargs={"order_id": self.order.id}))
+            self.executor.wait()
+        self.assertEqual(resp.json()["status"], "pending")
+        self.assertEqual(len(self.stripe.requests), 1)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, "pending")
+
+
+@override_settings(STRIPE_SECRET_KEY="sk_test_fake", STRIPE_MAX_NETWORK_RETRIES=0)
+class StripeClientTests(TestCase):
+    def setUp(self):
+        self.stripe = FakeStripe()
+        threading.Thread(target=self.stripe.serve_forever, daemon=True).start()
+        self.addCleanup(self.stripe.server_close)
+        self.addCleanup(self.stripe.shutdown)
+        override = override_settings(STRIPE_API_BASE=self.stripe.url)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.order = Order.objects.create(
+            first_name="Jonas", last_name="Jonaitis", email="jonas@example.com", address="Gedimino pr. 1",
+            city="Vilnius", postal_code="01103", payment_method="stripe", total="44.99",
+        )
+
+    def test_reuse_collapses_updates_into_one_call_over_one_connection(self):
+        self.assertEqual(_ensure_pi_for_order(self.order), "pi_1_secret")
+        self.order.total = "54.99"
+        self.stripe.intents["pi_1"]["payment_method_types"] = ["link"]
+        self.assertEqual(_ensure_pi_for_order(self.order), "pi_1_secret")
+
+        self.assertEqual([m for m, _ in self.stripe.requests], ["POST", "GET", "POST"])
+        self.assertEqual(self.stripe.intents["pi_1"]["amount"], 5499)
+        self.assertEqual(self.stripe.intents["pi_1"]["payment_method_types"], ["card"])
+        self.assertEqual(self.stripe.connections, 1)
+        self.assertEqual(latency_stats()["GET /v1/payment_intents/:id"]["errors"], 0)
@@ -11,9 +11,10 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 
 from checkout.models import Order
-from paysera.views import _mark_paid_and_decrease_stock
+from webhooks.models import WebhookEvent
+from webhooks.services import ingest
+from .client import get_client
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
 logger = logging.getLogger(__name__)
 
 
@@ -22,41 +23,44 @@ def _amount_cents(order: Order) -> int:
 
 
 def _ensure_pi_for_order(order: Order) -> str:
-    """Sukuria arba pernaudoja PaymentIntent. Leidžiam tik CARD."""
+    """
+    Sukuria arba pernaudoja PaymentIntent. Leidžiam tik CARD.
+    Pernaudojant – retrieve + daugiausia vienas update (mokėjimo būdai ir suma kartu).
+    """
     amount = _amount_cents(order)
+    intents = get_client().v1.payment_intents
 
     # Jei turime esamą PI – pabandom pernaudoti
     if getattr(order, "stripe_pi_id", None):
         try:
-            pi = stripe.PaymentIntent.retrieve(order.stripe_pi_id)
+            pi = intents.retrieve(order.stripe_pi_id)
 
-            # Užtikrinam, kad leidžiamas tik "card"
-            if "card" not in (pi.payment_method_types or []):
-                try:
-                    stripe.PaymentIntent.modify(pi.id, payment_method_types=["card"])
-                except stripe.error.InvalidRequestError:
-                    pass
-
-            # Jei PI dar gali būti naudojamas – grąžinam client_secret (jei reikia, pataisom sumą)
+            # Jei PI dar gali būti naudojamas – grąžinam client_secret (jei reikia, pataisom)
             if pi.status in {"requires_payment_method", "requires_confirmation", "requires_action", "processing"}:
+                changes = {}
+                # Užtikrinam, kad leidžiamas tik "card"
+                if "card" not in (pi.payment_method_types or []):
+                    changes["payment_method_types"] = ["card"]
                 if pi.amount != amount and pi.status in {"requires_payment_method", "requires_confirmation"}:
+                    changes["amount"] = amount
+                if changes:
                     try:
-                        pi = stripe.PaymentIntent.modify(pi.id, amount=amount)
-                    except stripe.error.InvalidRequestError:
+                        pi = intents.update(pi.id, params=changes)
+                    except stripe.InvalidRequestError:
                         pass
                 return pi.client_secret
-        except stripe.error.InvalidRequestError:
+        except stripe.InvalidRequestError:
             # jeigu PI neberandamas – kursim naują
             pass
 
     # Kuriam naują PI – TIK kortelė
-    pi = stripe.PaymentIntent.create(
-        amount=amount,
-        currency=getattr(settings, "STRIPE_CURRENCY", "eur"),
-        payment_method_types=["card"],  # be Link ir t. t.
-        metadata={"order_id": str(order.id), "email": order.email or ""},
-        description=f"Order #{order.id} – urock.lt",
-    )
+    pi = intents.create(params={
+        "amount": amount,
+        "currency": getattr(settings, "STRIPE_CURRENCY", "eur"),
+        "payment_method_types": ["card"],  # be Link ir t. t.
+        "metadata": {"order_id": str(order.id), "email": order.email or ""},
+        "description": f"Order #{order.id} – urock.lt",
+    })
 
     if hasattr(order, "stripe_pi_id") and order.stripe_pi_id != pi.id:
         order.stripe_pi_id = pi.id
@@ -116,30 +120,15 @@ def stripe_webhook(request):
 
     etype = event.get("type", "")
     obj = (event.get("data") or {}).get("object") or {}
-
-    # Surandam užsakymą iš metadata.order_id arba iš PI id (fallback)
-    order = None
-    meta = obj.get("metadata") or {}
-    order_id = meta.get("order_id")
-    if order_id:
-        order = Order.objects.filter(pk=order_id).first()
-    if order is None:
-        pi_id = obj.get("id")
-        if pi_id:
-            order = Order.objects.filter(stripe_pi_id=pi_id).first()
+    order_id = (obj.get("metadata") or {}).get("order_id")
 
     logger.info("Stripe webhook OK. type=%s order_id=%s pi=%s", etype, order_id, obj.get("id"))
 
-    if etype == "payment_intent.succeeded" and order:
-        if order.status != "paid":
-            _mark_paid_and_decrease_stock(order)
-        return HttpResponse(status=200)
-
-    if etype == "payment_intent.payment_failed" and order:
-        if order.status != "paid":
-            order.status = "failed"
-            order.save(update_fields=["status"])
-        return HttpResponse(status=200)
+    # tik įrašom į inbox'ą ir iškart atsakom – apdoroja webhooks worker'is (stripe_payments/webhooks.py);
+    # Stripe retry su tuo pačiu event.id – dublikatas, ignoruojamas
+    ingest(
+        WebhookEvent.PROVIDER_STRIPE, event["id"], etype, json.loads(payload),
+        order_id=int(order_id) if str(order_id or "").isdigit() else None,
+    )
 
-    # kitus eventus laikom OK, kad Stripe jų nebebandytų resend'inti
     return HttpResponse(status=200)
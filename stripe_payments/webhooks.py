@@ -0,0 +1,30 @@
+# stripe_payments/webhooks.py — Stripe įvykių apdorojimas (iškviečia webhooks worker'is)
+import logging
+
+from checkout.models import Order
+from paysera.views import _mark_failed, _mark_paid_and_decrease_stock
+
+logger = logging.getLogger(__name__)
+
+
+def handle_event(event):
+    """event.payload – Stripe Event JSON (parašas jau patikrintas view'e)."""
+    obj = (event.payload.get("data") or {}).get("object") or {}
+
+    # Surandam užsakymą iš metadata.order_id arba iš PI id (fallback)
+    order = None
+    if event.order_id:
+        order = Order.objects.filter(pk=event.order_id).first()
+    if order is None and obj.get("id"):
+        order = Order.objects.filter(stripe_pi_id=obj["id"]).first()
+    if order is None:
+        return
+
+    if event.event_type == "payment_intent.succeeded":
+        if order.status != "paid":
+            _mark_paid_and_decrease_stock(order)
+        logger.info("Stripe paid: order=%s pi=%s", order.id, obj.get("id"))
+
+    elif event.event_type == "payment_intent.payment_failed":
+        _mark_failed(order)
+    # kitus eventus tiesiog pažymim apdorotais
@@ -0,0 +1,16 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import WebhookEvent
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ("provider", "event_id", "event_type", "order_id", "status", "attempts", "received_at")
+    list_filter = ("provider", "status", "event_type")
+    search_fields = ("event_id", "order_id")
+    readonly_fields = ("payload", "attempts", "claimed_at", "last_error", "received_at", "processed_at")
+    actions = ["reprocess"]
+
+    @admin.action(description="Apdoroti iš naujo")
+    def reprocess(self, request, queryset):
+        queryset.update(status=WebhookEvent.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now(), last_error="")
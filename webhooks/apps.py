@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+class WebhooksConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "webhooks"
+    verbose_name = "Mokėjimų webhook'ai"
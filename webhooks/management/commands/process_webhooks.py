@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from webhooks.services import process_batch
+
+class Command(BaseCommand):
+    help = "Apdoroja gautus Stripe/Paysera webhook'us (WebhookEvent inbox)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--every", type=float, default=0,
+                            help="Tikrinti kas N sekundžių (0 – apdoroti kas yra ir baigti)")
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                close_old_connections()
+                n = process_batch(options["batch_size"])
+                total += n
+                if n:
+                    continue
+                if not options["every"]:
+                    break
+                time.sleep(options["every"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} webhook events."))
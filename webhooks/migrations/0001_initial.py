@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('stripe', 'Stripe'), ('paysera', 'Paysera')], max_length=10)),
+                ('event_id', models.CharField(max_length=255)),
+                ('event_type', models.CharField(blank=True, default='', max_length=64)),
+                ('order_id', models.PositiveBigIntegerField(blank=True, db_index=True, null=True)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Laukia'), ('processing', 'Apdorojamas'), ('done', 'Apdorotas'), ('failed', 'Nepavyko')], default='pending', max_length=12)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-received_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='webhook_due_idx')],
+                'constraints': [models.UniqueConstraint(fields=('provider', 'event_id'), name='webhook_event_once')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import models
+
+
+class WebhookEvent(models.Model):
+    """
+    Mokėjimų tiekėjų pranešimų „inbox“: view'as patikrina parašą, įrašo eilutę ir iškart
+    atsako; apdoroja worker'is (manage.py process_webhooks) – žr. webhooks/services.py.
+    Pakartotinis to paties įvykio pristatymas atmetamas unikalumo apribojimu.
+    """
+    PROVIDER_STRIPE = "stripe"
+    PROVIDER_PAYSERA = "paysera"
+    PROVIDER_CHOICES = [(PROVIDER_STRIPE, "Stripe"), (PROVIDER_PAYSERA, "Paysera")]
+
+    STATUS_PENDING = "pending"
+    STATUS_PROCESSING = "processing"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Laukia"),
+        (STATUS_PROCESSING, "Apdorojamas"),
+        (STATUS_DONE, "Apdorotas"),
+        (STATUS_FAILED, "Nepavyko"),
+    ]
+
+    provider = models.CharField(max_length=10, choices=PROVIDER_CHOICES)
+    # Stripe – event.id; Paysera – "<orderid>:<status>"
+    event_id = models.CharField(max_length=255)
+    event_type = models.CharField(max_length=64, blank=True, default="")
+    order_id = models.PositiveBigIntegerField(null=True, blank=True, db_index=True)
+    payload = models.JSONField(default=dict)
+
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-received_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["provider", "event_id"], name="webhook_event_once"),
+        ]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="webhook_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.provider}:{self.event_id} ({self.status})"
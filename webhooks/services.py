@@ -0,0 +1,93 @@
+# webhooks/services.py — mokėjimų pranešimų priėmimas (ingest) ir apdorojimas (worker'is)
+"""
+ingest()         – view'e po parašo patikros: įrašo įvykį (dublikatai atmetami) ir tiek.
+process_batch()  – worker'yje: optimistiškai pasiima įvykius (kaip mailer), apdoroja juos
+                   gavimo tvarka; to paties užsakymo įvykiai serializuojami Order eilutės
+                   užraktu (select_for_update), todėl nelenktyniauja ir su checkout_success
+                   fallback'u, kuris tą patį užraktą ima _mark_paid_and_decrease_stock().
+"""
+import logging
+from datetime import timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from checkout.models import Order
+from .models import WebhookEvent
+
+log = logging.getLogger(__name__)
+
+HANDLERS = {
+    WebhookEvent.PROVIDER_STRIPE: "stripe_payments.webhooks.handle_event",
+    WebhookEvent.PROVIDER_PAYSERA: "paysera.webhooks.handle_event",
+}
+
+
+def ingest(provider: str, event_id: str, event_type: str, payload: dict,
+           order_id: Optional[int] = None) -> bool:
+    """Įrašo įvykį į inbox'ą. False – toks įvykis jau gautas (tiekėjo retry)."""
+    try:
+        with transaction.atomic():
+            WebhookEvent.objects.create(
+                provider=provider, event_id=event_id, event_type=event_type,
+                payload=payload, order_id=order_id,
+            )
+    except IntegrityError:
+        log.info("Webhook dublikatas: %s:%s", provider, event_id)
+        return False
+    return True
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(3600, 30 * 2 ** max(0, attempts - 1)))
+
+
+def claim_batch(limit: int = 50) -> List[WebhookEvent]:
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, "WEBHOOK_CLAIM_TIMEOUT", 300))
+    due = WebhookEvent.objects.filter(
+        Q(status=WebhookEvent.STATUS_PENDING, next_attempt_at__lte=now)
+        | Q(status=WebhookEvent.STATUS_PROCESSING, claimed_at__lt=stale)
+    ).order_by("received_at", "id")
+
+    claimed = []
+    for pk, status, claimed_at in due.values_list("pk", "status", "claimed_at")[:limit]:
+        won = WebhookEvent.objects.filter(pk=pk, status=status, claimed_at=claimed_at).update(
+            status=WebhookEvent.STATUS_PROCESSING, claimed_at=now, attempts=F("attempts") + 1
+        )
+        if won:
+            claimed.append(pk)
+    return list(WebhookEvent.objects.filter(pk__in=claimed).order_by("received_at", "id"))
+
+
+def process(event: WebhookEvent) -> bool:
+    handler = import_string(HANDLERS[event.provider])
+    try:
+        with transaction.atomic():
+            if event.order_id:
+                # per-order serializacija: kitas worker'is / success puslapis palauks
+                Order.objects.select_for_update().filter(pk=event.order_id).values_list("pk", flat=True).first()
+            handler(event)
+    except Exception as e:
+        failed = event.attempts >= getattr(settings, "WEBHOOK_MAX_ATTEMPTS", 8)
+        WebhookEvent.objects.filter(pk=event.pk).update(
+            status=WebhookEvent.STATUS_FAILED if failed else WebhookEvent.STATUS_PENDING,
+            next_attempt_at=timezone.now() + _backoff(event.attempts),
+            last_error=f"{type(e).__name__}: {e}"[:2000],
+        )
+        log.exception("Webhook %s:%s nepavyko (bandymas %s)", event.provider, event.event_id, event.attempts)
+        return False
+
+    WebhookEvent.objects.filter(pk=event.pk).update(
+        status=WebhookEvent.STATUS_DONE, processed_at=timezone.now(), last_error=""
+    )
+    return True
+
+
+def process_batch(limit: int = 50) -> int:
+    """Apdoroja iki limit įvykių; grąžina sėkmingai apdorotų skaičių."""
+    return sum(process(event) for event in claim_batch(limit))
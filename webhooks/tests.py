@@ -0,0 +1,79 @@
+import hashlib
+import hmac
+import json
+import time
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from catalog.models import Category, Product
+from checkout.models import Order, OrderItem
+from paysera.utils import make_payment_data
+from .models import WebhookEvent
+from .services import process_batch
+
+
+@override_settings(PAYSERA_SIGN_PASSWORD="secret", STRIPE_WEBHOOK_SECRET="whsec_test")
+class WebhookInboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cat = Category.objects.create(name="Hoodies")
+        cls.variant = Product.objects.create(name="Hoodie", category=cat, price=20, stock=5).variants.get()
+
+    def _order(self, payment_method):
+        order = Order.objects.create(
+            first_name="Jonas", last_name="Jonaitis", email="jonas@example.com", address="Gedimino pr. 1",
+            city="Vilnius", postal_code="01103", payment_method=payment_method, total="44.99",
+        )
+        OrderItem.objects.create(order=order, variant=self.variant, product_name="Hoodie",
+                                 variant_sku=self.variant.sku, qty=2, price=20)
+        return order
+
+    def _stock(self):
+        self.variant.refresh_from_db()
+        return self.variant.stock
+
+    def test_paysera_retries_are_acknowledged_and_processed_once(self):
+        order = self._order("paysera")
+        body = make_payment_data({"orderid": order.id, "status": "1", "amount": 4499, "currency": "EUR"})
+        for _ in range(3):
+            resp = self.client.post(reverse("paysera_callback"), body)
+            self.assertContains(resp, "OK")
+
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+        order.refresh_from_db()
+        self.assertEqual((order.status, self._stock()), ("pending", 5))   # atsakyta dar neapdorojus
+
+        self.assertEqual(process_batch(), 1)
+        order.refresh_from_db()
+        self.assertEqual((order.status, self._stock()), ("paid", 3))
+        self.assertEqual(WebhookEvent.objects.get().status, WebhookEvent.STATUS_DONE)
+
+    def test_stripe_event_deduplicated_by_event_id(self):
+        order = self._order("stripe")
+        payload = json.dumps({
+            "id": "evt_1", "object": "event", "type": "payment_intent.succeeded",
+            "data": {"object": {"id": "pi_1", "object": "payment_intent", "metadata": {"order_id": str(order.id)}}},
+        })
+        ts = int(time.time())
+        sig = hmac.new(b"whsec_test", f"{ts}.{payload}".encode(), hashlib.sha256).hexdigest()
+        for _ in range(2):
+            resp = self.client.post(reverse("stripe_webhook"), payload, content_type="application/json",
+                                    HTTP_STRIPE_SIGNATURE=f"t={ts},v1={sig}")
+            self.assertEqual(resp.status_code, 200)
+
+        event = WebhookEvent.objects.get()
+        self.assertEqual((event.provider, event.event_id, event.order_id), ("stripe", "evt_1", order.id))
+        process_batch()
+        order.refresh_from_db()
+        self.assertEqual((order.status, self._stock()), ("paid", 3))
+
+    def test_failed_payment_never_overrides_paid(self):
+        order = self._order("paysera")
+        self.client.post(reverse("paysera_callback"),
+                         make_payment_data({"orderid": order.id, "status": "1", "amount": 4499}))
+        self.client.post(reverse("paysera_callback"),
+                         make_payment_data({"orderid": order.id, "status": "0"}))
+        self.assertEqual(process_batch(), 2)
+        order.refresh_from_db()
+        self.assertEqual(order.status, "paid")